@@ -0,0 +1,82 @@
+"""
+Import time benchmark for the golf CLI and the GHIN client.
+
+Imports each module in a fresh interpreter a few times and fails (exit 1)
+if the median import time is over budget or a plotting/DataFrame module
+was imported as a side effect.
+
+    python benchmarks/bench_import.py --budget-ms 300
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+MODULES = ["ghin.ghin", "ghin.run"]
+# none of these are needed to fetch handicaps and print the tables
+HEAVY_MODULES = ["numpy", "pandas", "matplotlib", "httpx", "tqdm"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "heavy": heavy}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    """Import the module `repeat` times in new interpreters"""
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+    return {
+        "module": module,
+        "median_ms": round(statistics.median(r["seconds"] for r in runs) * 1000, 1),
+        "heavy_modules": runs[0]["heavy"],
+    }
+
+
+def main() -> int:
+    parser = ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=300.0,
+        help="Fail if the median import time of any module is over this",
+    )
+    cli_args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        result = measure(module, cli_args.repeat)
+        print(json.dumps(result))
+        if result["heavy_modules"]:
+            print(f"FAIL {module} imports {', '.join(result['heavy_modules'])}")
+            failed = True
+        if result["median_ms"] > cli_args.budget_ms:
+            print(f"FAIL {module} took {result['median_ms']}ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
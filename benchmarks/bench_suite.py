@@ -0,0 +1,238 @@
+"""
+Offline benchmark suite, run against the local fixture server
+(fixture_server.py) so the GHIN API is never called.
+
+    python benchmarks/bench_suite.py                 # all benchmarks
+    python benchmarks/bench_suite.py --only roster   # names containing "roster"
+    python benchmarks/bench_suite.py --baseline benchmarks/results/0.0.1.json
+
+Results (median seconds of --repeat runs per benchmark) are written to
+benchmarks/results/<version>.json, --baseline prints the change against an
+earlier results file and exits 1 if anything got slower than --tolerance.
+"""
+
+import contextlib
+import io
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixture_server import FixtureServer, GHINFixtures, install  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# a golfer with a long score history for the pagination benchmark
+DEEP_GOLFER = "9000000"
+
+
+def roster(size: int) -> dict:
+    """A roster file's contents: golfer name to GHIN number"""
+    return {f"golfer_{i}": str(1000000 + i) for i in range(size)}
+
+
+def bench_roster(size: int, max_workers: int = 8) -> Callable[[], None]:
+    from ghin.roster import fetch_handicap_spreads
+
+    golfers = roster(size)
+
+    def run() -> None:
+        spreads, errors = fetch_handicap_spreads(golfers, max_workers, progress=False)
+        assert len(spreads) == size, errors
+
+    return run
+
+
+def bench_followed_golfers() -> Callable[[], None]:
+    from ghin.ghin import GHIN
+
+    def run() -> None:
+        golfer = GHIN("1000000")
+        spreads = golfer.group_handicap_spreads(golfer.get_followed_golfers())
+        assert spreads and not golfer.roster_errors, golfer.roster_errors
+
+    return run
+
+
+def bench_pagination(scores: int = 1000) -> Callable[[], None]:
+    from ghin.ghin import GHIN
+
+    def run() -> None:
+        history = GHIN(DEEP_GOLFER).get_scores_history(scores)
+        assert len(history["scores"]) == scores
+
+    return run
+
+
+def bench_handicap_spread(golfers: int = 200) -> Callable[[], None]:
+    from ghin.ghin import GHIN
+
+    loaded = [GHIN(number).prefetch() for number in roster(golfers).values()]
+
+    def run() -> None:
+        for golfer in loaded:
+            golfer.get_handicap_spread()
+
+    return run
+
+
+def bench_vectorized_spreads(golfers: int = 1000) -> Callable[[], None]:
+    from ghin.spreads import differential_matrix, handicap_spread_table
+
+    fixtures = GHINFixtures()
+    histories = [fixtures.scores(number, 0, 20) for number in roster(golfers).values()]
+    names = list(roster(golfers))
+
+    def run() -> None:
+        handicap_spread_table(names, differential_matrix(histories))
+
+    return run
+
+
+def bench_rolling_handicap(rounds: int = 5000) -> Callable[[], None]:
+    from ghin.util import rolling_handicap
+
+    scores = GHINFixtures(scores_per_golfer=rounds).scores("1000001", 0, rounds)
+    differentials = [x["differential"] for x in scores["scores"]][::-1]
+
+    def run() -> None:
+        rolling_handicap(differentials)
+
+    return run
+
+
+def bench_render(golfers: int = 1000) -> Callable[[], None]:
+    from ghin.spreads import differential_matrix, handicap_spread_table
+    from ghin.tables import format_handicap_spread
+
+    fixtures = GHINFixtures()
+    histories = [fixtures.scores(number, 0, 20) for number in roster(golfers).values()]
+    spreads = handicap_spread_table(
+        list(roster(golfers)), differential_matrix(histories)
+    )
+
+    def run() -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            format_handicap_spread(spreads)
+
+    return run
+
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], None]]] = {
+    "roster_10": lambda: bench_roster(10),
+    "roster_100": lambda: bench_roster(100),
+    "roster_1000": lambda: bench_roster(1000),
+    "followed_golfers_25": bench_followed_golfers,
+    "score_pagination_1000": lambda: bench_pagination(1000),
+    "get_handicap_spread_200": lambda: bench_handicap_spread(200),
+    "handicap_spread_table_1000": lambda: bench_vectorized_spreads(1000),
+    "rolling_handicap_5000": lambda: bench_rolling_handicap(5000),
+    "format_handicap_spread_1000": lambda: bench_render(1000),
+}
+
+
+def measure(setup: Callable[[], Callable[[], None]], repeat: int) -> dict:
+    run = setup()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return {
+        "median_seconds": round(statistics.median(times), 5),
+        "min_seconds": round(min(times), 5),
+        "repeat": repeat,
+    }
+
+
+def compare(results: dict, baseline_path: Path, tolerance: float) -> bool:
+    """Print the change against a baseline, False if anything regressed"""
+    baseline = json.loads(baseline_path.read_text())["benchmarks"]
+    ok = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result["median_seconds"] / baseline[name]["median_seconds"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = " REGRESSION"
+            ok = False
+        print(f"{name}: {ratio:.2f}x baseline{flag}")
+    return ok
+
+
+def main() -> int:
+    parser = ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", help="Only run benchmarks whose name contains this")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.005,
+        help="Seconds the fixture server waits before every response",
+    )
+    parser.add_argument(
+        "--rate-limit-every",
+        type=int,
+        default=200,
+        help="Answer every n-th request with a 429 (0 turns it off)",
+    )
+    parser.add_argument(
+        "--output", help="Results file (default results/<version>.json)"
+    )
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    cli_args = parser.parse_args()
+
+    version = re.search(
+        r'^version = "(.+)"', (ROOT / "pyproject.toml").read_text(), re.MULTILINE
+    ).group(1)
+    results = {}
+    fixtures = GHINFixtures(score_counts={DEEP_GOLFER: 1200})
+    with FixtureServer(
+        fixtures,
+        latency=cli_args.latency,
+        rate_limit_every=cli_args.rate_limit_every,
+    ) as server:
+        install(server, pool_size=16)
+        for name, setup in BENCHMARKS.items():
+            if cli_args.only and cli_args.only not in name:
+                continue
+            results[name] = measure(setup, cli_args.repeat)
+            print(json.dumps({"benchmark": name, **results[name]}))
+        requests, rate_limited = server.requests, server.rate_limited
+
+    output = Path(cli_args.output or RESULTS_DIR / f"{version}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "version": version,
+                "python": platform.python_version(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "latency_seconds": cli_args.latency,
+                "rate_limit_every": cli_args.rate_limit_every,
+                "server_requests": requests,
+                "server_rate_limited": rate_limited,
+                "benchmarks": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"wrote {output}")
+    if cli_args.baseline:
+        return 0 if compare(results, Path(cli_args.baseline), cli_args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Local stand-in for the GHIN API used by the benchmarks.
+
+FixtureServer serves generated but realistic search.json,
+handicap_history.json, scores.json, followed_golfers and
+GetCourseDetails.json payloads from a local HTTP server. Every golfer id
+always gets the same data. It can add latency to every response and answer
+every n-th request with a 429 to exercise the retry policy. install()
+points the shared ghin.transport session at it, so the real connection
+pool, retries and cache are used and the GHIN API never is.
+
+    with FixtureServer(latency=0.02, rate_limit_every=50) as server:
+        install(server)
+        GHIN(1234567).get_handicap_spread()
+"""
+
+import datetime as dt
+import hashlib
+import json
+import multiprocessing
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+API_HOST = "https://api2.ghin.com"
+FIRST_NAMES = ["Jace", "Porter", "Scott", "Andrew", "Sam", "Alex", "Jordan", "Casey"]
+LAST_NAMES = ["Iverson", "Millward", "Smith", "Jones", "Taylor", "Brown", "Lee"]
+TEE_SETS = [("Black", "Male", 74.1, 139), ("Blue", "Male", 72.3, 131)]
+TEE_SETS += [("White", "Male", 70.2, 125), ("Red", "Female", 71.8, 126)]
+
+
+def _rng(*key) -> random.Random:
+    """Random generator seeded by the key, the same key gives the same data"""
+    digest = hashlib.sha256(repr(key).encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+class GHINFixtures:
+    """
+    Payloads for every endpoint the client uses, generated per golfer id.
+    score_counts gives some golfers a longer (or shorter) score history
+    than scores_per_golfer.
+    """
+
+    def __init__(
+        self,
+        scores_per_golfer: int = 120,
+        followed_golfers: int = 25,
+        score_counts: Optional[dict] = None,
+    ):
+        self.scores_per_golfer = scores_per_golfer
+        self.n_followed = followed_golfers
+        self.score_counts = score_counts or {}
+        self._score_lists = {}
+
+    def golfer(self, golfer_id: str) -> dict:
+        rng = _rng("golfer", golfer_id)
+        index = round(rng.uniform(-3.0, 30.0), 1)
+        low = round(index - rng.uniform(0.0, 4.0), 1)
+        return {
+            "id": int(golfer_id),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "created_at": f"{rng.randint(2005, 2020)}-03-01T12:00:00.000Z",
+            "low_hi_date": f"{rng.randint(2021, 2024)}-07-15",
+            "low_hi_display": f"+{-low}" if low < 0 else str(low),
+            "handicap_index": index,
+        }
+
+    def search(self, params: dict) -> dict:
+        golfer = self.golfer(params["golfer_id"])
+        return {"golfers": [{k: v for k, v in golfer.items() if k != "handicap_index"}]}
+
+    def handicap_history(
+        self, golfer_id: str, date_begin: str = "", date_end: str = "9999"
+    ) -> dict:
+        """Weekly revisions between the dates, the latest one if there are none"""
+        golfer = self.golfer(golfer_id)
+        rng = _rng("history", golfer_id)
+        revisions = []
+        value = golfer["handicap_index"]
+        for week in range(260):
+            date = dt.date(2025, 1, 1) - dt.timedelta(weeks=week)
+            revisions.append(
+                {
+                    "RevDate": f"{date.isoformat()}T00:00:00",
+                    "Value": value,
+                    "Display": f"+{-value}" if value < 0 else str(value),
+                    "LowHIDisplay": golfer["low_hi_display"],
+                }
+            )
+            value = round(value + rng.uniform(-0.4, 0.4), 1)
+        in_range = [x for x in revisions if date_begin <= x["RevDate"][:10] <= date_end]
+        return {"handicap_revisions": in_range or revisions[:1]}
+
+    def _score_list(self, golfer_id: str) -> list:
+        """Every score of a golfer, most recent first (generated once)"""
+        if golfer_id in self._score_lists:
+            return self._score_lists[golfer_id]
+        golfer = self.golfer(golfer_id)
+        rng = _rng("scores", golfer_id)
+        scores = []
+        played_at = dt.date(2025, 1, 1)
+        for i in range(self.score_counts.get(golfer_id, self.scores_per_golfer)):
+            played_at -= dt.timedelta(days=rng.randint(1, 10))
+            differential = round(golfer["handicap_index"] + rng.gauss(3.0, 3.5), 1)
+            scores.append(
+                {
+                    "id": int(golfer_id) * 10000 + i,
+                    "played_at": played_at.isoformat(),
+                    "posted_at": played_at.isoformat(),
+                    "number_of_holes": 18,
+                    "adjusted_gross_score": round(72 + differential * 125 / 113),
+                    "differential": differential,
+                    "scaled_up_differential": None,
+                    "course_id": str(rng.randint(1000, 1020)),
+                    "tee_set_id": str(rng.randint(1, 4)),
+                    "course_name": "Fixture Golf Club",
+                    "score_type": "H",
+                }
+            )
+        self._score_lists[golfer_id] = scores
+        return scores
+
+    def scores(self, golfer_id: str, offset: int, limit: int) -> dict:
+        scores = self._score_list(golfer_id)
+        gross = [x["adjusted_gross_score"] for x in scores]
+        return {
+            "scores": scores[offset : offset + limit],
+            "total_count": len(scores),
+            "highest_score": max(gross),
+            "lowest_score": min(gross),
+            "average": round(sum(gross) / len(gross), 1),
+        }
+
+    def followed_golfers(self, golfer_id: str) -> dict:
+        rng = _rng("followed", golfer_id)
+        golfers = []
+        for _ in range(self.n_followed):
+            golfer = self.golfer(str(rng.randint(1000000, 9999999)))
+            golfers.append({k: golfer[k] for k in ("id", "first_name", "last_name")})
+        return {"golfers": golfers}
+
+    def course_details(self, course_id: str) -> dict:
+        rng = _rng("course", course_id)
+        pars = [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 3, 4, 5, 4, 4, 3, 4, 5]
+        holes = [
+            {
+                "Number": i + 1,
+                "Par": par,
+                "Length": rng.randint(
+                    *{3: (130, 230), 4: (330, 460), 5: (480, 600)}[par]
+                ),
+            }
+            for i, par in enumerate(pars)
+        ]
+        tee_sets = []
+        for number, (name, gender, rating, slope) in enumerate(TEE_SETS):
+            tee_holes = [
+                {**hole, "Length": round(hole["Length"] * (1 - 0.07 * number))}
+                for hole in holes
+            ]
+            tee_sets.append(
+                {
+                    "TeeSetRatingId": int(course_id) * 10 + number,
+                    "TeeSetRatingName": name,
+                    "Gender": gender,
+                    "TotalPar": sum(pars),
+                    "TotalYardage": sum(hole["Length"] for hole in tee_holes),
+                    "Holes": tee_holes,
+                    "Ratings": [
+                        {
+                            "RatingType": "Total",
+                            "CourseRating": rating,
+                            "SlopeRating": slope,
+                            "BogeyRating": rating + 24,
+                        },
+                        {
+                            "RatingType": "Front",
+                            "CourseRating": round(rating / 2, 1),
+                            "SlopeRating": slope - 2,
+                            "BogeyRating": round(rating / 2 + 12, 1),
+                        },
+                        {
+                            "RatingType": "Back",
+                            "CourseRating": round(rating / 2, 1),
+                            "SlopeRating": slope + 2,
+                            "BogeyRating": round(rating / 2 + 12, 1),
+                        },
+                    ],
+                }
+            )
+        return {
+            "CourseId": int(course_id),
+            "CourseName": "Fixture Golf Club",
+            "Facility": {"FacilityName": "Fixture Golf Club"},
+            "TeeSets": tee_sets,
+        }
+
+    def payload(self, url: str) -> Optional[dict]:
+        """The payload for a GHIN API url, None for an unknown endpoint"""
+        parts = urlsplit(url)
+        path = parts.path
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if path.endswith("golfers/search.json"):
+            return self.search(params)
+        if path.endswith("handicap_history.json"):
+            return self.handicap_history(
+                path.split("/")[-2],
+                params.get("date_begin", ""),
+                params.get("date_end", "9999"),
+            )
+        if path.endswith("scores.json"):
+            return self.scores(
+                params["golfer_id"],
+                int(params.get("offset", 0)),
+                int(params.get("limit", 25)),
+            )
+        if "followed_golfers" in path:
+            return self.followed_golfers(path.rsplit("/", 1)[-1].split(".")[0])
+        if path.endswith("GetCourseDetails.json"):
+            return self.course_details(params["courseId"])
+        return None
+
+
+def _make_handler(
+    fixtures: GHINFixtures,
+    latency: float,
+    rate_limit_every: int,
+    retry_after: int,
+    requests,
+    rate_limited,
+) -> type:
+    """Request handler class answering from fixtures, counting into shared values"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately, without this every
+        # response waits for the client's delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:
+            with requests.get_lock():
+                requests.value += 1
+                limited = rate_limit_every and requests.value % rate_limit_every == 0
+            if latency:
+                time.sleep(latency)
+            if limited:
+                with rate_limited.get_lock():
+                    rate_limited.value += 1
+                self._send(429, {"error": "Too Many Requests"}, retry_after)
+                return
+            payload = fixtures.payload(self.path)
+            if payload is None:
+                self._send(404, {"errors": f"Unknown endpoint {self.path}"})
+                return
+            self._send(200, payload)
+
+        def _send(self, status: int, body: dict, retry_after=None) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if retry_after is not None:
+                self.send_header("Retry-After", str(retry_after))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    return Handler
+
+
+def _serve(
+    fixtures, latency, rate_limit_every, retry_after, requests, rate_limited, ports
+):
+    """Run the server in the child process and report its port"""
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        _make_handler(
+            fixtures, latency, rate_limit_every, retry_after, requests, rate_limited
+        ),
+    )
+    server.daemon_threads = True
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FixtureServer:
+    """
+    Threaded local HTTP server answering GHIN API paths from GHINFixtures.
+    It runs in its own process so serving does not compete with the client
+    being benchmarked for the GIL. latency (seconds) is added to every
+    response, rate_limit_every=n answers every n-th request with a 429 and
+    a Retry-After of retry_after seconds.
+    """
+
+    def __init__(
+        self,
+        fixtures: Optional[GHINFixtures] = None,
+        latency: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: int = 0,
+    ) -> None:
+        self.fixtures = fixtures or GHINFixtures()
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self._requests = multiprocessing.Value("i", 0)
+        self._rate_limited = multiprocessing.Value("i", 0)
+        self._process: Optional[multiprocessing.Process] = None
+        self.port: Optional[int] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def requests(self) -> int:
+        """Requests received so far, rate limited ones included"""
+        return self._requests.value
+
+    @property
+    def rate_limited(self) -> int:
+        """Requests answered with a 429 so far"""
+        return self._rate_limited.value
+
+    def start(self) -> "FixtureServer":
+        ports = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=_serve,
+            args=(
+                self.fixtures,
+                self.latency,
+                self.rate_limit_every,
+                self.retry_after,
+                self._requests,
+                self._rate_limited,
+                ports,
+            ),
+            daemon=True,
+        )
+        self._process.start()
+        self.port = ports.get(timeout=30)
+        return self
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.join()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+class _RedirectAdapter(HTTPAdapter):
+    """HTTPAdapter that sends GHIN API requests to the fixture server instead"""
+
+    def __init__(self, target: str, **kwargs) -> None:
+        self.target = target
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = self.target + request.url[len(API_HOST) :]
+        return super().send(request, **kwargs)
+
+
+def install(
+    server: FixtureServer,
+    pool_size: int = 10,
+    retries: int = 3,
+    backoff: float = 0.0,
+    cache: bool = False,
+    memo: bool = False,
+) -> None:
+    """
+    Rebuild the shared ghin.transport session (same pool and retry policy
+    as the real one) with requests to the GHIN API sent to the server. The
+    response cache and request memo are off unless asked for, so repeated
+    benchmark runs keep hitting the server.
+    """
+    from ghin import transport
+
+    session = transport.configure_session(
+        pool_size=pool_size, retries=retries, backoff=backoff
+    )
+    adapter = session.get_adapter(API_HOST)
+    session.mount(
+        API_HOST,
+        _RedirectAdapter(
+            server.url,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=adapter.max_retries,
+        ),
+    )
+    transport.configure_cache(enabled=cache)
+    transport.configure_memo(enabled=memo)
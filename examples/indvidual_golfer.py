@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 
 from ghin.ghin import GHIN
+from ghin.store import ScoreStore
 from ghin.tables import (
     format_handicap_spread,
     plot_differentials_over_time,
@@ -26,3 +27,7 @@ if __name__ == "__main__":
     plot_low_handicap_over_time(handicap_history)
     plot_scores_over_time(score_history)
     plot_differentials_over_time(score_history, g.handicap)
+    # full history from the local score store, only new scores are downloaded
+    store = ScoreStore()
+    g.sync_scores(store)
+    plot_differentials_over_time(store.get_scores(g.ghin_number), g.handicap)
@@ -0,0 +1,374 @@
+import asyncio
+import datetime as dt
+import json
+from typing import Optional, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+from rich import print
+
+from ghin.courses import Course
+from ghin.ghin import GHIN
+from ghin.header import get_headers
+from ghin.instrument import endpoint_name, span
+from ghin.roster import DEFAULT_MAX_WORKERS
+from ghin.store import ScoreStore
+from ghin.tables import format_handicap_spread
+from ghin.transport import (
+    DEFAULT_BACKOFF,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    DEFAULT_TIMEOUT,
+    RETRY_STATUSES,
+    check_response_body,
+)
+
+_client: Optional["httpx.AsyncClient"] = None
+_retries = DEFAULT_RETRIES
+_backoff = DEFAULT_BACKOFF
+
+
+def _httpx_timeout(timeout: Union[float, tuple]) -> "httpx.Timeout":
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def configure_async_client(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: Union[float, tuple] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> "httpx.AsyncClient":
+    """
+    Build the process wide async connection pool shared by AsyncGHIN and
+    AsyncCourse. Takes the same options as transport.configure_session.
+    Close the previous client with close_async_client() before reconfiguring.
+    """
+    global _client, _retries, _backoff
+    if httpx is None:
+        raise ImportError("httpx is required for the async client: pip install httpx")
+    _client = httpx.AsyncClient(
+        headers=get_headers(),
+        timeout=_httpx_timeout(timeout),
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+    )
+    _retries = retries
+    _backoff = backoff
+    return _client
+
+
+def get_async_client() -> "httpx.AsyncClient":
+    """Return the shared async client, creating it with the defaults on first use"""
+    if _client is None or _client.is_closed:
+        configure_async_client()
+    return _client
+
+
+async def close_async_client() -> None:
+    """Close the shared async client and its connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def request_json(url: str, params: Optional[dict] = None) -> dict:
+    """
+    Async version of transport.request_json. 429/5xx responses are retried
+    with exponential backoff, honouring the Retry-After header.
+    """
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    # httpx replaces the url query string with params, requests merges them
+    url = httpx.URL(url).copy_merge_params(params)
+    client = get_async_client()
+    with span("request", endpoint=endpoint_name(str(url))) as request_span:
+        for attempt in range(_retries + 1):
+            response = await client.get(url)
+            if response.status_code not in RETRY_STATUSES or attempt == _retries:
+                break
+            retry_after = response.headers.get("retry-after", "")
+            delay = float(retry_after) if retry_after.isdigit() else 0
+            await asyncio.sleep(max(delay, _backoff * 2**attempt))
+        request_span.set_attribute("status", response.status_code)
+        request_span.set_attribute("bytes", len(response.content))
+        request_span.set_attribute("retries", attempt)
+        try:
+            with span("parse_json"):
+                body = response.json()
+        except ValueError:
+            raise ValueError(response.text)
+        return check_response_body(body, response.is_success, response.text)
+
+
+class AsyncGHIN(GHIN):
+    """
+    Asyncio version of the GHIN class. Nothing is requested on construction,
+    use `await AsyncGHIN.create(ghin_number)` or `await golfer.load()` to get
+    the account information, live handicap and last 20 scores.
+    """
+
+    def __init__(
+        self, ghin_number: Union[int, str] = None, keep_raw: bool = False
+    ) -> None:
+        """Initialize the AsyncGHIN class without making any requests"""
+        self.keep_raw = keep_raw
+        self.score_limit: int = 25
+        self.from_date_played: Optional[str] = None
+        self.to_date_played: Optional[str] = None
+        self.last_20: Optional[dict] = None
+        self.roster_errors: dict = {}
+
+        self.ghin_number = self._process_ghin_number_input(ghin_number)
+        self.base_url = f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/scores.json?source=GHINcom"
+        self.scores_url = "https://api2.ghin.com/api/v1/scores.json?source=GHINcom"
+        self.ghin_account_info = None
+        self.handicap = None
+        self.scores = None
+        self.total_scores = None
+        self.highest_score = None
+        self.lowest_score = None
+        self.average_score = None
+
+    @classmethod
+    async def create(
+        cls, ghin_number: Union[int, str] = None, keep_raw: bool = False
+    ) -> "AsyncGHIN":
+        """Create the golfer and load its account, handicap and scores"""
+        golfer = cls(ghin_number, keep_raw)
+        await golfer.load()
+        return golfer
+
+    async def load(self) -> "AsyncGHIN":
+        """Request the account information, live handicap and scores concurrently"""
+        account_info, handicap, _ = await asyncio.gather(
+            self._get_ghin_account_information(),
+            self._get_live_handicap(),
+            self.get_scores_history(),
+        )
+        self._set_account_information(account_info)
+        self._set_live_handicap(handicap)
+        return self
+
+    def prefetch(self) -> "AsyncGHIN":
+        raise RuntimeError("use `await .load()` to prefetch an AsyncGHIN")
+
+    def _load_account_information(self) -> None:
+        raise RuntimeError("await .load() before reading golfer attributes")
+
+    def _load_live_handicap(self) -> None:
+        raise RuntimeError("await .load() before reading golfer attributes")
+
+    async def _make_request(self, url: str, params: Optional[dict] = None) -> dict:
+        """Make a request to the GHIN API and return the response as a dict"""
+        return await request_json(url, params)
+
+    async def _get_ghin_account_information(self) -> dict:
+        """get the date you created the ghin account"""
+        return await self._make_request(
+            self._account_information_url(), self.get_request_params()
+        )
+
+    async def _get_live_handicap(self) -> float:
+        """Return the current handicap for the GHIN number"""
+        response = await self._make_request(
+            self._live_handicap_url(), self.get_request_params()
+        )
+        return self._parse_live_handicap(response)
+
+    async def get_followed_golfers(self) -> list:
+        """return list from the golfers you follow"""
+        response = await self._make_request(self._followed_golfers_url())
+        return response.get("golfers", [])
+
+    async def get_handicap_history(self) -> dict:
+        """Return the handicap history for the GHIN number"""
+        if self.ghin_account_info is None:
+            self._set_account_information(await self._get_ghin_account_information())
+        return await self._make_request(
+            self._handicap_history_url(), self.get_request_params()
+        )
+
+    async def get_scores_history(
+        self, num_of_scores_to_pull: int = 20, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> dict:
+        """
+        return the scores history for the GHIN number
+        the pages after the first one are requested concurrently
+        """
+        page_size = self._scores_page_size(num_of_scores_to_pull)
+        response = await self._make_request(self._scores_page_url(0, page_size))
+        offsets = self._remaining_score_offsets(
+            response, num_of_scores_to_pull, page_size
+        )
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def get_page(offset: int) -> dict:
+            async with semaphore:
+                return await self._make_request(
+                    self._scores_page_url(offset, page_size)
+                )
+
+        pages = [response, *await asyncio.gather(*map(get_page, offsets))]
+        responses = self._merge_score_pages(pages, num_of_scores_to_pull)
+        self._set_scores_stats(responses, response)
+        return responses
+
+    async def sync_scores(
+        self, store: Optional[ScoreStore] = None, page_size: int = 25
+    ) -> int:
+        """Async version of GHIN.sync_scores"""
+        if store is None:
+            store = ScoreStore()
+        known_ids = store.known_score_ids(self.ghin_number)
+        latest_played_at = store.latest_played_at(self.ghin_number)
+        new_scores = []
+        offset_value = 0
+        while True:
+            response = await self._make_request(
+                self._scores_page_url(offset_value, page_size)
+            )
+            page = response["scores"]
+            unseen = [x for x in page if str(x["id"]) not in known_ids]
+            new_scores.extend(unseen)
+            offset_value += len(page)
+            if self._sync_done(
+                response, unseen, offset_value, page_size, latest_played_at
+            ):
+                break
+        store.add_scores(self.ghin_number, new_scores)
+        return len(new_scores)
+
+    async def get_last_20_scores(self) -> dict:
+        """Return the last 20 scores for the GHIN number"""
+        self.set_start_date()
+        self.set_end_date()
+        self.set_score_limit(20)
+        self.last_20 = await self._make_request(
+            self.base_url, self.get_request_params()
+        )
+        return self.last_20
+
+    async def get_range_of_scores(self, start_date: dt.date, end_date: dt.date) -> dict:
+        """Return the last (upto) 100 scores for the GHIN number within the date range"""
+        self.set_start_date(start_date)
+        self.set_end_date(end_date)
+        self.set_score_limit(20)
+        return await self._make_request(self.scores_url, self.get_request_params())
+
+    async def group_handicap_spreads(
+        self,
+        list_of_golfers: list,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> dict:
+        """
+        Async version of GHIN.group_handicap_spreads, up to max_workers
+        golfers are loaded at a time
+        """
+        golfers = {
+            f"{golfer['first_name']} {golfer['last_name']}": golfer["id"]
+            for golfer in list_of_golfers
+        }
+        semaphore = asyncio.Semaphore(max(1, max_workers))
+
+        async def get_spread(ghin_number) -> dict:
+            async with semaphore:
+                golfer = await AsyncGHIN.create(ghin_number)
+            return golfer.get_handicap_spread()
+
+        results = await asyncio.gather(
+            *map(get_spread, golfers.values()), return_exceptions=True
+        )
+        self.roster_errors = {}
+        handicap_spreads = {}
+        for name, result in zip(golfers, results):
+            if isinstance(result, Exception):
+                self.roster_errors[name] = result
+            else:
+                handicap_spreads[name] = result
+        return handicap_spreads
+
+    async def compare_friends(self, save: bool) -> None:
+        """Async version of GHIN.compare_friends, call after .load()"""
+        friend_data = await self.get_followed_golfers()
+        if not friend_data:
+            print("[red]No followed golfers found.[/red]")
+            return
+        spread_data = {self.display_name: self.get_handicap_spread()}
+        spread_data.update(await self.group_handicap_spreads(friend_data))
+        format_handicap_spread(spread_data)
+        if save:
+            with open("outputs/friend_handicap_spreads.json", "w") as f:
+                json.dump(spread_data, f, indent=4)
+
+    def get_handicap_spread(self) -> dict:
+        """Return the best 8, worst 8, and all 20 handicap values"""
+        if self.handicap is None or self.scores is None:
+            raise RuntimeError("await .load() before getting the handicap spread")
+        return super().get_handicap_spread()
+
+
+class AsyncCourse(Course):
+    """Asyncio version of the Course class"""
+
+    async def _make_request(self, url: str, params: Optional[dict] = None) -> dict:
+        """Make a request to the GHIN API and return the response as a dict"""
+        return await request_json(url, params)
+
+    async def get_course_details(
+        self, course_id: str = None, table: bool = False
+    ) -> dict:
+        """Get the course details for a given course id"""
+        if course_id is None:
+            course_id = self.course_id
+        response = await self._make_request(self._course_details_url(course_id))
+        if table:
+            self.format_course_details_table(response)
+        return response
+
+    async def get_course_handicaps(
+        self,
+        ghin_number: str = None,
+        course_id: str = None,
+        table: bool = False,
+        played_at: str = None,
+    ) -> dict:
+        if course_id is None:
+            course_id = self.course_id
+        ghin = ghin_number or self.ghin_number
+        if ghin is None:
+            raise ValueError("No ghin number provided")
+        response = await self._make_request(
+            self._course_handicaps_url(course_id, ghin, played_at)
+        )
+
+        if table:
+            self.format_course_handicaps_table(response, ghin_number)
+
+        return response
+
+    async def verify_course_handicaps(
+        self,
+        ghin_number: str = None,
+        course_id: str = None,
+        handicap_index: float = None,
+    ) -> list:
+        """Async version of Course.verify_course_handicaps"""
+        from ghin.course_handicaps import compare_course_handicaps
+
+        ghin = ghin_number or self.ghin_number
+        if ghin is None:
+            raise ValueError("No ghin number provided")
+        if handicap_index is None:
+            golfer = AsyncGHIN(ghin)
+            handicap_index = await golfer._get_live_handicap()
+        local = self.compute_course_handicaps({ghin: handicap_index}, course_id)[ghin]
+        return compare_course_handicaps(
+            local, await self.get_course_handicaps(ghin, course_id)
+        )
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional
+from urllib.parse import urlencode
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# the first endpoint fragment found in the url decides how long a response
+# is served from disk before it is revalidated against the API
+DEFAULT_TTLS = {
+    "GetCourseDetails.json": 3 * DAY,
+    "course_handicaps.json": DAY,
+    "search.json": DAY,
+    "followed_golfers": HOUR,
+    "scores.json": 30 * MINUTE,
+    "handicap_history.json": 10 * MINUTE,
+}
+DEFAULT_TTL = 5 * MINUTE
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+def get_data_dir() -> Path:
+    """Directory for the local cache and stores, GHIN_DATA_DIR overrides it"""
+    path = Path(os.environ.get("GHIN_DATA_DIR", Path.home() / ".cache" / "ghin"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+class CachedResponse(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: float
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+
+class ResponseCache:
+    """
+    SQLite backed cache of GHIN API response bodies keyed by request url.
+    Entries expire after a per endpoint TTL and are then revalidated with
+    the stored ETag / Last-Modified, the least recently used entries are
+    evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttls: Optional[dict] = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = str(path or get_data_dir() / "responses.sqlite3")
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> str:
+        """Return the cache key for a request url and its query parameters"""
+        params = sorted((k, v) for k, v in (params or {}).items() if v is not None)
+        if not params:
+            return url
+        return f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+
+    def ttl_for(self, url: str) -> float:
+        """Return the number of seconds a response for this url stays fresh"""
+        for endpoint, ttl in self.ttls.items():
+            if endpoint in url:
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the cached response for key, fresh or stale, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, expires_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return CachedResponse(*row)
+
+    def set(
+        self,
+        key: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store a response body, evicting old entries if the cache is full"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    body,
+                    etag,
+                    last_modified,
+                    now + self.ttl_for(key),
+                    now,
+                    len(body),
+                ),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        """Mark an entry as fresh again after the API answered 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+                (now + self.ttl_for(key), now, key),
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries until the cache fits in max_bytes"""
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+
+    def clear(self) -> None:
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
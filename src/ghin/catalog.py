@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ghin.cache import DAY, get_data_dir
+from ghin.courses import Course, HoleCount, TeeSide, summarize_tee_sides
+from ghin.transport import request_json
+
+# course and slope ratings change about once a year
+DEFAULT_MAX_AGE = 30 * DAY
+
+
+class CourseCatalog:
+    """
+    Course details stored locally by course id, with every tee side
+    (see TeeSide) indexed by (gender, rating type). A course is only
+    requested from the API the first time it is seen or once it is older
+    than max_age seconds.
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, max_age: float = DEFAULT_MAX_AGE
+    ) -> None:
+        self.path = str(path or get_data_dir() / "courses.sqlite3")
+        self.max_age = max_age
+        self._details: Dict[str, dict] = {}
+        self._tee_index: Dict[str, Dict[Tuple[str, HoleCount], List[TeeSide]]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS courses (
+                course_id TEXT PRIMARY KEY,
+                fetched_at REAL NOT NULL,
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _remember(self, course_id: str, course_details: dict) -> dict:
+        """Keep the details in memory and index their tee sides"""
+        index = {}
+        for tee_side in summarize_tee_sides(course_details):
+            index.setdefault((tee_side.gender, tee_side.rating_type), []).append(
+                tee_side._replace(course_id=course_id)
+            )
+        with self._lock:
+            self._details[course_id] = course_details
+            self._tee_index[course_id] = index
+        return course_details
+
+    def get_course_details(self, course_id: str, refresh: bool = False) -> dict:
+        """
+        Return the course details from memory, disk or the API, in that
+        order. refresh=True always asks the API.
+        """
+        course_id = str(course_id)
+        if not refresh and course_id in self._details:
+            return self._details[course_id]
+        if not refresh:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT fetched_at, payload FROM courses WHERE course_id = ?",
+                    (course_id,),
+                ).fetchone()
+            if row is not None and time.time() - row[0] < self.max_age:
+                return self._remember(course_id, json.loads(row[1]))
+
+        # refresh goes past the request memo and the response cache's TTL
+        course_details = request_json(
+            Course._course_details_url(course_id), revalidate=refresh
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO courses VALUES (?, ?, ?)",
+                (course_id, time.time(), json.dumps(course_details)),
+            )
+            self._conn.commit()
+        return self._remember(course_id, course_details)
+
+    def tees(
+        self,
+        course_id: str,
+        gender: Optional[str] = None,
+        rating_type: Optional[HoleCount] = None,
+        min_slope: Optional[float] = None,
+        max_slope: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        max_rating: Optional[float] = None,
+    ) -> List[TeeSide]:
+        """
+        Return the tee sides of a course, optionally filtered by gender
+        ("Male"/"Female"), rating type and slope / course rating ranges
+        """
+        course_id = str(course_id)
+        with self._lock:
+            index = self._tee_index.get(course_id)
+        if index is None:
+            self.get_course_details(course_id)
+            with self._lock:
+                index = self._tee_index[course_id]
+        matches = []
+        for (tee_gender, tee_rating_type), tee_sides in index.items():
+            if gender is not None and tee_gender != gender:
+                continue
+            if rating_type is not None and tee_rating_type != rating_type:
+                continue
+            matches.extend(
+                tee_side
+                for tee_side in tee_sides
+                if (min_slope is None or tee_side.slope_rating >= min_slope)
+                and (max_slope is None or tee_side.slope_rating <= max_slope)
+                and (min_rating is None or tee_side.course_rating >= min_rating)
+                and (max_rating is None or tee_side.course_rating <= max_rating)
+            )
+        return matches
+
+    def tee(
+        self,
+        course_id: str,
+        tee_name: str,
+        gender: str,
+        rating_type: HoleCount = HoleCount.TOTAL,
+    ) -> TeeSide:
+        """Return one tee side by its name, raising ValueError if it is missing"""
+        for tee_side in self.tees(course_id, gender, rating_type):
+            if tee_side.tee_name.lower() == tee_name.lower():
+                return tee_side
+        raise ValueError(
+            f"No {gender} {rating_type.value} rating for the {tee_name} tees of course {course_id}"
+        )
+
+
+_catalog: Optional[CourseCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> CourseCatalog:
+    """Return the process wide course catalog"""
+    global _catalog
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CourseCatalog()
+            catalog = _catalog
+    return catalog
@@ -0,0 +1,122 @@
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from ghin.courses import HoleCount, TeeSide
+
+# the tee_set_side values used by the course_handicaps.json endpoint
+TEE_SET_SIDES = {
+    HoleCount.TOTAL: "All18",
+    HoleCount.FRONT: "F9",
+    HoleCount.BACK: "B9",
+}
+
+
+def course_handicap_matrix(
+    handicap_indexes: Sequence[float], tee_sides: Sequence[TeeSide]
+) -> np.ndarray:
+    """
+    Compute the (n_golfers x n_tee_sides) matrix of WHS course handicaps:
+    index x slope / 113 + (course rating - par), rounded to the nearest
+    whole number with .5 rounded up. Front and back sides use half the
+    handicap index. Plus handicaps are negative indexes, as elsewhere in
+    this package, and give negative course handicaps.
+    """
+    indexes = np.asarray(handicap_indexes, dtype=float)[:, None]
+    slope = np.array([tee.slope_rating for tee in tee_sides], dtype=float)
+    rating = np.array([tee.course_rating for tee in tee_sides], dtype=float)
+    par = np.array([tee.par for tee in tee_sides], dtype=float)
+    nine_holes = np.array([tee.rating_type != HoleCount.TOTAL for tee in tee_sides])
+    playing_index = np.where(nine_holes, indexes / 2, indexes)
+    course_handicap = playing_index * slope / 113 + (rating - par)
+    # round the raw value to 4 places first so 12.4999999 is treated as 12.5
+    return np.floor(np.round(course_handicap, 4) + 0.5).astype(int)
+
+
+def course_handicap_grid(
+    handicap_indexes: Sequence[float], tee_sides: Sequence[TeeSide]
+) -> tuple:
+    """
+    Reshape course_handicap_matrix into a (golfers x tees x sides) float
+    array, sides ordered Total, Front, Back with nan where a tee has no
+    rating for that side. Returns the array and the list of (tee name,
+    gender) pairs along the tee axis.
+    """
+    matrix = course_handicap_matrix(handicap_indexes, tee_sides)
+    tees = list(dict.fromkeys((tee.tee_name, tee.gender) for tee in tee_sides))
+    tee_position = {tee: i for i, tee in enumerate(tees)}
+    side_position = {side: i for i, side in enumerate(HoleCount)}
+    grid = np.full((len(matrix), len(tees), len(side_position)), np.nan)
+    for column, tee in enumerate(tee_sides):
+        grid[
+            :,
+            tee_position[(tee.tee_name, tee.gender)],
+            side_position[tee.rating_type],
+        ] = matrix[:, column]
+    return grid, tees
+
+
+def format_course_handicap(course_handicap: int) -> str:
+    """Plus handicaps are shown with a +, the way GHIN displays them"""
+    if course_handicap < 0:
+        return f"+{-course_handicap}"
+    return str(course_handicap)
+
+
+def course_handicaps_response(
+    course_handicaps: Sequence[int], tee_sides: Sequence[TeeSide]
+) -> dict:
+    """
+    Shape one golfer's row of course_handicap_matrix like the
+    course_handicaps.json response, so Course.format_course_handicaps_table
+    can print it
+    """
+    tee_sets: Dict[tuple, dict] = {}
+    for course_handicap, tee in zip(course_handicaps, tee_sides):
+        tee_set = tee_sets.setdefault(
+            (tee.tee_name, tee.gender),
+            {"name": tee.tee_name, "gender": tee.gender, "ratings": []},
+        )
+        tee_set["ratings"].append(
+            {
+                "tee_set_side": TEE_SET_SIDES[tee.rating_type],
+                "course_rating": tee.course_rating,
+                "slope_rating": tee.slope_rating,
+                "par": tee.par,
+                "course_handicap": int(course_handicap),
+                "course_handicap_display": format_course_handicap(course_handicap),
+            }
+        )
+    return {"tee_sets": list(tee_sets.values())}
+
+
+def compare_course_handicaps(local: dict, api: dict) -> List[dict]:
+    """
+    Return the tee sides where a course_handicaps_response and the
+    course_handicaps.json response disagree
+    """
+    api_values = {
+        (tee["name"], tee["gender"], rating["tee_set_side"]): rating[
+            "course_handicap_display"
+        ]
+        for tee in api["tee_sets"]
+        for rating in tee["ratings"]
+    }
+    mismatches = []
+    for tee in local["tee_sets"]:
+        for rating in tee["ratings"]:
+            key = (tee["name"], tee["gender"], rating["tee_set_side"])
+            if (
+                key in api_values
+                and str(api_values[key]) != rating["course_handicap_display"]
+            ):
+                mismatches.append(
+                    {
+                        "tee": tee["name"],
+                        "gender": tee["gender"],
+                        "side": rating["tee_set_side"],
+                        "local": rating["course_handicap_display"],
+                        "api": api_values[key],
+                    }
+                )
+    return mismatches
@@ -1,5 +1,8 @@
+import copy
+import datetime as dt
 import warnings
 from enum import Enum
+from typing import List, NamedTuple
 
 from rich import print
 from rich.table import Table
@@ -13,6 +16,84 @@ class HoleCount(Enum):
     BACK = "Back"
 
 
+HOLE_RANGES = {
+    HoleCount.TOTAL: (0, 18),
+    HoleCount.FRONT: (0, 9),
+    HoleCount.BACK: (9, 18),
+}
+
+
+class TeeSide(NamedTuple):
+    """One rating (Total, Front or Back) of a tee set with its hole aggregates"""
+
+    course_id: str
+    tee_set_id: str
+    tee_name: str
+    gender: str
+    rating_type: HoleCount
+    course_rating: float
+    slope_rating: int
+    bogey_rating: float
+    par: int
+    yardage: int
+    par_3s: int
+    par_4s: int
+    par_5s: int
+    longest_hole_yards: int
+    shortest_hole_yards: int
+    total_par: int
+    total_yardage: int
+
+
+def _hole_aggregates(holes: list) -> dict:
+    """
+    Return par, yardage, par 3/4/5 counts and longest/shortest hole for the
+    total, front and back of a tee in one pass over the holes
+    """
+    per_hole = [(hole["Par"], hole["Length"]) for hole in holes]
+    aggregates = {}
+    for rating_type, (start_hole, end_hole) in HOLE_RANGES.items():
+        side = per_hole[start_hole:end_hole]
+        pars = [par for par, _ in side]
+        lengths = [length for _, length in side]
+        aggregates[rating_type] = {
+            "par": sum(pars),
+            "yardage": sum(lengths),
+            "par_3s": pars.count(3),
+            "par_4s": pars.count(4),
+            "par_5s": pars.count(5),
+            "longest_hole_yards": max(lengths, default=0),
+            "shortest_hole_yards": min(lengths, default=999),
+        }
+    return aggregates
+
+
+def summarize_tee_sides(course_details: dict) -> List[TeeSide]:
+    """Return a TeeSide for every rating of every tee set of a course"""
+    course_id = str(course_details.get("CourseId", ""))
+    tee_sides = []
+    for tee in course_details["TeeSets"]:
+        aggregates = _hole_aggregates(tee["Holes"])
+        for rating in tee["Ratings"]:
+            rating_type = HoleCount(rating["RatingType"])
+            tee_sides.append(
+                TeeSide(
+                    course_id=course_id,
+                    tee_set_id=str(tee.get("TeeSetRatingId", "")),
+                    tee_name=tee["TeeSetRatingName"],
+                    gender=tee["Gender"],
+                    rating_type=rating_type,
+                    course_rating=rating["CourseRating"],
+                    slope_rating=rating["SlopeRating"],
+                    bogey_rating=rating["BogeyRating"],
+                    total_par=tee["TotalPar"],
+                    total_yardage=tee["TotalYardage"],
+                    **aggregates[rating_type],
+                )
+            )
+    return tee_sides
+
+
 class Course(GHIN):
     def __init__(self, course_id: str, ghin_number: str = None):
         self.course_id = course_id
@@ -22,15 +103,38 @@ class Course(GHIN):
                 "No ghin number provided, you will need GHIN to use .get_course_handicaps() method"
             )
 
+    @staticmethod
+    def _course_details_url(course_id: str) -> str:
+        return f"https://api2.ghin.com/api/v1/crsCourseMethods.asmx/GetCourseDetails.json?courseId={course_id}&include_altered_tees=false&source=GHINcom"
+
+    @staticmethod
+    def _course_handicaps_url(
+        course_id: str, ghin_number: str, played_at: str = None
+    ) -> str:
+        if played_at is None:
+            played_at = dt.date.today().isoformat()
+        return f"https://api2.ghin.com/api/v1/course_handicaps.json?course_id={course_id}&golfer_id={ghin_number}&played_at={played_at}&source=GHINcom"
+
     def get_course_details(self, course_id: str = None, table: bool = False) -> dict:
-        """Get the course details for a given course id"""
+        """Get the course details for a given course id from the course catalog"""
+        from ghin.catalog import get_catalog
+
         if course_id is None:
             course_id = self.course_id
-        url = f"https://api2.ghin.com/api/v1/crsCourseMethods.asmx/GetCourseDetails.json?courseId={course_id}&include_altered_tees=false&source=GHINcom"
-        response = self._make_request(url)
+        response = get_catalog().get_course_details(course_id)
         if table:
             self.format_course_details_table(response)
-        return response
+        # the catalog keeps the details in memory for every caller
+        return copy.deepcopy(response)
+
+    def get_tees(self, course_id: str = None, **filters) -> List[TeeSide]:
+        """
+        Return the course's tee sides from the local course catalog, see
+        CourseCatalog.tees() for the gender / rating type / slope filters
+        """
+        from ghin.catalog import get_catalog
+
+        return get_catalog().tees(course_id or self.course_id, **filters)
 
     @staticmethod
     def get_par_hole_counts(
@@ -38,32 +142,14 @@ class Course(GHIN):
         rating_type: HoleCount,
     ) -> tuple:
         """Get the par and hole counts for a given course"""
-        par_3s = 0
-        par_4s = 0
-        par_5s = 0
-        longest_hole_yards = 0
-        shortest_hole_yards = 999
-        if rating_type == HoleCount.TOTAL:
-            start_hole = 0
-            end_hole = 18
-        elif rating_type == HoleCount.FRONT:
-            start_hole = 0
-            end_hole = 9
-        elif rating_type == HoleCount.BACK:
-            start_hole = 9
-            end_hole = 18
-        for hole in course_hole_list[start_hole:end_hole]:
-            if hole["Par"] == 3:
-                par_3s += 1
-            elif hole["Par"] == 4:
-                par_4s += 1
-            elif hole["Par"] == 5:
-                par_5s += 1
-            if hole["Length"] > longest_hole_yards:
-                longest_hole_yards = hole["Length"]
-            if hole["Length"] < shortest_hole_yards:
-                shortest_hole_yards = hole["Length"]
-        return par_3s, par_4s, par_5s, longest_hole_yards, shortest_hole_yards
+        side = _hole_aggregates(course_hole_list)[rating_type]
+        return (
+            side["par_3s"],
+            side["par_4s"],
+            side["par_5s"],
+            side["longest_hole_yards"],
+            side["shortest_hole_yards"],
+        )
 
     def format_course_details_table(self, course_details: dict) -> dict:
         """Format the course details into a dictionary"""
@@ -84,45 +170,118 @@ class Course(GHIN):
         course_details_table.add_column("Longest Hole Yds", style="bold")
         course_details_table.add_column("Shortest Hole Yds", style="bold")
 
-        for tee in course_details["TeeSets"]:
-            for rating in tee["Ratings"]:
-                par_3s, par_4s, par_5s, longest_hole_yards, shortest_hole_yards = (
-                    self.get_par_hole_counts(
-                        tee["Holes"], HoleCount(rating["RatingType"])
-                    )
-                )
-                course_details_table.add_row(
-                    f"[{tee['TeeSetRatingName'].lower()}]{tee['TeeSetRatingName']}",
-                    str(tee["Gender"]),
-                    str(rating["RatingType"]),
-                    str(rating["CourseRating"]),
-                    str(rating["SlopeRating"]),
-                    str(rating["BogeyRating"]),
-                    str(tee["TotalYardage"]),
-                    str(tee["TotalPar"]),
-                    str(par_3s),
-                    str(par_4s),
-                    str(par_5s),
-                    str(longest_hole_yards),
-                    str(shortest_hole_yards),
-                )
+        for tee_side in summarize_tee_sides(course_details):
+            course_details_table.add_row(
+                f"[{tee_side.tee_name.lower()}]{tee_side.tee_name}",
+                str(tee_side.gender),
+                str(tee_side.rating_type.value),
+                str(tee_side.course_rating),
+                str(tee_side.slope_rating),
+                str(tee_side.bogey_rating),
+                str(tee_side.total_yardage),
+                str(tee_side.total_par),
+                str(tee_side.par_3s),
+                str(tee_side.par_4s),
+                str(tee_side.par_5s),
+                str(tee_side.longest_hole_yards),
+                str(tee_side.shortest_hole_yards),
+            )
         print(course_details_table)
 
     def get_course_handicaps(
-        self, ghin_number: str = None, course_id: str = None, table: bool = False
+        self,
+        ghin_number: str = None,
+        course_id: str = None,
+        table: bool = False,
+        played_at: str = None,
     ) -> dict:
         if course_id is None:
             course_id = self.course_id
         ghin = ghin_number or self.ghin_number
         if ghin is None:
             raise ValueError("No ghin number provided")
-        url = f"https://api2.ghin.com/api/v1/course_handicaps.json?course_id={course_id}&golfer_id={ghin}&played_at=2025-07-01&source=GHINcom"
-        response = self._make_request(url)
+        response = self._make_request(
+            self._course_handicaps_url(course_id, ghin, played_at)
+        )
 
         if table:
             self.format_course_handicaps_table(response, ghin_number)
 
-        return response
+        # the response is shared through the request memo
+        return copy.deepcopy(response)
+
+    def compute_course_handicaps(
+        self,
+        handicap_indexes: dict,
+        course_id: str = None,
+        gender: str = None,
+        table: bool = False,
+    ) -> dict:
+        """
+        Compute course handicaps locally for many golfers at once from the
+        course catalog's tee ratings, no request per golfer.
+        handicap_indexes maps the golfer name to their handicap index; the
+        result maps the golfer name to a course_handicaps.json shaped dict
+        """
+        from ghin.course_handicaps import (
+            course_handicap_matrix,
+            course_handicaps_response,
+        )
+
+        tee_sides = self.get_tees(course_id, gender=gender)
+        matrix = course_handicap_matrix(list(handicap_indexes.values()), tee_sides)
+        course_handicaps = {
+            golfer: course_handicaps_response(row, tee_sides)
+            for golfer, row in zip(handicap_indexes, matrix)
+        }
+        if table:
+            for golfer, response in course_handicaps.items():
+                self.format_course_handicaps_table(response, golfer)
+        return course_handicaps
+
+    def verify_course_handicaps(
+        self,
+        ghin_number: str = None,
+        course_id: str = None,
+        handicap_index: float = None,
+    ) -> list:
+        """
+        Compare the locally computed course handicaps of one golfer with the
+        course_handicaps.json endpoint, returns the tee sides that disagree
+        """
+        from ghin.course_handicaps import compare_course_handicaps
+
+        ghin = ghin_number or self.ghin_number
+        if ghin is None:
+            raise ValueError("No ghin number provided")
+        if handicap_index is None:
+            handicap_index = GHIN(ghin).handicap
+        local = self.compute_course_handicaps({ghin: handicap_index}, course_id)[ghin]
+        return compare_course_handicaps(
+            local, self.get_course_handicaps(ghin, course_id)
+        )
+
+    def plan_event(
+        self,
+        tee_name: str,
+        handicap_spreads: dict = None,
+        gender: str = "Male",
+        n_flights: int = 1,
+        group_size: int = 4,
+        table: bool = False,
+    ) -> list:
+        """
+        Flights of balanced groups for an event on one of the course's tees,
+        see events.plan_course_event
+        """
+        from ghin.events import format_event, plan_course_event
+
+        flights = plan_course_event(
+            self.course_id, tee_name, handicap_spreads, gender, n_flights, group_size
+        )
+        if table:
+            format_event(flights)
+        return flights
 
     @staticmethod
     def format_course_handicaps_table(course_handicaps: dict, ghin_number: str) -> dict:
@@ -0,0 +1,283 @@
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from rich import print
+from rich.table import Table
+
+from ghin.catalog import get_catalog
+from ghin.course_handicaps import course_handicap_matrix, format_course_handicap
+from ghin.courses import TeeSide
+from ghin.instrument import instrumented
+from ghin.snapshots import SnapshotStore
+from ghin.util import strip_markup
+
+# how much each group total counts when balancing foursomes: the course
+# handicaps, their squares (so every group gets a similar spread of
+# abilities, not only the same sum), the handicap std devs and recent form
+DEFAULT_WEIGHTS = {
+    "course_handicap": 1.0,
+    "spread": 0.5,
+    "std_dev": 0.25,
+    "form": 0.25,
+}
+DEFAULT_GROUP_SIZE = 4
+DEFAULT_MAX_PASSES = 50
+
+
+class EventPlayer(NamedTuple):
+    golfer: str
+    handicap_index: float
+    course_handicap: int
+    std_dev: float
+    # last 8 rounds minus the handicap index, positive is playing worse
+    form: float
+
+
+def event_players(handicap_spreads: dict, tee: TeeSide) -> List[EventPlayer]:
+    """
+    Return an EventPlayer for every golfer of a dict of golfer name to
+    handicap spread (or a SnapshotStore snapshot) with their course
+    handicap from the tee, lowest course handicap first
+    """
+    golfers = list(handicap_spreads)
+    indexes = [
+        float(strip_markup(handicap_spreads[golfer]["best_8_handicap"]))
+        for golfer in golfers
+    ]
+    course_handicaps = course_handicap_matrix(indexes, [tee])[:, 0]
+    players = []
+    for golfer, index, course_handicap in zip(golfers, indexes, course_handicaps):
+        handicap_spread = handicap_spreads[golfer]
+        last_8 = strip_markup(handicap_spread.get("last_8_rounds", index))
+        players.append(
+            EventPlayer(
+                golfer=golfer,
+                handicap_index=index,
+                course_handicap=int(course_handicap),
+                std_dev=float(strip_markup(handicap_spread.get("handicap_std_dev", 0))),
+                form=round(float(last_8) - index, 1),
+            )
+        )
+    players.sort(key=lambda player: (player.course_handicap, player.golfer))
+    return players
+
+
+def group_sizes(n_players: int, group_size: int = DEFAULT_GROUP_SIZE) -> List[int]:
+    """Split n players into as few groups as possible, sizes differing by at most one"""
+    if group_size < 1:
+        raise ValueError("group_size must be at least 1")
+    if n_players == 0:
+        return []
+    n_groups = math.ceil(n_players / group_size)
+    base, extra = divmod(n_players, n_groups)
+    return [base + 1] * extra + [base] * (n_groups - extra)
+
+
+def build_flights(
+    players: Sequence[EventPlayer],
+    n_flights: int = 1,
+    group_size: int = DEFAULT_GROUP_SIZE,
+) -> List[List[EventPlayer]]:
+    """
+    Split players into n_flights bands of course handicap, lowest first.
+    Flights get whole groups and their group counts differ by at most one.
+    """
+    sizes = group_sizes(len(players), group_size)
+    if not 1 <= n_flights <= max(len(sizes), 1):
+        raise ValueError(f"n_flights must be between 1 and {max(len(sizes), 1)}")
+    ordered = sorted(
+        players, key=lambda player: (player.course_handicap, player.golfer)
+    )
+    base, extra = divmod(len(sizes), n_flights)
+    flights = []
+    start = group = 0
+    for flight in range(n_flights):
+        n_groups = base + (flight < extra)
+        size = sum(sizes[group : group + n_groups])
+        flights.append(ordered[start : start + size])
+        start += size
+        group += n_groups
+    return flights
+
+
+def _features(players: Sequence[EventPlayer], weights: Dict[str, float]) -> np.ndarray:
+    """
+    Weighted, standardized (divided by their std dev across the players)
+    values that are summed per group, so no attribute dominates by scale
+    """
+    course_handicaps = np.array([player.course_handicap for player in players], float)
+    columns = np.column_stack(
+        [
+            course_handicaps,
+            course_handicaps**2,
+            [player.std_dev for player in players],
+            [player.form for player in players],
+        ]
+    )
+    names = ("course_handicap", "spread", "std_dev", "form")
+    std = columns.std(axis=0)
+    std[std == 0] = 1.0
+    factors = np.sqrt([weights.get(name, 0.0) for name in names]) / std
+    return columns * factors
+
+
+def _snake_draft(n_players: int, sizes: List[int]) -> List[List[int]]:
+    """Deal player positions (best first) to the groups back and forth"""
+    groups: List[List[int]] = [[] for _ in sizes]
+    order = list(range(len(sizes)))
+    player = 0
+    while player < n_players:
+        for group in order:
+            if player < n_players and len(groups[group]) < sizes[group]:
+                groups[group].append(player)
+                player += 1
+        order.reverse()
+    return groups
+
+
+def _swap_deltas(
+    features: np.ndarray, groups: np.ndarray, residuals: np.ndarray, scales: np.ndarray
+) -> np.ndarray:
+    """
+    The change of the summed group costs for swapping every pair of
+    players a and b, inf for two players of the same group. The cost of a
+    group is |scale * total - target|^2 and residuals are the scale *
+    total - target of every group, so swapping a (group g) for b (group h)
+    with d = features[b] - features[a] changes it by
+    2 scale_g residual_g.d + scale_g^2 |d|^2 for g and
+    -2 scale_h residual_h.d + scale_h^2 |d|^2 for h.
+    """
+    weighted = (scales[:, None] * residuals)[groups]
+    squared_scales = (scales**2)[groups]
+    products = weighted @ features.T
+    own = np.diag(products)
+    squared = (features**2).sum(axis=1)
+    distances = squared[:, None] + squared[None, :] - 2 * features @ features.T
+    deltas = (
+        2 * (products + products.T - own[:, None] - own[None, :])
+        + (squared_scales[:, None] + squared_scales[None, :]) * distances
+    )
+    deltas[groups[:, None] == groups[None, :]] = np.inf
+    return deltas
+
+
+@instrumented("build_foursomes")
+def build_foursomes(
+    players: Sequence[EventPlayer],
+    group_size: int = DEFAULT_GROUP_SIZE,
+    weights: Optional[Dict[str, float]] = None,
+    max_passes: int = DEFAULT_MAX_PASSES,
+) -> List[List[EventPlayer]]:
+    """
+    Balance players into groups: seed them with a snake draft on course
+    handicap, then swap players between groups while it brings every
+    group's (size adjusted) totals of course handicap, squared course
+    handicap, std dev and form closer to the average group. Every pass
+    prices all swaps at once and makes the best improving swap of as many
+    groups as possible, each group in at most one swap. Stops after a pass
+    without an improving swap or max_passes passes.
+    """
+    players = sorted(
+        players, key=lambda player: (player.course_handicap, player.golfer)
+    )
+    if not players:
+        return []
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    sizes = group_sizes(len(players), group_size)
+    features = _features(players, weights)
+    # the totals of an average full sized group
+    targets = features.sum(axis=0) * group_size / len(players)
+    groups = np.empty(len(players), int)
+    for group, positions in enumerate(_snake_draft(len(players), sizes)):
+        groups[positions] = group
+    scales = group_size / np.array(sizes, float)
+
+    for _ in range(max_passes):
+        totals = np.zeros((len(sizes), features.shape[1]))
+        np.add.at(totals, groups, features)
+        residuals = scales[:, None] * totals - targets
+        deltas = _swap_deltas(features, groups, residuals, scales)
+        partners = deltas.argmin(axis=1)
+        gains = deltas[np.arange(len(players)), partners]
+        swapped = set()
+        for a in np.argsort(gains, kind="stable"):
+            if gains[a] >= -1e-9:
+                break
+            b = partners[a]
+            g, h = groups[a], groups[b]
+            # swaps of disjoint groups do not change each other's delta
+            if g in swapped or h in swapped:
+                continue
+            groups[a], groups[b] = h, g
+            swapped.update((g, h))
+        if not swapped:
+            break
+    return [
+        [players[i] for i in np.flatnonzero(groups == group)]
+        for group in range(len(sizes))
+    ]
+
+
+def plan_event(
+    handicap_spreads: dict,
+    tee: TeeSide,
+    n_flights: int = 1,
+    group_size: int = DEFAULT_GROUP_SIZE,
+    weights: Optional[Dict[str, float]] = None,
+    max_passes: int = DEFAULT_MAX_PASSES,
+) -> List[List[List[EventPlayer]]]:
+    """
+    Flights (lowest course handicaps first) of balanced groups for a dict
+    of golfer name to handicap spread playing one tee. Nothing is
+    requested from the API.
+    """
+    flights = build_flights(event_players(handicap_spreads, tee), n_flights, group_size)
+    return [
+        build_foursomes(flight, group_size, weights, max_passes) for flight in flights
+    ]
+
+
+def plan_course_event(
+    course_id: str,
+    tee_name: str,
+    handicap_spreads: Optional[dict] = None,
+    gender: str = "Male",
+    n_flights: int = 1,
+    group_size: int = DEFAULT_GROUP_SIZE,
+) -> List[List[List[EventPlayer]]]:
+    """
+    plan_event for a tee of a course from the course catalog. Without
+    handicap_spreads the latest snapshot is used, so with a cached course
+    nothing is requested.
+    """
+    if handicap_spreads is None:
+        store = SnapshotStore()
+        latest = store.latest()
+        if latest is None:
+            raise ValueError(
+                "No handicap spreads given and no snapshot stored, "
+                "run golf -f <file> --snapshot first"
+            )
+        handicap_spreads = store.get_snapshot(latest.id)
+    tee = get_catalog().tee(course_id, tee_name, gender)
+    return plan_event(handicap_spreads, tee, n_flights, group_size)
+
+
+def format_event(flights: List[List[List[EventPlayer]]]) -> None:
+    """Print one table per flight with a row per group"""
+    for number, groups in enumerate(flights, start=1):
+        table = Table(title=f"Flight {number}", caption_justify="center")
+        for heading in ("Group", "Players", "Course Handicaps", "Total", "Form"):
+            table.add_column(heading, style="bold")
+        for group_number, group in enumerate(groups, start=1):
+            table.add_row(
+                str(group_number),
+                ", ".join(player.golfer for player in group),
+                ", ".join(
+                    format_course_handicap(player.course_handicap) for player in group
+                ),
+                str(sum(player.course_handicap for player in group)),
+                f"{sum(player.form for player in group):+.1f}",
+            )
+        print(table)
@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from ghin.instrument import instrumented
+from ghin.scores import Score, as_scores
+from ghin.util import strip_markup
+
+FORMATS = ("csv", "ndjson", "parquet")
+EXTENSIONS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+}
+# rows buffered per Parquet row group, nothing else is held in memory
+PARQUET_BATCH_SIZE = 1024
+
+SPREAD_FIELDS = [
+    "golfer",
+    "best_8_handicap",
+    "worst_8_handicap",
+    "last_8_rounds",
+    "last_4_rounds",
+    "all_20_handicap",
+    "drop_4_high_and_low_handicap",
+    "handicap_std_dev",
+    "differential_range",
+    "carry_percentage",
+    "worst_scored_differential",
+    "worst_potential_handicap",
+    "next_4_rounds_to_fall_off_1",
+    "next_4_rounds_to_fall_off_2",
+    "next_4_rounds_to_fall_off_3",
+    "next_4_rounds_to_fall_off_4",
+    "low_handicap",
+    "low_handicap_date",
+    "total_scores",
+    "highest_score",
+    "lowest_score",
+    "average_score",
+]
+SCORE_FIELDS = [
+    "golfer",
+    "id",
+    "played_at",
+    "number_of_holes",
+    "adjusted_gross_score",
+    "differential",
+    "course_id",
+    "tee_set_id",
+]
+# Arrow types of the fields that are not float64
+_STRING_FIELDS = {"golfer", "low_handicap_date", "id", "course_id", "tee_set_id"}
+_INTEGER_FIELDS = {"total_scores", "number_of_holes", "adjusted_gross_score"}
+_DATE_FIELDS = {"played_at"}
+
+
+def spread_record(golfer: str, handicap_spread: dict) -> dict:
+    """
+    One flat row of a handicap spread: numbers stay numbers, rich markup
+    from older outputs is removed and the 4 rounds to fall off get a
+    column each (_1 falls off next)
+    """
+    record = {"golfer": golfer}
+    for metric, value in handicap_spread.items():
+        if metric == "next_4_rounds_to_fall_off":
+            for i, x in enumerate(value[:4]):
+                record[f"{metric}_{i + 1}"] = strip_markup(x)
+        else:
+            record[metric] = strip_markup(value)
+    return {field: record.get(field) for field in SPREAD_FIELDS}
+
+
+def score_record(golfer: Optional[str], score: Score) -> dict:
+    """One row of a score history, dates are written as YYYY-MM-DD"""
+    record = {"golfer": golfer, **score._asdict()}
+    return {field: record[field] for field in SCORE_FIELDS}
+
+
+def get_format(path: str, export_format: Optional[str] = None) -> str:
+    """The export format asked for, or the one matching the file extension"""
+    if export_format is None:
+        export_format = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if export_format not in FORMATS:
+        raise ValueError(
+            f"Unknown export format for {path}, use one of {', '.join(FORMATS)}"
+        )
+    return export_format
+
+
+@contextmanager
+def _open_text(path: str) -> Iterator[TextIO]:
+    """Open path for writing, "-" is stdout"""
+    if path == "-":
+        yield sys.stdout
+    else:
+        with open(path, "w", newline="") as f:
+            yield f
+
+
+def _write_csv(records: Iterable[dict], fields: List[str], path: str) -> int:
+    count = 0
+    with _open_text(path) as f:
+        writer = csv.DictWriter(f, fieldnames=fields, lineterminator="\n")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def _write_ndjson(records: Iterable[dict], path: str) -> int:
+    count = 0
+    with _open_text(path) as f:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+            count += 1
+    return count
+
+
+def _arrow_schema(fields: List[str]):
+    import pyarrow as pa
+
+    def arrow_type(field: str):
+        if field in _STRING_FIELDS:
+            return pa.string()
+        if field in _INTEGER_FIELDS:
+            return pa.int64()
+        if field in _DATE_FIELDS:
+            return pa.date32()
+        return pa.float64()
+
+    return pa.schema([(field, arrow_type(field)) for field in fields])
+
+
+def _write_parquet(records: Iterable[dict], fields: List[str], path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export needs pyarrow, install it with `pip install pyarrow`"
+        ) from e
+
+    schema = _arrow_schema(fields)
+    count = 0
+    batch = []
+    with pq.ParquetWriter(path, schema) as writer:
+        for record in records:
+            batch.append(record)
+            if len(batch) == PARQUET_BATCH_SIZE:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+@instrumented("export")
+def write_records(
+    records: Iterable[dict],
+    fields: List[str],
+    path: str,
+    export_format: Optional[str] = None,
+) -> int:
+    """
+    Stream flat records (dicts with the given fields) to a CSV, NDJSON or
+    Parquet file as they arrive and return how many were written. The
+    format defaults to the one of the file extension.
+    """
+    export_format = get_format(path, export_format)
+    if export_format == "csv":
+        return _write_csv(records, fields, path)
+    if export_format == "ndjson":
+        return _write_ndjson(records, path)
+    if path == "-":
+        raise ValueError("Parquet can not be written to stdout")
+    return _write_parquet(records, fields, path)
+
+
+def export_handicap_spreads(
+    handicap_spreads: Union[dict, Iterable[Tuple[str, dict]]],
+    path: str,
+    export_format: Optional[str] = None,
+) -> int:
+    """
+    Export handicap spreads, a dict of golfer name to handicap spread or an
+    iterable of (golfer, handicap_spread) pairs that is written as it is
+    consumed, so a roster never has to be held in memory
+    """
+    if isinstance(handicap_spreads, dict):
+        handicap_spreads = handicap_spreads.items()
+    records = (spread_record(golfer, spread) for golfer, spread in handicap_spreads)
+    return write_records(records, SPREAD_FIELDS, path, export_format)
+
+
+def export_scores(
+    score_histories: Union[dict, Iterable[Tuple[str, Iterable]]],
+    path: str,
+    export_format: Optional[str] = None,
+) -> int:
+    """
+    Export score histories, a dict (or iterable of pairs) of golfer name to
+    the output of GHIN.get_scores_history(), ScoreStore.get_scores() or a
+    list of Score records, one row per score
+    """
+    if isinstance(score_histories, dict):
+        score_histories = score_histories.items()
+    records = (
+        score_record(golfer, score)
+        for golfer, history in score_histories
+        for score in as_scores(history)
+    )
+    return write_records(records, SCORE_FIELDS, path, export_format)
@@ -1,68 +1,110 @@
+import copy
 import datetime as dt
 import json
 import os
 import statistics
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Union
 
-import requests
-import tqdm
+from dotenv import load_dotenv
 from rich import print
 
-from ghin.header import get_headers
-from ghin.tables import format_handicap_spread
+from ghin.instrument import instrumented
+from ghin.rankings import RankingIndex
+from ghin.roster import DEFAULT_MAX_WORKERS, fetch_handicap_spreads
+from ghin.scores import parse_scores
+from ghin.snapshots import SnapshotStore
+from ghin.store import ScoreStore
+from ghin.tables import falloff_markup, format_handicap_spread
+from ghin.transport import request_json
 from ghin.util import get_differential_distribution, get_low_handicap_value
 
+MAX_SCORES_PER_PAGE = 25
+
+
+class _LazyAttribute:
+    """
+    Attribute that calls the `loader` method on first read. The loader sets
+    the real value on the instance, which then shadows this descriptor.
+    """
+
+    def __init__(self, loader: str) -> None:
+        self.loader = loader
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner: type = None):
+        if instance is None:
+            return self
+        getattr(instance, self.loader)()
+        return instance.__dict__[self.name]
+
 
 class GHIN:
     """Class for interacting with the GHIN API"""
 
-    def __init__(self, ghin_number: Union[int, str] = None) -> None:
-        """Initialize the GHIN class"""
+    def __init__(
+        self, ghin_number: Union[int, str] = None, keep_raw: bool = False
+    ) -> None:
+        """
+        Initialize the GHIN class. keep_raw=True keeps every raw API score
+        (see last_20_scored_rounds), otherwise only the parsed Score records.
+        """
+        self.keep_raw = keep_raw
         self.score_limit: int = 25
         self.from_date_played: Optional[str] = None
         self.to_date_played: Optional[str] = None
         self.last_20: Optional[dict] = None
+        self.roster_errors: dict = {}
 
         self.ghin_number = self._process_ghin_number_input(ghin_number)
-        self.ghin_account_info = self._get_ghin_account_information()
-        self.display_name = (
-            f"{self.ghin_account_info['golfers'][0]['first_name']} "
-            f"{self.ghin_account_info['golfers'][0]['last_name']}"
-        )
-        self.ghin_start_date = (
-            dt.datetime.strptime(
-                self.ghin_account_info["golfers"][0]["created_at"],
-                "%Y-%m-%dT%H:%M:%S.%fZ",
-            )
-            .date()
-            .isoformat()
-        )
-        self.low_handicap_date = self.ghin_account_info["golfers"][0]["low_hi_date"]
-        self.low_handicap = get_low_handicap_value(
-            self.ghin_account_info["golfers"][0]["low_hi_display"]
-        )
-        self.handicap = self._get_live_handicap()
-        if self.low_handicap == "-":
-            self.low_handicap = self.handicap
-            self.low_handicap_date = dt.date.today().isoformat()
+        # account information, live handicap and score attributes are
+        # requested lazily the first time they are read, see prefetch()
 
         self.base_url = f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/scores.json?source=GHINcom"
         self.scores_url = "https://api2.ghin.com/api/v1/scores.json?source=GHINcom"
 
-        # get the last 20 scored rounds
-        # this will set the value for the following attributes:
-        # last_20_scored_rounds, total_scores, highest_score, lowest_score, average_score
-        self.last_20_scored_rounds = None
-        self.total_scores = None
-        self.highest_score = None
-        self.lowest_score = None
-        self.average_score = None
-        self.get_scores_history()
+    # set by _set_account_information
+    ghin_account_info = _LazyAttribute("_load_account_information")
+    display_name = _LazyAttribute("_load_account_information")
+    ghin_start_date = _LazyAttribute("_load_account_information")
+    low_handicap_date = _LazyAttribute("_load_account_information")
+    low_handicap = _LazyAttribute("_load_account_information")
+    # set by _set_live_handicap
+    handicap = _LazyAttribute("_load_live_handicap")
+    # set by _load_scores_history
+    scores = _LazyAttribute("_load_scores_history")
+    total_scores = _LazyAttribute("_load_scores_history")
+    highest_score = _LazyAttribute("_load_scores_history")
+    lowest_score = _LazyAttribute("_load_scores_history")
+    average_score = _LazyAttribute("_load_scores_history")
+
+    def prefetch(self) -> "GHIN":
+        """
+        Request the account information, live handicap and last 20 scores
+        concurrently instead of waiting for each attribute to be read
+        """
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            account_info = executor.submit(self._get_ghin_account_information)
+            handicap = executor.submit(self._get_live_handicap)
+            scores = executor.submit(self._load_scores_history)
+        scores.result()
+        self._set_account_information(account_info.result())
+        self._set_live_handicap(handicap.result())
+        return self
+
+    def _load_account_information(self) -> None:
+        self._set_account_information(self._get_ghin_account_information())
+
+    def _load_live_handicap(self) -> None:
+        self._set_live_handicap(self._get_live_handicap())
 
     @staticmethod
     def _process_ghin_number_input(ghin_number: Union[int, str]) -> str:
         """Process the GHIN number input and return a string"""
         if ghin_number is None:
+            load_dotenv()
             ghin_number = os.environ.get("GHIN_NUMBER")
 
         if ghin_number is None:
@@ -97,74 +139,231 @@ class GHIN:
 
     def _make_request(self, url: str, params: Optional[dict] = None) -> dict:
         """Make a request to the GHIN API and return the response as a dict"""
-        if params is None:
-            params = {}
-        response = requests.get(url, params=params, headers=get_headers())
-        if response.ok and "error" not in response.json():
-            return response.json()
-        elif "error" in response.json():
-            raise ValueError(response.json()["error"])
-        elif "errors" in response.json():
-            raise ValueError(response.json()["errors"])
-        else:
-            raise ValueError(response.text)
+        return request_json(url, params)
 
-    def _get_ghin_account_information(self) -> str:
-        """get the date you created the ghin account"""
-        url = f"https://api2.ghin.com/api/v1/golfers/search.json?golfer_id={self.ghin_number}&page=1&per_page=100&source=GHINcom"
-        response = self._make_request(url, self.get_request_params())
-        return response
+    def _account_information_url(self) -> str:
+        return f"https://api2.ghin.com/api/v1/golfers/search.json?golfer_id={self.ghin_number}&page=1&per_page=100&source=GHINcom"
 
-    def _get_live_handicap(self) -> float:
-        """Return the current handicap for the GHIN number"""
-        url = f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/handicap_history.json?revCount=0&date_begin={dt.date.today().isoformat()}&date_end={dt.date.today().isoformat()}&source=GHINcom"
-        response = self._make_request(url, self.get_request_params())
+    def _live_handicap_url(self) -> str:
+        return f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/handicap_history.json?revCount=0&date_begin={dt.date.today().isoformat()}&date_end={dt.date.today().isoformat()}&source=GHINcom"
+
+    def _handicap_history_url(self) -> str:
+        return f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/handicap_history.json?revCount=0&date_begin={self.ghin_start_date}&date_end={dt.date.today().isoformat()}&source=GHINcom"
+
+    def _followed_golfers_url(self) -> str:
+        return f"https://api2.ghin.com/api/v1/followed_golfers/{self.ghin_number}.json?source=GHINcom"
+
+    def _scores_page_url(self, offset: int, limit: int) -> str:
+        return (
+            "https://api2.ghin.com/api/v1/scores.json?"
+            f"golfer_id={self.ghin_number}"
+            f"&offset={offset}&limit={limit}"
+            "&source=GHINcom"
+        )
+
+    def _set_account_information(self, ghin_account_info: dict) -> None:
+        """Save the account information and the values derived from it"""
+        golfer = ghin_account_info["golfers"][0]
+        self.ghin_account_info = ghin_account_info
+        self.display_name = f"{golfer['first_name']} {golfer['last_name']}"
+        self.ghin_start_date = (
+            dt.datetime.strptime(golfer["created_at"], "%Y-%m-%dT%H:%M:%S.%fZ")
+            .date()
+            .isoformat()
+        )
+        self.low_handicap_date = golfer["low_hi_date"]
+        self.low_handicap = get_low_handicap_value(golfer["low_hi_display"])
+
+    def _set_live_handicap(self, handicap: float) -> None:
+        """Save the live handicap, it is also the low handicap for new golfers"""
+        self.handicap = handicap
+        if self.low_handicap == "-":
+            self.low_handicap = self.handicap
+            self.low_handicap_date = dt.date.today().isoformat()
+
+    @staticmethod
+    def _parse_live_handicap(response: dict) -> float:
+        """Return the current handicap from a handicap_history response"""
         display_handicap = response["handicap_revisions"][0]["Display"]
         if "+" in display_handicap:
             # if the handicap is a plus, we need to convert it to a float
             return float(display_handicap.replace("+", "-"))
         return float(display_handicap)
 
+    def _set_scores_stats(self, responses: dict, response: dict) -> None:
+        """save some of the stats from the last scores API response"""
+        self.total_scores = response.get("total_count")
+        self.highest_score = response.get("highest_score")
+        self.lowest_score = response.get("lowest_score")
+        self.average_score = response.get("average")
+        self.scores = parse_scores(responses, keep_raw=self.keep_raw)
+
+    @property
+    def last_20_scored_rounds(self) -> Optional[dict]:
+        """
+        The scores of the last get_scores_history as API dicts. They are the
+        raw API scores with keep_raw=True, otherwise they are rebuilt from
+        self.scores with only the fields a Score keeps (see Score.to_api).
+        """
+        if self.scores is None:
+            return None
+        return copy.deepcopy({"scores": [score.to_api() for score in self.scores]})
+
+    def _get_ghin_account_information(self) -> dict:
+        """get the date you created the ghin account"""
+        return self._make_request(
+            self._account_information_url(), self.get_request_params()
+        )
+
+    def _get_live_handicap(self) -> float:
+        """Return the current handicap for the GHIN number"""
+        response = self._make_request(
+            self._live_handicap_url(), self.get_request_params()
+        )
+        return self._parse_live_handicap(response)
+
     def get_followed_golfers(self) -> list:
         """return list from the golfers you follow"""
-        url = f"https://api2.ghin.com/api/v1/followed_golfers/{self.ghin_number}.json?source=GHINcom"
-        response = self._make_request(url)
-        return response.get("golfers", [])
+        response = self._make_request(self._followed_golfers_url())
+        # the response is shared through the request memo
+        return copy.deepcopy(response.get("golfers", []))
 
     def get_handicap_history(self) -> dict:
         """Return the handicap history for the GHIN number"""
-        url = f"https://api2.ghin.com/api/v1/golfers/{self.ghin_number}/handicap_history.json?revCount=0&date_begin={self.ghin_start_date}&date_end={dt.date.today().isoformat()}&source=GHINcom"
-        response = self._make_request(url, self.get_request_params())
-        return response
+        return copy.deepcopy(
+            self._make_request(self._handicap_history_url(), self.get_request_params())
+        )
+
+    def get_scores_history(
+        self, num_of_scores_to_pull: int = 20, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> dict:
+        """
+        return the scores history for the GHIN number
+        the first page tells us the total count, the remaining pages are then
+        requested concurrently (up to max_workers at a time) and merged in order
+        """
+        return copy.deepcopy(
+            self._load_scores_history(num_of_scores_to_pull, max_workers)
+        )
+
+    def _load_scores_history(
+        self, num_of_scores_to_pull: int = 20, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> dict:
+        """get_scores_history without the copy, the scores are shared with the memo"""
+        page_size = self._scores_page_size(num_of_scores_to_pull)
+        response = self._make_request(self._scores_page_url(0, page_size))
+        offsets = self._remaining_score_offsets(
+            response, num_of_scores_to_pull, page_size
+        )
+        pages = [response]
+        if max_workers > 1 and len(offsets) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                pages.extend(
+                    executor.map(
+                        lambda offset: self._make_request(
+                            self._scores_page_url(offset, page_size)
+                        ),
+                        offsets,
+                    )
+                )
+        else:
+            for offset in offsets:
+                page = self._make_request(self._scores_page_url(offset, page_size))
+                if not page["scores"]:
+                    break
+                pages.append(page)
+        responses = self._merge_score_pages(pages, num_of_scores_to_pull)
+        self._set_scores_stats(responses, response)
+        return responses
+
+    @staticmethod
+    def _scores_page_size(num_of_scores_to_pull: int) -> int:
+        return max(1, min(num_of_scores_to_pull, MAX_SCORES_PER_PAGE))
+
+    @staticmethod
+    def _remaining_score_offsets(
+        first_page: dict, num_of_scores_to_pull: int, page_size: int
+    ) -> list:
+        """Return the offsets of the pages left to request after the first one"""
+        total_count = first_page.get("total_count") or len(first_page["scores"])
+        return list(
+            range(page_size, min(num_of_scores_to_pull, total_count), page_size)
+        )
 
-    def get_scores_history(self, num_of_scores_to_pull: int = 20) -> dict:
-        """return the scores history for the GHIN number"""
+    @staticmethod
+    def _merge_score_pages(pages: list, num_of_scores_to_pull: int) -> dict:
+        """
+        Merge score pages in offset order, dropping scores that shifted onto
+        a second page when a round was posted in the middle of the pull
+        """
+        seen = set()
+        scores = []
+        for page in pages:
+            for score in page["scores"]:
+                score_id = score.get("id")
+                if score_id is not None and score_id in seen:
+                    continue
+                seen.add(score_id)
+                scores.append(score)
+        return {"scores": scores[:num_of_scores_to_pull]}
+
+    def sync_scores(
+        self, store: Optional[ScoreStore] = None, page_size: int = 25
+    ) -> int:
+        """
+        Pull the scores posted since the last sync into the local score store
+        and return how many new scores were added. Paging stops at the first
+        page that contains an already stored score or only older rounds.
+        """
+        if store is None:
+            store = ScoreStore()
+        known_ids = store.known_score_ids(self.ghin_number)
+        latest_played_at = store.latest_played_at(self.ghin_number)
+        new_scores = []
         offset_value = 0
-        max_scores_per_page = min(num_of_scores_to_pull, 25)
-        responses = {"scores": []}
-        while len(responses["scores"]) < num_of_scores_to_pull:
-            url = (
-                "https://api2.ghin.com/api/v1/scores.json?"
-                f"golfer_id={self.ghin_number}"
-                f"&offset={offset_value}&limit={max_scores_per_page}"
-                "&source=GHINcom"
-            )
+        while True:
+            url = self._scores_page_url(offset_value, page_size)
             response = self._make_request(url)
-            responses["scores"].extend(response["scores"])
-            offset_value += max_scores_per_page
-            if response.get("total_count") < num_of_scores_to_pull:
+            page = response["scores"]
+            unseen = [x for x in page if str(x["id"]) not in known_ids]
+            new_scores.extend(unseen)
+            offset_value += len(page)
+            if self._sync_done(
+                response, unseen, offset_value, page_size, latest_played_at
+            ):
                 break
-        # save some of the stats from the API response
-        self.total_scores = response.get("total_count")
-        self.highest_score = response.get("highest_score")
-        self.lowest_score = response.get("lowest_score")
-        self.average_score = response.get("average")
-        self.last_20_scored_rounds = responses
-        return responses
+        store.add_scores(self.ghin_number, new_scores)
+        return len(new_scores)
 
-    def compare_friends(self, save: bool) -> None:
+    @staticmethod
+    def _sync_done(
+        response: dict,
+        unseen: list,
+        offset_value: int,
+        page_size: int,
+        latest_played_at: Optional[str],
+    ) -> bool:
+        """Whether sync_scores has reached scores it already stored"""
+        page = response["scores"]
+        return (
+            len(unseen) < len(page)
+            or len(page) < page_size
+            or offset_value >= (response.get("total_count") or 0)
+            or (
+                latest_played_at is not None
+                and (page[-1].get("played_at") or "") < latest_played_at
+            )
+        )
+
+    def compare_friends(
+        self,
+        save: bool,
+        use_service_state: bool = False,
+        max_age: Optional[float] = None,
+    ) -> None:
         """
-        Method to compare you and your friend's handicaps in tables
+        Method to compare you and your friend's handicaps in tables, see
+        group_handicap_spreads for use_service_state and max_age
         """
         friend_data = self.get_followed_golfers()
         if not friend_data:
@@ -174,7 +373,9 @@ class GHIN:
         spread_data = {
             self.display_name: my_spread,
         }
-        friend_spreads = self.group_handicap_spreads(friend_data)
+        friend_spreads = self.group_handicap_spreads(
+            friend_data, use_service_state=use_service_state, max_age=max_age
+        )
         spread_data.update(friend_spreads)
         format_handicap_spread(spread_data)
         if save:
@@ -190,12 +391,7 @@ class GHIN:
         green checkmarks if the round is a scoring one
         red x if the round is a non-scoring one
         """
-        return [
-            f"[green]{float(x):.1f}[/green]"
-            if x <= highest_scored_round
-            else f"[red]{float(x):.1f}[/red]"
-            for x in differential
-        ]
+        return falloff_markup(differential, highest_scored_round)
 
     def get_last_20_scores(self) -> dict:
         """Return the last 20 scores for the GHIN number"""
@@ -203,7 +399,7 @@ class GHIN:
         self.set_end_date()
         self.set_score_limit(20)
         params = self.get_request_params()
-        self.last_20 = self._make_request(self.base_url, params)
+        self.last_20 = copy.deepcopy(self._make_request(self.base_url, params))
         return self.last_20
 
     def get_range_of_scores(self, start_date: dt.date, end_date: dt.date) -> dict:
@@ -212,16 +408,12 @@ class GHIN:
         self.set_end_date(end_date)
         self.set_score_limit(20)
         params = self.get_request_params()
-        return self._make_request(self.scores_url, params)
+        return copy.deepcopy(self._make_request(self.scores_url, params))
 
+    @instrumented("get_handicap_spread")
     def get_handicap_spread(self) -> dict:
         """Return the best 8, worst 8, and all 20 handicap values"""
-        if self.last_20_scored_rounds is None:
-            self.get_scores_history()
-        differential = [
-            x.get("scaled_up_differential") or x.get("differential")
-            for x in self.last_20_scored_rounds["scores"]
-        ]
+        differential = [x.differential for x in self.scores]
         # before sorting on differential, get the average of the most recent 8 rounds
         most_recent_eight = round(sum(differential[:8]) / 8, 1)
         most_recent_four = round(sum(differential[:4]) / 4, 1)
@@ -236,13 +428,12 @@ class GHIN:
         extraordinary_round_score = get_differential_distribution(
             differential[:8], self.handicap
         )
-        next_four_rounds_to_fall_off = self.next_four_rounds_to_fall_off(
-            falling_off_rounds, differential[7]
-        )
+        # plain numbers, tables.format_handicap_spread adds the colors
+        next_four_rounds_to_fall_off = [round(float(x), 1) for x in falling_off_rounds]
         worst_potential_handicap = (
-            f"[yellow]{round(sum(differential[1:9]) / 8, 1)}[/yellow]"
+            round(sum(differential[1:9]) / 8, 1)
             if falling_off_rounds[0] <= differential[7]
-            else f"[green]{self.handicap}[/green]"
+            else self.handicap
         )
 
         return {
@@ -266,50 +457,123 @@ class GHIN:
             "average_score": self.average_score,
         }
 
-    def group_handicap_spreads(self, list_of_golfers: list) -> dict:
-        """Return a dictionary of handicap spreads for a list of golfers"""
-        handicap_spreads = {}
-        pbar = tqdm.tqdm(list_of_golfers, desc="Processing golfers")
-        for golfer in pbar:
-            display_name = f"{golfer['first_name']} {golfer['last_name']}"
-            pbar.set_description(f"Processing {display_name}")
-            try:
-                g = GHIN(golfer["id"])
-            except Exception as e:
-                print(
-                    f"[red]ERROR[/red] getting handicap spread for {golfer['id']}: {e}"
-                )
-                continue
-            hs = g.get_handicap_spread()
-            handicap_spreads[display_name] = hs
+    def project_handicap(
+        self, n_rounds: int = 10, n_simulations: int = 2000, seed: Optional[int] = None
+    ) -> dict:
+        """
+        Simulate the next n_rounds from the last 20 differentials and return
+        the handicap index percentile bands after each round
+        (see projection.project_handicaps)
+        """
+        from ghin.projection import project_handicaps, projection_bands
+        from ghin.spreads import differential_matrix
+
+        bands = project_handicaps(
+            differential_matrix([self.scores]),
+            n_rounds=n_rounds,
+            n_simulations=n_simulations,
+            seed=seed,
+        )
+        return projection_bands([self.display_name], bands)[self.display_name]
+
+    def target_scores(
+        self,
+        target: float,
+        rounds: int = 4,
+        course_id: Optional[str] = None,
+        gender: Optional[str] = None,
+    ) -> dict:
+        """
+        Return the differential needed in each of the next `rounds` rounds
+        to get to a target handicap index (see targets.required_differentials)
+        and, for a course, the adjusted gross score needed from each 18 hole
+        tee, optionally only the tees for one gender ("Male"/"Female")
+        """
+        from ghin.catalog import get_catalog
+        from ghin.courses import HoleCount
+        from ghin.targets import required_differentials, target_gross_scores
+
+        differentials = [x.differential for x in self.scores[:20]]
+        result = {
+            "target": target,
+            "differentials": required_differentials(differentials, target, rounds),
+        }
+        if course_id is not None:
+            tee_sides = get_catalog().tees(course_id, gender, HoleCount.TOTAL)
+            result["gross_scores"] = target_gross_scores(
+                differentials, target, tee_sides, rounds
+            )
+        return result
+
+    def group_handicap_spreads(
+        self,
+        list_of_golfers: list,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        use_service_state: bool = False,
+        max_age: Optional[float] = None,
+    ) -> dict:
+        """
+        Return a dictionary of handicap spreads for a list of golfers.
+        Golfers are fetched concurrently, up to max_workers at a time; any
+        golfer that fails is left out and its error is kept in self.roster_errors.
+        With use_service_state=True golfers the refresh service (golf --serve)
+        keeps fresh are read from its state instead, see
+        service.warm_handicap_spreads for max_age.
+        """
+        golfers = {
+            f"{golfer['first_name']} {golfer['last_name']}": golfer["id"]
+            for golfer in list_of_golfers
+        }
+        handicap_spreads, self.roster_errors = GHIN._handicap_spreads(
+            golfers, max_workers, use_service_state, max_age
+        )
         return handicap_spreads
 
     @staticmethod
-    def table_of_golfers(file_path: str, anonymize: bool = False):
+    def _handicap_spreads(
+        golfers: dict,
+        max_workers: int,
+        use_service_state: bool,
+        max_age: Optional[float],
+    ) -> tuple:
+        if not use_service_state:
+            return fetch_handicap_spreads(golfers, max_workers, golfer_cls=GHIN)
+        from ghin.service import warm_handicap_spreads
+
+        return warm_handicap_spreads(golfers, max_workers, max_age, golfer_cls=GHIN)
+
+    @staticmethod
+    def table_of_golfers(
+        file_path: str,
+        anonymize: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        snapshot: bool = False,
+        use_service_state: bool = False,
+        max_age: Optional[float] = None,
+    ):
         """
-        Table of golfers and their handicap spreads
+        Table of golfers and their handicap spreads, optionally stored in
+        the snapshot store and ranking index (before anonymizing) so later
+        runs can be diffed and ranked. See group_handicap_spreads for
+        use_service_state and max_age.
         """
         with open(file_path, "r") as f:
             golfers = json.load(f)
 
-        handicap_spreads = {}
-        pbar = tqdm.tqdm(golfers.items(), desc="Processing golfers")
-        for golfer, ghin_num in pbar:
-            pbar.set_description(f"Processing {golfer}")
-            try:
-                g = GHIN(ghin_num)
-            except Exception as e:
-                print(f"[red]ERROR[/red] getting handicap spread for {golfer}: {e}")
-                continue
-            hs = g.get_handicap_spread()
-            handicap_spreads[golfer] = hs
-            # print(f"{golfer}:{g.ghin_number}: {g.handicap} {hs}")
+        handicap_spreads, errors = GHIN._handicap_spreads(
+            golfers, max_workers, use_service_state, max_age
+        )
 
+        if snapshot:
+            SnapshotStore().add_snapshot(handicap_spreads)
+            RankingIndex().update_many(handicap_spreads)
         if anonymize:
             handicap_spreads = {
                 f"golfer_{i}": hs for i, hs in enumerate(handicap_spreads.values())
             }
         format_handicap_spread(handicap_spreads)
+        for golfer, error in errors.items():
+            print(f"[red]ERROR[/red] getting handicap spread for {golfer}: {error}")
 
         with open("outputs/output.json", "w") as f:
             json.dump(handicap_spreads, f)
@@ -2,10 +2,9 @@ import os
 
 from dotenv import load_dotenv
 
-load_dotenv(override=True)
-
 
 def get_headers():
+    load_dotenv(override=True)
     return {
         "authority": "api2.ghin.com",
         "accept": "application/json, text/plain, */*",
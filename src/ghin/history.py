@@ -0,0 +1,119 @@
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from ghin.roster import DEFAULT_MAX_WORKERS
+from ghin.util import get_low_handicap_value
+
+DateLike = Union[str, dt.date, np.datetime64]
+
+
+class HandicapHistory:
+    """
+    Handicap revisions of one golfer parsed once into numpy arrays,
+    oldest revision first. `dates` are datetime64[D], `values` the handicap
+    index and `low_values` the low handicap index (float32, nan if missing).
+    """
+
+    __slots__ = ("dates", "values", "low_values")
+
+    def __init__(
+        self, dates: np.ndarray, values: np.ndarray, low_values: np.ndarray
+    ) -> None:
+        self.dates = dates
+        self.values = values
+        self.low_values = low_values
+
+    @classmethod
+    def from_response(cls, handicap_history: dict) -> "HandicapHistory":
+        """Parse the output of the GHIN.get_handicap_history() method"""
+        revisions = handicap_history["handicap_revisions"]
+        dates = np.array([x["RevDate"][:10] for x in revisions], dtype="datetime64[D]")
+        values = np.array([x["Value"] for x in revisions], dtype=np.float32)
+        low_values = np.array(
+            [get_low_handicap_value(x["LowHIDisplay"]) for x in revisions],
+            dtype=np.float32,
+        )
+        order = np.argsort(dates, kind="stable")
+        return cls(dates[order], values[order], low_values[order])
+
+    @classmethod
+    def coerce(
+        cls, handicap_history: Union[dict, "HandicapHistory"]
+    ) -> "HandicapHistory":
+        """Return a HandicapHistory from either an API response or a HandicapHistory"""
+        if isinstance(handicap_history, cls):
+            return handicap_history
+        return cls.from_response(handicap_history)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def between(
+        self, start: Optional[DateLike] = None, end: Optional[DateLike] = None
+    ) -> "HandicapHistory":
+        """Return the revisions between start and end (both inclusive)"""
+        lo = (
+            0
+            if start is None
+            else np.searchsorted(self.dates, np.datetime64(start, "D"))
+        )
+        hi = (
+            len(self)
+            if end is None
+            else np.searchsorted(self.dates, np.datetime64(end, "D"), side="right")
+        )
+        return HandicapHistory(
+            self.dates[lo:hi], self.values[lo:hi], self.low_values[lo:hi]
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the revisions as a DataFrame with date, value and low_value columns"""
+        return pd.DataFrame(
+            {"date": self.dates, "value": self.values, "low_value": self.low_values}
+        )
+
+    @staticmethod
+    def batch(histories: dict) -> pd.DataFrame:
+        """
+        Combine many golfers' histories into one long format DataFrame with
+        golfer, date, value and low_value columns. histories maps the golfer
+        name to a HandicapHistory or a GHIN.get_handicap_history() response.
+        """
+        parsed = {
+            golfer: HandicapHistory.coerce(history)
+            for golfer, history in histories.items()
+        }
+        lengths = [len(history) for history in parsed.values()]
+        if not parsed:
+            return pd.DataFrame(columns=["golfer", "date", "value", "low_value"])
+        return pd.DataFrame(
+            {
+                "golfer": pd.Categorical(np.repeat(list(parsed), lengths)),
+                "date": np.concatenate([h.dates for h in parsed.values()]),
+                "value": np.concatenate([h.values for h in parsed.values()]),
+                "low_value": np.concatenate([h.low_values for h in parsed.values()]),
+            }
+        )
+
+    @staticmethod
+    def from_golfers(
+        golfers: dict, max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> pd.DataFrame:
+        """
+        Request the handicap history of a dictionary of golfer names (keys)
+        and GHIN numbers (values) concurrently and return HandicapHistory.batch()
+        """
+        from ghin.ghin import GHIN
+
+        def get_history(ghin_number: str) -> HandicapHistory:
+            return HandicapHistory.from_response(
+                GHIN(ghin_number).get_handicap_history()
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            histories = dict(zip(golfers, executor.map(get_history, golfers.values())))
+        return HandicapHistory.batch(histories)
@@ -0,0 +1,232 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+from ghin.cache import DEFAULT_TTLS
+
+# upper bounds (milliseconds) of the request latency histogram buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Span:
+    """
+    One timed operation: a GHIN API request ("request") or an analytics or
+    rendering function. Attributes describe it, for a request: endpoint,
+    cache (memo / hit / miss / revalidated / off), status, bytes and retries.
+    """
+
+    __slots__ = ("name", "attributes", "start", "duration")
+
+    def __init__(self, name: str, attributes: dict) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+
+class _NoSpan:
+    """Stand in for Span while no hook is registered, so spans cost nothing"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+_hooks: List[Callable[[Span], None]] = []
+
+
+def add_hook(hook: Callable[[Span], None]) -> Callable[[Span], None]:
+    """
+    Register a callable that receives every finished Span, e.g. to forward
+    them to OpenTelemetry or a log. Returns the hook so it can be removed.
+    """
+    _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook: Callable[[Span], None]) -> None:
+    """Unregister a hook added with add_hook"""
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """Time the enclosed block and hand the Span to every hook"""
+    if not _hooks:
+        yield _NO_SPAN
+        return
+    current = Span(name, attributes)
+    try:
+        yield current
+    except Exception as e:
+        current.set_attribute("error", type(e).__name__)
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        for hook in list(_hooks):
+            hook(current)
+
+
+def instrumented(name: str) -> Callable:
+    """Decorator that runs the function inside span(name)"""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return function(*args, **kwargs)
+            with span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def endpoint_name(url: str) -> str:
+    """The GHIN endpoint of a url, e.g. scores.json or followed_golfers"""
+    for fragment in DEFAULT_TTLS:
+        if fragment in url:
+            return fragment
+    return urlsplit(url).path.rsplit("/", 1)[-1]
+
+
+class Profiler:
+    """
+    Hook that aggregates spans: per endpoint request counts, latency
+    histograms, bytes, cache hits / misses and retries, and the total time
+    spent in every other span (get_handicap_spread, format_handicap_spread,
+    ...). Spans nest, get_handicap_spread includes the requests it makes
+    for lazily loaded attributes. Use as a context manager to register and
+    unregister it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, dict] = {}
+        self.operations: Dict[str, dict] = {}
+
+    def __call__(self, finished: Span) -> None:
+        with self._lock:
+            if finished.name == "request":
+                self._add_request(finished)
+            else:
+                operation = self.operations.setdefault(
+                    finished.name, {"calls": 0, "seconds": 0.0}
+                )
+                operation["calls"] += 1
+                operation["seconds"] += finished.duration
+
+    def _add_request(self, finished: Span) -> None:
+        attributes = finished.attributes
+        endpoint = self.endpoints.setdefault(
+            attributes.get("endpoint", "unknown"),
+            {
+                "requests": 0,
+                "seconds": 0.0,
+                "bytes": 0,
+                "retries": 0,
+                "errors": 0,
+                "cache": {},
+                "histogram": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            },
+        )
+        endpoint["requests"] += 1
+        endpoint["seconds"] += finished.duration
+        endpoint["bytes"] += attributes.get("bytes", 0)
+        endpoint["retries"] += attributes.get("retries", 0)
+        endpoint["errors"] += "error" in attributes
+        cache = attributes.get("cache", "off")
+        endpoint["cache"][cache] = endpoint["cache"].get(cache, 0) + 1
+        bucket = bisect.bisect_left(LATENCY_BUCKETS_MS, finished.duration * 1000)
+        endpoint["histogram"][bucket] += 1
+
+    def __enter__(self) -> "Profiler":
+        add_hook(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        remove_hook(self)
+
+    def summary(self) -> dict:
+        """Return the aggregated endpoints and operations"""
+        with self._lock:
+            return {
+                "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+                "endpoints": {
+                    name: {**values, "cache": dict(values["cache"])}
+                    for name, values in self.endpoints.items()
+                },
+                "operations": {
+                    name: dict(values) for name, values in self.operations.items()
+                },
+            }
+
+    def print_summary(self, console: Optional[object] = None) -> None:
+        """Print the summary as rich tables (to stderr unless a console is given)"""
+        from rich.console import Console
+        from rich.table import Table
+
+        console = console or Console(stderr=True)
+        summary = self.summary()
+        requests_table = Table(title="GHIN API Requests", caption_justify="center")
+        for heading in (
+            "Endpoint",
+            "Calls",
+            "Total s",
+            "p50 ms",
+            "p95 ms",
+            "KB",
+            "Memo/Hit/Miss/304",
+            "Retry",
+            "Err",
+        ):
+            requests_table.add_column(heading, style="bold")
+        for name, values in sorted(summary["endpoints"].items()):
+            cache = values["cache"]
+            requests_table.add_row(
+                name,
+                str(values["requests"]),
+                f"{values['seconds']:.2f}",
+                _histogram_percentile(values["histogram"], 0.5),
+                _histogram_percentile(values["histogram"], 0.95),
+                f"{values['bytes'] / 1024:.0f}",
+                f"{cache.get('memo', 0)}/{cache.get('hit', 0)}/{cache.get('miss', 0)}/{cache.get('revalidated', 0)}",
+                str(values["retries"]),
+                str(values["errors"]),
+            )
+        operations_table = Table(title="Time Spent", caption_justify="center")
+        for heading in ("Operation", "Calls", "Total s", "Mean ms"):
+            operations_table.add_column(heading, style="bold")
+        for name, values in sorted(
+            summary["operations"].items(), key=lambda item: -item[1]["seconds"]
+        ):
+            operations_table.add_row(
+                name,
+                str(values["calls"]),
+                f"{values['seconds']:.2f}",
+                f"{values['seconds'] * 1000 / values['calls']:.1f}",
+            )
+        console.print(requests_table)
+        console.print(operations_table)
+
+
+def _histogram_percentile(histogram: List[int], quantile: float) -> str:
+    """Upper bound of the histogram bucket holding the quantile, e.g. "<=250" """
+    target = quantile * sum(histogram)
+    seen = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, histogram):
+        seen += count
+        if seen >= target:
+            return f"<={bound}"
+    return f">{LATENCY_BUCKETS_MS[-1]}"
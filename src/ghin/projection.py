@@ -0,0 +1,124 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ghin.instrument import instrumented
+from ghin.util import WHS_LOWEST_DIFFERENTIALS
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+ROUNDS = 20
+SCORING_ROUNDS = 8
+
+# number of lowest differentials averaged and the adjustment, by score count
+_LOWEST = np.zeros(ROUNDS + 1, dtype=int)
+_ADJUSTMENT = np.zeros(ROUNDS + 1)
+for _count, (_lowest, _adjustment) in WHS_LOWEST_DIFFERENTIALS.items():
+    _LOWEST[_count] = _lowest
+    _ADJUSTMENT[_count] = _adjustment
+
+
+def _handicap_index(windows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    WHS handicap index of every window (last axis, nan padded) given the
+    number of scores in it, one count per golfer along the first axis: the
+    mean of the lowest 1 to 8 differentials plus the adjustment for short
+    records, nan below 3 scores
+    """
+    lowest = np.partition(windows, SCORING_ROUNDS - 1, axis=-1)[..., :SCORING_ROUNDS]
+    n_lowest = _LOWEST[counts]
+    # full windows average all 8 without sorting them, only golfers with
+    # short records need the lowest n of the 8
+    total = lowest.sum(axis=-1)
+    short = np.flatnonzero(n_lowest < SCORING_ROUNDS)
+    if len(short):
+        cumsum = np.cumsum(np.nan_to_num(np.sort(lowest[short], axis=-1)), axis=-1)
+        total[short] = np.take_along_axis(
+            cumsum,
+            np.broadcast_to(
+                np.maximum(n_lowest[short] - 1, 0)[:, None, None],
+                cumsum.shape[:-1] + (1,),
+            ),
+            axis=-1,
+        )[..., 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        index = total / n_lowest[:, None] + _ADJUSTMENT[counts][:, None]
+    return np.where(n_lowest[:, None] > 0, np.round(index, 1), np.nan)
+
+
+@instrumented("project_handicaps")
+def project_handicaps(
+    differentials: np.ndarray,
+    n_rounds: int = 10,
+    n_simulations: int = 2000,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Monte Carlo projection of the handicap index over the next n_rounds.
+    differentials is an (n_golfers x 20) matrix, most recent round first and
+    nan padded (see spreads.differential_matrix). Every simulated round is
+    drawn from the golfer's own last 20 differentials, the oldest round
+    falls out of the 20 round window as each new one is added, and the index
+    follows the WHS best 8 of 20 (fewer for short records).
+    Returns an (n_golfers x n_rounds x len(percentiles)) array of index
+    percentiles after each simulated round.
+    """
+    rng = np.random.default_rng(seed)
+    differentials = np.asarray(differentials, dtype=np.float32)[:, :ROUNDS]
+    n_golfers, width = differentials.shape
+    if width < ROUNDS:
+        differentials = np.pad(
+            differentials, ((0, 0), (0, ROUNDS - width)), constant_values=np.nan
+        )
+    counts = np.count_nonzero(~np.isnan(differentials), axis=1)
+
+    # sample from each golfer's own rounds, golfers without scores stay nan
+    draws = (
+        rng.random((n_golfers, n_simulations, n_rounds)) * counts[:, None, None]
+    ).astype(int)
+    rows = np.arange(n_golfers)[:, None, None]
+    simulated = np.where(
+        counts[:, None, None] > 0, differentials[rows, draws], np.nan
+    ).astype(np.float32)
+
+    # newest simulated round first, followed by the current record; after
+    # round j the window is the 20 values starting at n_rounds - 1 - j
+    extended = np.concatenate(
+        [
+            simulated[..., ::-1],
+            np.broadcast_to(
+                differentials[:, None, :], (n_golfers, n_simulations, ROUNDS)
+            ),
+        ],
+        axis=-1,
+    )
+    projected = np.empty((n_golfers, n_simulations, n_rounds), dtype=np.float32)
+    for round_number in range(n_rounds):
+        start = n_rounds - 1 - round_number
+        window_counts = np.minimum(counts + round_number + 1, ROUNDS)
+        window_counts = np.where(counts > 0, window_counts, 0)
+        projected[..., round_number] = _handicap_index(
+            extended[..., start : start + ROUNDS], window_counts
+        )
+    # a golfer's projected index is nan in every simulation (fewer than 3
+    # scores) or in none, so plain percentiles are safe
+    bands = np.percentile(projected, percentiles, axis=1)
+    return np.moveaxis(bands, 0, -1)
+
+
+def projection_bands(
+    names: Sequence[str],
+    bands: np.ndarray,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """
+    Turn the output of project_handicaps into a dict of golfer name to
+    {"p10": [index after round 1, round 2, ...], "p25": [...], ...}
+    """
+    return {
+        name: {
+            f"p{percentile:g}": [round(float(x), 1) for x in bands[i, :, j]]
+            for j, percentile in enumerate(percentiles)
+        }
+        for i, name in enumerate(names)
+    }
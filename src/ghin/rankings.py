@@ -0,0 +1,187 @@
+import bisect
+import math
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ghin.cache import get_data_dir
+from ghin.snapshots import _flatten
+
+# metrics computed from the others, a positive trend is playing worse than
+# the handicap index
+DERIVED_METRICS: Dict[str, Callable[[dict], float]] = {
+    "last_8_trend": lambda values: values["last_8_rounds"] - values["best_8_handicap"],
+    "last_4_trend": lambda values: values["last_4_rounds"] - values["best_8_handicap"],
+}
+
+
+def ranking_values(handicap_spread: dict) -> Dict[str, float]:
+    """
+    The numeric metrics of a handicap spread plus the DERIVED_METRICS.
+    NaN and infinite values (e.g. from golfers with too few rounds) are left
+    out, they can not be stored or ordered.
+    """
+    values = {
+        metric: value
+        for metric, value, _ in _flatten(handicap_spread)
+        if value is not None and math.isfinite(value)
+    }
+    for metric, derive in DERIVED_METRICS.items():
+        try:
+            values[metric] = round(derive(values), 1)
+        except KeyError:
+            pass
+    return values
+
+
+class RankingIndex:
+    """
+    Leaderboard of every numeric handicap spread metric (best_8_handicap,
+    handicap_std_dev, carry_percentage, last_8_trend, ...) kept as one
+    sorted list of (value, golfer) per metric, lowest first. The lists are
+    loaded from SQLite once and then maintained with bisect, so lookups
+    never sort and re-syncing a golfer only moves that golfer's entries.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = str(path or get_data_dir() / "rankings.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rankings (
+                metric TEXT NOT NULL,
+                golfer TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (metric, golfer)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        self._sorted: Dict[str, List[Tuple[float, str]]] = {}
+        self._values: Dict[str, Dict[str, float]] = {}
+        for metric, golfer, value in self._conn.execute(
+            "SELECT metric, golfer, value FROM rankings ORDER BY metric, value, golfer"
+        ):
+            self._sorted.setdefault(metric, []).append((value, golfer))
+            self._values.setdefault(golfer, {})[metric] = value
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, golfer: str) -> bool:
+        return golfer in self._values
+
+    def metrics(self) -> List[str]:
+        """Return the names of the ranked metrics"""
+        return sorted(self._sorted)
+
+    def _remove(self, golfer: str) -> None:
+        for metric, value in self._values.pop(golfer, {}).items():
+            entries = self._sorted[metric]
+            del entries[bisect.bisect_left(entries, (value, golfer))]
+
+    def _insert(self, golfer: str, values: Dict[str, float]) -> None:
+        self._values[golfer] = values
+        for metric, value in values.items():
+            bisect.insort(self._sorted.setdefault(metric, []), (value, golfer))
+
+    def update(self, golfer: str, handicap_spread: dict) -> None:
+        """Add a golfer's handicap spread, replacing their previous entries"""
+        self.update_many({golfer: handicap_spread})
+
+    def update_many(self, handicap_spreads: dict) -> None:
+        """Add a dict of golfer name to handicap spread in one transaction"""
+        values = {
+            golfer: ranking_values(handicap_spread)
+            for golfer, handicap_spread in handicap_spreads.items()
+        }
+        with self._lock:
+            for golfer, golfer_values in values.items():
+                self._remove(golfer)
+                self._insert(golfer, golfer_values)
+            self._conn.executemany(
+                "DELETE FROM rankings WHERE golfer = ?",
+                ((golfer,) for golfer in values),
+            )
+            self._conn.executemany(
+                "INSERT INTO rankings VALUES (?, ?, ?)",
+                (
+                    (metric, golfer, value)
+                    for golfer, golfer_values in values.items()
+                    for metric, value in golfer_values.items()
+                ),
+            )
+            self._conn.commit()
+
+    def remove(self, golfer: str) -> None:
+        """Drop a golfer from every ranking"""
+        with self._lock:
+            self._remove(golfer)
+            self._conn.execute("DELETE FROM rankings WHERE golfer = ?", (golfer,))
+            self._conn.commit()
+
+    def _entries(self, metric: str) -> List[Tuple[float, str]]:
+        if metric not in self._sorted:
+            raise ValueError(
+                f"Unknown metric {metric}, use one of {', '.join(self.metrics())}"
+            )
+        return self._sorted[metric]
+
+    def value(self, metric: str, golfer: str) -> Optional[float]:
+        """Return a golfer's value of a metric, None if it is not ranked"""
+        return self._values.get(golfer, {}).get(metric)
+
+    def top(
+        self, metric: str, k: int = 10, highest: bool = False
+    ) -> List[Tuple[str, float]]:
+        """Return the k (golfer, value) pairs with the lowest (or highest) value"""
+        with self._lock:
+            entries = self._entries(metric)
+            chosen = entries[: -k - 1 : -1] if highest else entries[:k]
+        return [(golfer, value) for value, golfer in chosen]
+
+    def rank(self, metric: str, golfer: str) -> Optional[int]:
+        """Return a golfer's 1 based position, lowest value first"""
+        with self._lock:
+            value = self.value(metric, golfer)
+            if value is None:
+                return None
+            return bisect.bisect_left(self._entries(metric), (value,)) + 1
+
+    def percentile(self, metric: str, golfer: str) -> Optional[float]:
+        """Return the percentage of ranked golfers with a lower value"""
+        with self._lock:
+            value = self.value(metric, golfer)
+            if value is None:
+                return None
+            entries = self._entries(metric)
+            return 100 * bisect.bisect_left(entries, (value,)) / len(entries)
+
+    def value_at_percentile(self, metric: str, percentile: float) -> float:
+        """Return the value at a percentile (0 is the lowest, 100 the highest)"""
+        if not 0 <= percentile <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        with self._lock:
+            entries = self._entries(metric)
+            if not entries:
+                raise ValueError(f"No golfers are ranked on {metric}")
+            return entries[round(percentile / 100 * (len(entries) - 1))][0]
+
+    def near(self, metric: str, value: float, k: int = 5) -> List[Tuple[str, float]]:
+        """Return the k (golfer, value) pairs closest to a value, closest first"""
+        with self._lock:
+            entries = self._entries(metric)
+            high = bisect.bisect_left(entries, (value,))
+            low = high - 1
+            nearest = []
+            while len(nearest) < k and (low >= 0 or high < len(entries)):
+                if high >= len(entries) or (
+                    low >= 0 and value - entries[low][0] <= entries[high][0] - value
+                ):
+                    nearest.append(entries[low])
+                    low -= 1
+                else:
+                    nearest.append(entries[high])
+                    high += 1
+        return [(golfer, x) for x, golfer in nearest]
@@ -0,0 +1,90 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, Optional, Tuple
+
+# the GHIN API starts answering 429 when hammered, keep the default modest
+DEFAULT_MAX_WORKERS = 4
+
+
+def _get_handicap_spread(golfer_cls: Callable, ghin_number: str) -> dict:
+    """Build the golfer and return their handicap spread"""
+    return golfer_cls(ghin_number).get_handicap_spread()
+
+
+def iter_handicap_spreads(
+    golfers: dict,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    golfer_cls: Optional[Callable] = None,
+    progress: bool = True,
+) -> Iterator[Tuple[str, Optional[dict], Optional[Exception]]]:
+    """
+    Fetch handicap spreads for a dictionary of golfer names (keys) and GHIN
+    numbers (values) with at most `max_workers` golfers in flight at once.
+    Yields (name, handicap_spread, None) or (name, None, error) as each
+    golfer completes, so the order is completion order, not roster order.
+    """
+    # tqdm is slow to import, only pay for it when a roster is fetched
+    import tqdm
+
+    if golfer_cls is None:
+        from ghin.ghin import GHIN
+
+        golfer_cls = GHIN
+
+    max_workers = max(1, max_workers)
+    pending = iter(golfers.items())
+    in_flight = {}
+    pbar = tqdm.tqdm(
+        total=len(golfers), desc="Processing golfers", disable=not progress
+    )
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_next() -> bool:
+            try:
+                name, ghin_number = next(pending)
+            except StopIteration:
+                return False
+            future = executor.submit(_get_handicap_spread, golfer_cls, ghin_number)
+            in_flight[future] = name
+            return True
+
+        # only queue as many golfers as there are workers so the progress bar
+        # reflects what is actually being requested
+        while len(in_flight) < max_workers and submit_next():
+            pass
+        while in_flight:
+            pbar.set_postfix(in_flight=len(in_flight))
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = in_flight.pop(future)
+                pbar.update(1)
+                error = future.exception()
+                if error is None:
+                    yield name, future.result(), None
+                else:
+                    yield name, None, error
+                submit_next()
+    pbar.close()
+
+
+def fetch_handicap_spreads(
+    golfers: dict,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    golfer_cls: Optional[Callable] = None,
+    progress: bool = True,
+) -> Tuple[dict, dict]:
+    """
+    Concurrently fetch handicap spreads for a roster of golfers.
+    Returns the handicap_spreads dict (in roster order) and a dict of the
+    golfers that failed mapped to their error.
+    """
+    results = {}
+    errors = {}
+    for name, handicap_spread, error in iter_handicap_spreads(
+        golfers, max_workers, golfer_cls, progress
+    ):
+        if error is None:
+            results[name] = handicap_spread
+        else:
+            errors[name] = error
+    handicap_spreads = {name: results[name] for name in golfers if name in results}
+    return handicap_spreads, errors
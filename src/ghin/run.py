@@ -1,6 +1,34 @@
+from ghin.export import EXTENSIONS, export_handicap_spreads, export_scores
 from ghin.ghin import GHIN
-from argparse import ArgumentParser
+from ghin.instrument import Profiler
+from ghin.rankings import RankingIndex
+from ghin.roster import (
+    DEFAULT_MAX_WORKERS,
+    fetch_handicap_spreads,
+    iter_handicap_spreads,
+)
+from ghin.service import DEFAULT_RATE, RefreshService, warm_handicap_spreads
+from ghin.snapshots import SnapshotStore
+from ghin.store import ScoreStore
+from ghin.tables import format_handicap_spread, stream_handicap_spreads
+from ghin.transport import (
+    DEFAULT_POOL_SIZE,
+    DEFAULT_RETRIES,
+    configure_cache,
+    configure_session,
+)
+from argparse import ArgumentParser, ArgumentTypeError
+import datetime as dt
 import json
+import os
+
+
+def positive_int(value):
+    """argparse type for options that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def read_file(file_path):
@@ -8,9 +36,58 @@ def read_file(file_path):
         return json.load(f)
 
 
-def save_file(data):
-    with open("output.json", "w") as f:
-        json.dump(data, f, indent=4)
+def save_file(data, export_format="json", path=None):
+    if export_format == "json":
+        with open(path or "output.json", "w") as f:
+            json.dump(data, f, indent=4)
+    else:
+        export_handicap_spreads(data, path or f"output.{export_format}", export_format)
+
+
+def export_roster(golfers, max_workers, export_format, path=None):
+    """Write each golfer's handicap spread as soon as it is fetched"""
+    errors = {}
+
+    def completed():
+        for golfer, handicap_spread, error in iter_handicap_spreads(
+            golfers, max_workers
+        ):
+            if error is None:
+                yield golfer, handicap_spread
+            else:
+                errors[golfer] = error
+
+    export_handicap_spreads(
+        completed(), path or f"output.{export_format}", export_format
+    )
+    return errors
+
+
+def export_score_histories(golfers, export_format, path=None):
+    """Sync every golfer's scores to the local store and export all of them"""
+    store = ScoreStore()
+
+    def score_histories():
+        for golfer, ghin_number in golfers.items():
+            GHIN(ghin_number).sync_scores(store)
+            yield golfer, store.get_score_records(ghin_number)
+
+    return export_scores(
+        score_histories(), path or f"scores.{export_format}", export_format
+    )
+
+
+def serve(golfers, max_workers, rate, playing=None):
+    """Keep a roster fresh until interrupted, see service.RefreshService"""
+    service = RefreshService(max_workers=max_workers, rate=rate)
+    service.add_golfers(golfers)
+    if playing:
+        service.mark_playing(golfers[name] for name in playing)
+    print(f"Keeping {len(service.state.golfers())} golfers fresh, Ctrl+C to stop")
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        service.stop()
 
 
 def main():
@@ -41,30 +118,264 @@ def main():
         help="Hide output from console. Hiding output will automatically save the data too.",
     )
 
+    parser.add_argument(
+        "--max-workers",
+        type=positive_int,
+        default=DEFAULT_MAX_WORKERS,
+        help="Number of golfers to fetch at the same time when importing a file",
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=DEFAULT_POOL_SIZE,
+        help="Number of keep-alive connections to keep open to the GHIN API",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=30.0,
+        help="Seconds to wait for a GHIN API response before giving up",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Times to retry a request that was rate limited (429) or failed (5xx)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the on-disk GHIN response cache",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Revalidate every cached response with the GHIN API",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Show golfers as they are fetched (tab separated lines when not printing to a terminal)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["json", "csv", "ndjson", "parquet"],
+        help="Format of the saved output (json by default, or from the --output extension)",
+    )
+    parser.add_argument(
+        "--output",
+        help="File to save the output to, - writes csv or ndjson to stdout",
+    )
+    parser.add_argument(
+        "--export-scores",
+        action="store_true",
+        help="Export every posted score of the golfer(s) instead of the handicap spreads (csv by default)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print where the time went (API requests per endpoint, parsing, rendering) to stderr",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Store the handicap spreads in the local snapshot store and ranking index",
+    )
+    parser.add_argument(
+        "--movers",
+        type=int,
+        metavar="DAYS",
+        help="Print the golfers whose handicap moved most since the snapshot taken DAYS ago",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep the golfers (-f) fresh in the background, refreshing active golfers first",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="Requests per second --serve sends to the GHIN API",
+    )
+    parser.add_argument(
+        "--use-service-state",
+        action="store_true",
+        help="Read golfers (-f) that a running --serve keeps fresh from its state instead of fetching them",
+    )
+    parser.add_argument(
+        "--playing",
+        nargs="+",
+        metavar="NAME",
+        help="Golfers (names from -f) playing today, --serve refreshes them every 15 minutes",
+    )
+    parser.add_argument(
+        "--event",
+        metavar="COURSE_ID",
+        help="Print balanced flights and foursomes for an event at a course (the golfers fetched, or the latest snapshot)",
+    )
+    parser.add_argument(
+        "--tee",
+        help="Tee name the event is played from, e.g. Blue",
+    )
+    parser.add_argument(
+        "--gender",
+        default="Male",
+        choices=["Male", "Female"],
+        help="Gender of the tee rating used for the event",
+    )
+    parser.add_argument(
+        "--flights",
+        type=int,
+        default=1,
+        help="Number of flights to split the event into",
+    )
+    parser.add_argument(
+        "--leaderboard",
+        metavar="METRIC",
+        help="Print the 10 lowest golfers of a metric (e.g. best_8_handicap, last_8_trend) from the ranking index",
+    )
+
     cli_args = parser.parse_args()
-    # check to see if file-import is an argument
-    cli_args
+    if not cli_args.profile:
+        run(parser, cli_args)
+        return
+    with Profiler() as profiler:
+        try:
+            run(parser, cli_args)
+        finally:
+            profiler.print_summary()
+
+
+def output_format(parser, cli_args):
+    """The --format, or the one of the --output extension, None if neither says"""
+    export_format = cli_args.format
+    if cli_args.output == "-":
+        if export_format not in ("csv", "ndjson"):
+            parser.error("--output - writes csv or ndjson, choose one with --format")
+    elif export_format is None and cli_args.output:
+        extension = os.path.splitext(cli_args.output)[1].lower()
+        export_format = "json" if extension == ".json" else EXTENSIONS.get(extension)
+    return export_format
+
+
+def run(parser, cli_args):
+    configure_cache(enabled=not cli_args.no_cache, refresh=cli_args.refresh)
+    configure_session(
+        pool_size=max(cli_args.pool_size, cli_args.max_workers),
+        timeout=cli_args.timeout,
+        retries=cli_args.retries,
+    )
+    export_format = output_format(parser, cli_args)
+
+    golfers = {}
+    if cli_args.file_import:
+        golfers = read_file(cli_args.file_import)
+    elif cli_args.ghin_number:
+        golfers = {"My Handicaps": cli_args.ghin_number}
+
+    if cli_args.serve:
+        unknown = set(cli_args.playing or ()) - set(golfers)
+        if unknown:
+            parser.error(f"--playing golfers not in the roster: {', '.join(unknown)}")
+        serve(golfers, cli_args.max_workers, cli_args.rate, cli_args.playing)
+        return
+
+    if cli_args.export_scores:
+        if export_format == "json":
+            parser.error("--export-scores writes csv, ndjson or parquet")
+        export_score_histories(golfers, export_format or "csv", cli_args.output)
+        return
+    export_format = export_format or "json"
+
+    # a roster that is only saved is written golfer by golfer
+    if (
+        cli_args.file_import
+        and cli_args.hide_output
+        and cli_args.save_output
+        and export_format != "json"
+        and not cli_args.snapshot
+    ):
+        errors = export_roster(
+            golfers, cli_args.max_workers, export_format, cli_args.output
+        )
+        for golfer, error in errors.items():
+            print(f"ERROR getting handicap spread for {golfer}: {error}")
+        return
+
     handicap_spreads = {}
 
-    if file := cli_args.file_import:
-        golfers = read_file(file)
-        for golfer, ghin_num in golfers.items():
-            g = GHIN(ghin_num)
-            hs = g.get_handicap_spread()
-            handicap_spreads[golfer] = hs
-            # print(f"{golfer}:{g.ghin_number}: {g.handicap}")
+    if cli_args.file_import:
+        if cli_args.stream and not cli_args.hide_output:
+            handicap_spreads, errors = stream_handicap_spreads(
+                iter_handicap_spreads(golfers, cli_args.max_workers, progress=False),
+                total=len(golfers),
+            )
+        elif cli_args.use_service_state:
+            # golfers kept fresh by golf --serve are read from its state
+            handicap_spreads, errors = warm_handicap_spreads(
+                golfers, cli_args.max_workers, 0 if cli_args.refresh else None
+            )
+        else:
+            handicap_spreads, errors = fetch_handicap_spreads(
+                golfers, cli_args.max_workers
+            )
+        for golfer, error in errors.items():
+            print(f"ERROR getting handicap spread for {golfer}: {error}")
 
     elif golfer := cli_args.ghin_number:
         g = GHIN(golfer)
         hs = g.get_handicap_spread()
         handicap_spreads["My Handicaps"] = hs
 
-    if cli_args.save_output:
-        save_file(handicap_spreads)
+    # --movers, --leaderboard and --event without -f / -gn only read the stores
+    if cli_args.save_output and handicap_spreads:
+        save_file(handicap_spreads, export_format, cli_args.output)
+
+    if cli_args.snapshot and handicap_spreads:
+        SnapshotStore().add_snapshot(handicap_spreads)
+        RankingIndex().update_many(handicap_spreads)
+
+    if not cli_args.hide_output and handicap_spreads:
+        if not (cli_args.stream and cli_args.file_import):
+            format_handicap_spread(handicap_spreads)
+        save_file(handicap_spreads, export_format, cli_args.output)
+
+    if cli_args.movers is not None:
+        since = dt.datetime.now() - dt.timedelta(days=cli_args.movers)
+        for mover in SnapshotStore().movers(since):
+            print(
+                f"{mover['golfer']}: {mover['old']:.1f} -> {mover['new']:.1f} "
+                f"({mover['change']:+.1f})"
+            )
+
+    if cli_args.event:
+        if not cli_args.tee:
+            parser.error("--event needs --tee")
+        from ghin.events import format_event, plan_course_event
+
+        try:
+            flights = plan_course_event(
+                cli_args.event,
+                cli_args.tee,
+                handicap_spreads or None,
+                gender=cli_args.gender,
+                n_flights=cli_args.flights,
+            )
+        except ValueError as e:
+            parser.error(str(e))
+        format_event(flights)
 
-    if not cli_args.hide_output:
-        g.format_handicap_spread(handicap_spreads)
-        save_file(handicap_spreads)
+    if cli_args.leaderboard:
+        rankings = RankingIndex()
+        try:
+            leaders = rankings.top(cli_args.leaderboard)
+        except ValueError as e:
+            parser.error(str(e))
+        for position, (golfer, value) in enumerate(leaders, start=1):
+            percentile = rankings.percentile(cli_args.leaderboard, golfer)
+            print(f"{position}. {golfer}: {value:.1f} ({percentile:.0f}th percentile)")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+import datetime as dt
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+from ghin.instrument import instrumented
+from ghin.util import get_played_date
+
+
+def get_score_differential(score: dict) -> float:
+    """Return the (scaled up for 9 holes) differential of a raw score dict"""
+    return score.get("scaled_up_differential") or score.get("differential")
+
+
+class Score(NamedTuple):
+    """
+    One posted score parsed from the scores.json endpoint. The raw API dict
+    is only kept when asked for with keep_raw=True.
+    """
+
+    id: Optional[str]
+    played_at: dt.date
+    number_of_holes: int
+    adjusted_gross_score: Optional[int]
+    differential: Optional[float]
+    course_id: Optional[str]
+    tee_set_id: Optional[str]
+    raw: Optional[dict] = None
+
+    @classmethod
+    def from_api(cls, score: dict, keep_raw: bool = False) -> "Score":
+        """Parse a raw score dict from the GHIN API"""
+        score_id = score.get("id")
+        course_id = score.get("course_id")
+        tee_set_id = score.get("tee_set_id")
+        return cls(
+            id=None if score_id is None else str(score_id),
+            played_at=get_played_date(score["played_at"]).date(),
+            number_of_holes=score.get("number_of_holes"),
+            adjusted_gross_score=score.get("adjusted_gross_score"),
+            differential=get_score_differential(score),
+            course_id=None if course_id is None else str(course_id),
+            tee_set_id=None if tee_set_id is None else str(tee_set_id),
+            raw=score if keep_raw else None,
+        )
+
+    def to_api(self) -> dict:
+        """
+        The raw API dict when it was kept, otherwise an API style dict of
+        the fields a Score keeps (differential is the scaled up one)
+        """
+        if self.raw is not None:
+            return self.raw
+        return {
+            "id": self.id,
+            "played_at": self.played_at.isoformat(),
+            "number_of_holes": self.number_of_holes,
+            "adjusted_gross_score": self.adjusted_gross_score,
+            "differential": self.differential,
+            "course_id": self.course_id,
+            "tee_set_id": self.tee_set_id,
+        }
+
+
+@instrumented("parse_scores")
+def parse_scores(
+    all_scores: Union[dict, Iterable[dict]], keep_raw: bool = False
+) -> List[Score]:
+    """
+    Parse the output of GHIN.get_scores_history() (or a list of raw score
+    dicts) into Score records, keeping the API order
+    """
+    if isinstance(all_scores, dict):
+        all_scores = all_scores["scores"]
+    return [Score.from_api(score, keep_raw) for score in all_scores]
+
+
+def as_scores(all_scores: Union[dict, Iterable]) -> List[Score]:
+    """Return Score records from either raw API scores or Score records"""
+    if isinstance(all_scores, dict):
+        return parse_scores(all_scores)
+    all_scores = list(all_scores)
+    if all_scores and not isinstance(all_scores[0], Score):
+        return parse_scores(all_scores)
+    return all_scores
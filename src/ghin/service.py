@@ -0,0 +1,414 @@
+import datetime as dt
+import heapq
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from rich import print
+
+from ghin.cache import DAY, HOUR, MINUTE, get_data_dir
+from ghin.ghin import GHIN
+from ghin.rankings import RankingIndex
+from ghin.roster import DEFAULT_MAX_WORKERS, fetch_handicap_spreads
+from ghin.transport import TokenBucket, request_json
+
+# seconds between refreshes of a golfer by how active they are
+REFRESH_INTERVALS = {
+    "playing": 15 * MINUTE,
+    "active": HOUR,
+    "recent": 6 * HOUR,
+    "dormant": 3 * DAY,
+}
+# a golfer is active when they played in the last ACTIVE_DAYS days, recent
+# within RECENT_DAYS, dormant otherwise
+ACTIVE_DAYS = 7
+RECENT_DAYS = 30
+# failed refreshes are retried after FAILURE_BACKOFF, doubling up to a day
+FAILURE_BACKOFF = 5 * MINUTE
+# requests per second sent to the GHIN API, a refresh is about 3 requests
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+
+
+class GolferState(NamedTuple):
+    ghin_number: str
+    name: str
+    next_refresh: float
+    refreshed_at: Optional[float]
+    # ISO date of the most recent round in the last refresh
+    last_played: Optional[str]
+    # ISO date the golfer was marked as playing on
+    playing_on: Optional[str]
+    failures: int
+    handicap_spread: Optional[dict]
+
+
+def activity_tier(state: GolferState, today: Optional[dt.date] = None) -> str:
+    """The REFRESH_INTERVALS key of a golfer: playing, active, recent or dormant"""
+    today = today or dt.date.today()
+    if state.playing_on == today.isoformat():
+        return "playing"
+    if state.last_played is None:
+        return "dormant"
+    days = (today - dt.date.fromisoformat(state.last_played)).days
+    if days <= ACTIVE_DAYS:
+        return "active"
+    if days <= RECENT_DAYS:
+        return "recent"
+    return "dormant"
+
+
+def refresh_interval(state: GolferState, today: Optional[dt.date] = None) -> float:
+    """Seconds until a golfer is due again after a successful refresh"""
+    return REFRESH_INTERVALS[activity_tier(state, today)]
+
+
+def is_fresh(state: GolferState, max_age: Optional[float] = None) -> bool:
+    """
+    Whether a golfer's stored handicap spread can be used: refreshed within
+    max_age seconds, or within their refresh interval when max_age is None
+    """
+    if state.handicap_spread is None or state.refreshed_at is None:
+        return False
+    if max_age is None:
+        max_age = refresh_interval(state)
+    return time.time() - state.refreshed_at <= max_age
+
+
+class RefreshGHIN(GHIN):
+    """
+    GHIN whose requests revalidate cached responses (a refresh is not
+    answered from a TTL, revalidating costs a 304 when nothing changed)
+    and wait on the service's token bucket. Only this golfer's requests
+    are affected, not the rest of the process.
+    """
+
+    def __init__(
+        self, ghin_number: str, rate_limiter: Optional[TokenBucket] = None
+    ) -> None:
+        self.rate_limiter = rate_limiter
+        super().__init__(ghin_number)
+
+    def _make_request(self, url: str, params: Optional[dict] = None) -> dict:
+        return request_json(
+            url, params, revalidate=True, rate_limiter=self.rate_limiter
+        )
+
+
+class ServiceState:
+    """
+    SQLite store of the roster the refresh service keeps warm: every
+    golfer's schedule and their last handicap spread, so the service picks
+    up where it left off after a restart and other processes can read it.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = str(path or get_data_dir() / "service.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS golfers (
+                ghin_number TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                next_refresh REAL NOT NULL,
+                refreshed_at REAL,
+                last_played TEXT,
+                playing_on TEXT,
+                failures INTEGER NOT NULL DEFAULT 0,
+                handicap_spread TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _state(row: tuple) -> GolferState:
+        spread = row[-1]
+        return GolferState(*row[:-1], None if spread is None else json.loads(spread))
+
+    def add_golfers(self, golfers: dict) -> None:
+        """Add a dict of golfer name to GHIN number, new golfers are due now"""
+        with self._lock:
+            self._conn.executemany(
+                """
+                INSERT INTO golfers (ghin_number, name, next_refresh) VALUES (?, ?, ?)
+                ON CONFLICT (ghin_number) DO UPDATE SET name = excluded.name
+                """,
+                (
+                    (str(ghin_number), name, time.time())
+                    for name, ghin_number in golfers.items()
+                ),
+            )
+            self._conn.commit()
+
+    def get(self, ghin_number: str) -> Optional[GolferState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM golfers WHERE ghin_number = ?", (str(ghin_number),)
+            ).fetchone()
+        return None if row is None else self._state(row)
+
+    def golfers(self) -> List[GolferState]:
+        """Return every golfer, soonest due first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM golfers ORDER BY next_refresh"
+            ).fetchall()
+        return [self._state(row) for row in rows]
+
+    def save(self, state: GolferState) -> None:
+        spread = state.handicap_spread
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO golfers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*state[:-1], None if spread is None else json.dumps(spread)),
+            )
+            self._conn.commit()
+
+    def mark_playing(
+        self, ghin_numbers: Iterable[str], day: Optional[dt.date] = None
+    ) -> None:
+        """Mark golfers as playing on a day (today by default) and make them due now"""
+        day = day or dt.date.today()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE golfers SET playing_on = ?, next_refresh = ? "
+                "WHERE ghin_number = ?",
+                (
+                    (day.isoformat(), time.time(), str(ghin_number))
+                    for ghin_number in ghin_numbers
+                ),
+            )
+            self._conn.commit()
+
+    def handicap_spreads(
+        self, golfers: dict, max_age: Optional[float] = None
+    ) -> Tuple[dict, dict]:
+        """
+        Split a dict of golfer name to GHIN number into the handicap spreads
+        that are fresh in the store (see is_fresh) and the golfers that
+        still have to be fetched
+        """
+        found = {}
+        missing = {}
+        for name, ghin_number in golfers.items():
+            state = self.get(ghin_number)
+            if state is not None and is_fresh(state, max_age):
+                found[name] = state.handicap_spread
+            else:
+                missing[name] = ghin_number
+        return found, missing
+
+
+def warm_handicap_spreads(
+    golfers: dict,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    max_age: Optional[float] = None,
+    golfer_cls: Optional[Callable] = None,
+) -> Tuple[dict, dict]:
+    """
+    fetch_handicap_spreads that reads the golfers the refresh service keeps
+    fresh from its state (see is_fresh, a dormant golfer's can be days
+    old) and only fetches the rest, max_age=0 fetches all
+    """
+    found, missing = {}, golfers
+    if max_age != 0:
+        found, missing = ServiceState().handicap_spreads(golfers, max_age)
+    fetched, errors = {}, {}
+    if missing:
+        fetched, errors = fetch_handicap_spreads(missing, max_workers, golfer_cls)
+    handicap_spreads = {
+        name: found[name] if name in found else fetched[name]
+        for name in golfers
+        if name in found or name in fetched
+    }
+    return handicap_spreads, errors
+
+
+class RefreshService:
+    """
+    Long running refresher of the golfers in a ServiceState. Golfers sit in
+    a heap ordered by when they are due, which depends on their activity
+    (see REFRESH_INTERVALS), the service's requests revalidate the cache
+    and go through its own token bucket (see RefreshGHIN) and concurrent
+    refreshes of the same golfer share one call. Every refresh is saved to
+    the state and updates the golfer in the ranking index.
+    """
+
+    def __init__(
+        self,
+        state: Optional[ServiceState] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        rate: Optional[float] = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        rankings: Optional[RankingIndex] = None,
+    ) -> None:
+        self.state = state or ServiceState()
+        self.max_workers = max(1, max_workers)
+        self.rankings = rankings if rankings is not None else RankingIndex()
+        self.rate_limiter = None if rate is None else TokenBucket(rate, burst)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._in_flight: Dict[str, Future] = {}
+        self._due: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        # consecutive refreshes of a golfer that raised, see _run_refresh
+        self._errors: Dict[str, int] = {}
+        for golfer in self.state.golfers():
+            self.schedule(golfer.ghin_number, golfer.next_refresh)
+
+    def schedule(self, ghin_number: str, when: Optional[float] = None) -> None:
+        """(Re)schedule a golfer's next refresh, now by default"""
+        when = time.time() if when is None else when
+        with self._lock:
+            self._due[ghin_number] = when
+            heapq.heappush(self._heap, (when, ghin_number))
+        self._wake.set()
+
+    def add_golfers(self, golfers: dict) -> None:
+        """Add a dict of golfer name to GHIN number to the state and schedule"""
+        self.state.add_golfers(golfers)
+        for ghin_number in golfers.values():
+            state = self.state.get(ghin_number)
+            self.schedule(state.ghin_number, state.next_refresh)
+
+    def mark_playing(self, ghin_numbers: Iterable[str]) -> None:
+        """Refresh golfers playing today now and every REFRESH_INTERVALS["playing"]"""
+        ghin_numbers = [str(ghin_number) for ghin_number in ghin_numbers]
+        self.state.mark_playing(ghin_numbers)
+        for ghin_number in ghin_numbers:
+            self.schedule(ghin_number)
+
+    def _pop_due(self) -> Tuple[Optional[str], float]:
+        """Return the next due golfer, or None and the seconds until one is"""
+        with self._lock:
+            while self._heap:
+                when, ghin_number = self._heap[0]
+                if self._due.get(ghin_number) != when:
+                    # rescheduled since this entry was pushed
+                    heapq.heappop(self._heap)
+                    continue
+                wait = when - time.time()
+                if wait > 0:
+                    return None, wait
+                heapq.heappop(self._heap)
+                del self._due[ghin_number]
+                return ghin_number, 0.0
+        return None, DAY
+
+    def refresh(self, ghin_number: str) -> Optional[dict]:
+        """
+        Refresh one golfer now and return their handicap spread (None if it
+        failed). A refresh already in flight for the golfer is joined
+        instead of starting a second one.
+        """
+        ghin_number = str(ghin_number)
+        with self._lock:
+            future = self._in_flight.get(ghin_number)
+            owner = future is None
+            if owner:
+                future = self._in_flight[ghin_number] = Future()
+        if not owner:
+            return future.result()
+        try:
+            future.set_result(self._refresh(ghin_number))
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[ghin_number]
+        return future.result()
+
+    def _refresh(self, ghin_number: str) -> Optional[dict]:
+        state = self.state.get(ghin_number)
+        if state is None:
+            raise ValueError(f"{ghin_number} is not in the refresh service roster")
+        now = time.time()
+        try:
+            golfer = RefreshGHIN(ghin_number, self.rate_limiter)
+            handicap_spread = golfer.get_handicap_spread()
+            scores = golfer.scores
+        except Exception as e:
+            failures = state.failures + 1
+            backoff = min(FAILURE_BACKOFF * 2 ** (failures - 1), DAY)
+            self.state.save(
+                state._replace(next_refresh=now + backoff, failures=failures)
+            )
+            self.schedule(ghin_number, now + backoff)
+            print(f"[red]ERROR[/red] refreshing {state.name}: {e}")
+            return None
+        state = state._replace(
+            refreshed_at=now,
+            last_played=scores[0].played_at.isoformat() if scores else None,
+            failures=0,
+            handicap_spread=handicap_spread,
+        )
+        state = state._replace(next_refresh=now + refresh_interval(state))
+        self.state.save(state)
+        self.schedule(ghin_number, state.next_refresh)
+        self.rankings.update(state.name, handicap_spread)
+        print(
+            f"Refreshed {state.name}: {handicap_spread['best_8_handicap']} "
+            f"({activity_tier(state)}, next in {refresh_interval(state) / MINUTE:.0f} min)"
+        )
+        return handicap_spread
+
+    def get_handicap_spread(
+        self, ghin_number: str, max_age: Optional[float] = None
+    ) -> Optional[dict]:
+        """A golfer's handicap spread from the state when fresh, refreshed otherwise"""
+        state = self.state.get(ghin_number)
+        if state is not None and is_fresh(state, max_age):
+            return state.handicap_spread
+        return self.refresh(ghin_number)
+
+    def _run_refresh(self, ghin_number: str) -> None:
+        """
+        refresh() for run(): a refresh that raises (e.g. a sqlite error or
+        a golfer missing from the state) is printed and retried with the
+        same backoff as a failed fetch instead of dropping the golfer
+        """
+        try:
+            self.refresh(ghin_number)
+        except Exception as e:
+            with self._lock:
+                errors = self._errors[ghin_number] = (
+                    self._errors.get(ghin_number, 0) + 1
+                )
+            backoff = min(FAILURE_BACKOFF * 2 ** (errors - 1), DAY)
+            print(f"[red]ERROR[/red] refreshing {ghin_number}: {e}")
+            self.schedule(ghin_number, time.time() + backoff)
+        else:
+            with self._lock:
+                self._errors.pop(ghin_number, None)
+
+    def stop(self) -> None:
+        """Make run() return once the refreshes in flight are done"""
+        self._stop.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        """Refresh golfers as they come due until stop() is called"""
+        slots = threading.Semaphore(self.max_workers)
+
+        def refresh(ghin_number: str) -> None:
+            try:
+                self._run_refresh(ghin_number)
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self._stop.is_set():
+                ghin_number, wait = self._pop_due()
+                if ghin_number is None:
+                    self._wake.wait(wait)
+                    self._wake.clear()
+                    continue
+                slots.acquire()
+                executor.submit(refresh, ghin_number)
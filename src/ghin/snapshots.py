@@ -0,0 +1,214 @@
+import datetime as dt
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from ghin.cache import get_data_dir
+from ghin.util import strip_markup
+
+
+class Snapshot(NamedTuple):
+    id: int
+    taken_at: float
+    label: Optional[str]
+
+
+def _flatten(
+    handicap_spread: dict,
+) -> Iterator[Tuple[str, Optional[float], Optional[str]]]:
+    """
+    Yield (metric, value, text) for every value of a handicap spread with
+    the rich markup removed. Lists (next_4_rounds_to_fall_off) become one
+    metric per position, metric_1 being the next round to fall off.
+    """
+    for metric, value in handicap_spread.items():
+        if isinstance(value, (list, tuple)):
+            items = [(f"{metric}_{i + 1}", x) for i, x in enumerate(value)]
+        else:
+            items = [(metric, value)]
+        for name, item in items:
+            item = strip_markup(item)
+            if isinstance(item, (int, float)) and not isinstance(item, bool):
+                yield name, float(item), None
+            else:
+                yield name, None, None if item is None else str(item)
+
+
+class SnapshotStore:
+    """
+    Append only SQLite store of handicap spreads (the input of
+    format_handicap_spread) taken over time. Every value is one row keyed
+    by snapshot, golfer and metric, so two snapshots are diffed with a
+    single indexed join instead of loading whole JSON files.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = str(path or get_data_dir() / "snapshots.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                taken_at REAL NOT NULL,
+                label TEXT
+            );
+            CREATE INDEX IF NOT EXISTS snapshots_taken ON snapshots (taken_at);
+            CREATE TABLE IF NOT EXISTS snapshot_values (
+                snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+                golfer TEXT NOT NULL,
+                metric TEXT NOT NULL,
+                value REAL,
+                text TEXT,
+                PRIMARY KEY (snapshot_id, metric, golfer)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS snapshot_values_golfer
+                ON snapshot_values (golfer, metric, snapshot_id);
+            """
+        )
+        self._conn.commit()
+
+    def add_snapshot(
+        self,
+        handicap_spreads: dict,
+        label: Optional[str] = None,
+        taken_at: Optional[float] = None,
+    ) -> int:
+        """Store a dict of golfer name to handicap spread, returning its id"""
+        taken_at = time.time() if taken_at is None else taken_at
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO snapshots (taken_at, label) VALUES (?, ?)",
+                (taken_at, label),
+            )
+            snapshot_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO snapshot_values VALUES (?, ?, ?, ?, ?)",
+                (
+                    (snapshot_id, golfer, metric, value, text)
+                    for golfer, handicap_spread in handicap_spreads.items()
+                    for metric, value, text in _flatten(handicap_spread)
+                ),
+            )
+            self._conn.commit()
+        return snapshot_id
+
+    def import_json(self, file_path: str, label: Optional[str] = None) -> int:
+        """
+        Store an old JSON output (outputs/output.json, July-2024.json, ...)
+        as a snapshot taken when the file was last modified
+        """
+        with open(file_path, "r") as f:
+            handicap_spreads = json.load(f)
+        return self.add_snapshot(
+            handicap_spreads,
+            label=label or os.path.splitext(os.path.basename(file_path))[0],
+            taken_at=os.path.getmtime(file_path),
+        )
+
+    def snapshots(self) -> List[Snapshot]:
+        """Return every snapshot, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, taken_at, label FROM snapshots ORDER BY taken_at, id"
+            ).fetchall()
+        return [Snapshot(*row) for row in rows]
+
+    def latest(self, before: Optional[dt.datetime] = None) -> Optional[Snapshot]:
+        """Return the most recent snapshot, or the most recent one taken before a date"""
+        query = "SELECT id, taken_at, label FROM snapshots"
+        params = ()
+        if before is not None:
+            query += " WHERE taken_at <= ?"
+            params = (before.timestamp(),)
+        query += " ORDER BY taken_at DESC, id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return None if row is None else Snapshot(*row)
+
+    def get_snapshot(self, snapshot_id: int) -> dict:
+        """Return a snapshot as a dict of golfer name to {metric: value}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT golfer, metric, value, text FROM snapshot_values "
+                "WHERE snapshot_id = ?",
+                (snapshot_id,),
+            ).fetchall()
+        handicap_spreads = {}
+        for golfer, metric, value, text in rows:
+            handicap_spreads.setdefault(golfer, {})[metric] = (
+                text if value is None else value
+            )
+        return handicap_spreads
+
+    def diff(
+        self, old_id: int, new_id: int, metric: Optional[str] = None
+    ) -> List[dict]:
+        """
+        Return the numeric values that changed between two snapshots, one
+        dict per golfer and metric with the old and new values and the change,
+        largest change first. Golfers missing from either snapshot are left out.
+        """
+        query = """
+            SELECT new.golfer, new.metric, old.value, new.value,
+                   new.value - old.value AS change
+            FROM snapshot_values AS new
+            JOIN snapshot_values AS old
+              ON old.snapshot_id = ? AND old.metric = new.metric
+             AND old.golfer = new.golfer
+            WHERE new.snapshot_id = ? AND new.value IS NOT NULL
+              AND old.value IS NOT NULL AND new.value != old.value
+        """
+        params = (old_id, new_id)
+        if metric is not None:
+            query += " AND new.metric = ?"
+            params += (metric,)
+        query += " ORDER BY ABS(change) DESC, new.golfer, new.metric"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "golfer": golfer,
+                "metric": name,
+                "old": old,
+                "new": new,
+                "change": round(change, 1),
+            }
+            for golfer, name, old, new, change in rows
+        ]
+
+    def movers(
+        self,
+        since: dt.datetime,
+        metric: str = "best_8_handicap",
+        limit: int = 10,
+    ) -> List[dict]:
+        """
+        Return the golfers whose metric moved the most between the last
+        snapshot taken before `since` and the latest snapshot
+        """
+        old = self.latest(before=since)
+        new = self.latest()
+        if old is None or new is None or old.id == new.id:
+            return []
+        return self.diff(old.id, new.id, metric)[:limit]
+
+    def history(
+        self, golfer: str, metric: str = "best_8_handicap"
+    ) -> List[Tuple[float, Optional[float]]]:
+        """Return (taken_at, value) of one golfer's metric in every snapshot"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT snapshots.taken_at, snapshot_values.value
+                FROM snapshot_values
+                JOIN snapshots ON snapshots.id = snapshot_values.snapshot_id
+                WHERE snapshot_values.golfer = ? AND snapshot_values.metric = ?
+                ORDER BY snapshots.taken_at
+                """,
+                (golfer, metric),
+            ).fetchall()
+        return rows
@@ -0,0 +1,169 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from ghin.instrument import instrumented
+from ghin.scores import Score, get_score_differential
+
+ROUNDS = 20
+SCORING_ROUNDS = 8
+ROUNDED_METRICS = (
+    "worst_8_handicap",
+    "last_8_rounds",
+    "last_4_rounds",
+    "all_20_handicap",
+    "drop_4_high_and_low_handicap",
+    "handicap_std_dev",
+    "differential_range",
+)
+
+
+def differential_matrix(
+    score_histories: Sequence[dict], rounds: int = ROUNDS
+) -> np.ndarray:
+    """
+    Build an (n_golfers x rounds) matrix of differentials from the outputs of
+    GHIN.get_scores_history() (or lists of Score records), most recent round
+    first. Golfers with fewer than `rounds` scores are padded with nan.
+    """
+    matrix = np.full((len(score_histories), rounds), np.nan)
+    for i, history in enumerate(score_histories):
+        if isinstance(history, dict):
+            history = history["scores"]
+        differentials = [
+            x.differential if isinstance(x, Score) else get_score_differential(x)
+            for x in history[:rounds]
+        ]
+        matrix[i, : len(differentials)] = differentials
+    return matrix
+
+
+def _row_window_mean(
+    values: np.ndarray, start: np.ndarray, stop: np.ndarray
+) -> np.ndarray:
+    """
+    Mean of values[i, start[i]:stop[i]] for every row i, nan if the window is
+    empty. Columns are added left to right, the same order as sum() over a
+    list slice, so results round exactly like GHIN.get_handicap_spread().
+    """
+    columns = np.arange(values.shape[1])
+    in_window = (columns >= start[:, None]) & (columns < stop[:, None])
+    window = np.where(in_window, values, 0.0)
+    total = np.zeros(len(values))
+    for column in columns:
+        total += window[:, column]
+    count = stop - start
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+@instrumented("compute_handicap_spreads")
+def compute_handicap_spreads(
+    differentials: np.ndarray, handicaps: Optional[Sequence[float]] = None
+) -> dict:
+    """
+    Compute every metric of GHIN.get_handicap_spread() for many golfers at
+    once. differentials is an (n_golfers x 20) matrix, most recent round
+    first and nan padded (see differential_matrix). handicaps are the
+    golfers' live handicap indexes, when omitted the best 8 average is used.
+    Returns a dict of metric name to an unrounded array with one value per
+    golfer, handicap_spread_table rounds them the way get_handicap_spread does.
+    """
+    differentials = np.asarray(differentials, dtype=float)
+    n_golfers = len(differentials)
+    rows = np.arange(n_golfers)
+    counts = np.count_nonzero(~np.isnan(differentials), axis=1)
+    last_index = np.maximum(counts - 1, 0)
+
+    # nan sorts to the end so every row's scores are at the front
+    sorted_diffs = np.sort(differentials, axis=1)
+
+    zero = np.zeros(n_golfers, dtype=int)
+    best_8 = _row_window_mean(sorted_diffs, zero, np.minimum(counts, SCORING_ROUNDS))
+    if handicaps is None:
+        handicaps = np.round(best_8, 1)
+    handicaps = np.asarray(handicaps, dtype=float)
+    worst_8 = _row_window_mean(
+        sorted_diffs, np.maximum(counts - SCORING_ROUNDS, 0), counts
+    )
+    drop_4_high_and_low = _row_window_mean(
+        sorted_diffs, np.minimum(counts, 4), np.maximum(counts - 4, 0)
+    )
+    worst_potential = _row_window_mean(
+        sorted_diffs, np.minimum(counts, 1), np.minimum(counts, SCORING_ROUNDS + 1)
+    )
+    worst_scored = sorted_diffs[rows, np.minimum(last_index, SCORING_ROUNDS - 1)]
+
+    last_8 = _row_window_mean(differentials, zero, np.minimum(counts, 8))
+    last_4 = _row_window_mean(differentials, zero, np.minimum(counts, 4))
+    all_20 = _row_window_mean(sorted_diffs, zero, counts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        std_dev = np.nanstd(differentials, axis=1, ddof=1)
+    differential_range = sorted_diffs[rows, last_index] - sorted_diffs[:, 0]
+    carry = (
+        np.count_nonzero(sorted_diffs[:, :SCORING_ROUNDS] > handicaps[:, None], axis=1)
+        / SCORING_ROUNDS
+    )
+
+    # the oldest 4 rounds, oldest first, and whether each is a scoring round
+    falloff_index = np.clip(last_index[:, None] - np.arange(4), 0, None)
+    next_4_to_fall_off = np.take_along_axis(differentials, falloff_index, axis=1)
+    next_4_scoring = next_4_to_fall_off <= worst_scored[:, None]
+    worst_potential = np.where(next_4_scoring[:, 0], worst_potential, handicaps)
+
+    return {
+        "best_8_handicap": handicaps,
+        "worst_8_handicap": worst_8,
+        "last_8_rounds": last_8,
+        "last_4_rounds": last_4,
+        "all_20_handicap": all_20,
+        "drop_4_high_and_low_handicap": drop_4_high_and_low,
+        "handicap_std_dev": std_dev,
+        "differential_range": differential_range,
+        "carry_percentage": carry,
+        "worst_scored_differential": worst_scored,
+        "worst_potential_handicap": worst_potential,
+        "next_4_rounds_to_fall_off": next_4_to_fall_off,
+        "next_4_rounds_scoring": next_4_scoring,
+    }
+
+
+def handicap_spread_table(
+    names: Sequence[str],
+    differentials: np.ndarray,
+    handicaps: Optional[Sequence[float]] = None,
+    extras: Optional[dict] = None,
+) -> dict:
+    """
+    Run compute_handicap_spreads and return a dict of golfer name to the same
+    handicap spread dict GHIN.get_handicap_spread() returns, ready for
+    tables.format_handicap_spread (plain numbers, no markup). extras maps a golfer name to the
+    historical values (low_handicap, total_scores, ...) to add to its row.
+    """
+    spreads = compute_handicap_spreads(differentials, handicaps)
+    columns = {metric: values.tolist() for metric, values in spreads.items()}
+    extras = extras or {}
+    table = {}
+    for i, name in enumerate(names):
+        next_4 = [round(x, 1) for x in columns["next_4_rounds_to_fall_off"][i]]
+        worst_potential = (
+            round(columns["worst_potential_handicap"][i], 1)
+            if columns["next_4_rounds_scoring"][i][0]
+            else columns["best_8_handicap"][i]
+        )
+        table[name] = {
+            "best_8_handicap": columns["best_8_handicap"][i],
+            **{metric: round(columns[metric][i], 1) for metric in ROUNDED_METRICS},
+            "carry_percentage": columns["carry_percentage"][i],
+            "worst_scored_differential": columns["worst_scored_differential"][i],
+            "worst_potential_handicap": worst_potential,
+            "next_4_rounds_to_fall_off": next_4,
+            "low_handicap": None,
+            "low_handicap_date": None,
+            "total_scores": None,
+            "highest_score": None,
+            "lowest_score": None,
+            "average_score": None,
+            **extras.get(name, {}),
+        }
+    return table
@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+from ghin.cache import get_data_dir
+from ghin.scores import Score, parse_scores
+
+
+class ScoreStore:
+    """
+    Local SQLite store of posted scores keyed by golfer id and score id.
+    get_scores() returns the same {"scores": [...]} shape as
+    GHIN.get_scores_history() so the plotting functions can read a full
+    history from disk. Use GHIN.sync_scores() to keep it up to date.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = str(path or get_data_dir() / "scores.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS scores (
+                golfer_id TEXT NOT NULL,
+                score_id TEXT NOT NULL,
+                played_at TEXT,
+                posted_at TEXT,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (golfer_id, score_id)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS scores_played ON scores (golfer_id, played_at)"
+        )
+        self._conn.commit()
+
+    def known_score_ids(self, golfer_id: str) -> set:
+        """Return the ids of every stored score for a golfer"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT score_id FROM scores WHERE golfer_id = ?", (str(golfer_id),)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def latest_played_at(self, golfer_id: str) -> Optional[str]:
+        """Return the most recent played_at date stored for a golfer"""
+        with self._lock:
+            (played_at,) = self._conn.execute(
+                "SELECT MAX(played_at) FROM scores WHERE golfer_id = ?",
+                (str(golfer_id),),
+            ).fetchone()
+        return played_at
+
+    def add_scores(self, golfer_id: str, scores: Iterable[dict]) -> None:
+        """Insert (or update) raw score dicts from the scores.json endpoint"""
+        rows = [
+            (
+                str(golfer_id),
+                str(score["id"]),
+                score.get("played_at"),
+                score.get("posted_at"),
+                json.dumps(score),
+            )
+            for score in scores
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def get_scores(self, golfer_id: str, limit: Optional[int] = None) -> dict:
+        """Return a golfer's stored scores, most recently played first"""
+        query = (
+            "SELECT payload FROM scores WHERE golfer_id = ? "
+            "ORDER BY played_at DESC, posted_at DESC"
+        )
+        params = (str(golfer_id),)
+        if limit is not None:
+            query += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return {"scores": [json.loads(row[0]) for row in rows]}
+
+    def get_score_records(
+        self, golfer_id: str, limit: Optional[int] = None
+    ) -> List[Score]:
+        """Return a golfer's stored scores as Score records, most recent first"""
+        return parse_scores(self.get_scores(golfer_id, limit))
+
+    def count(self, golfer_id: str) -> int:
+        """Return the number of stored scores for a golfer"""
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM scores WHERE golfer_id = ?", (str(golfer_id),)
+            ).fetchone()
+        return count
@@ -1,66 +1,165 @@
-import datetime as dt
+import bisect
+import csv
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
-import matplotlib.pyplot as plt
-import pandas as pd
 from rich import print
 from rich.align import Align
+from rich.console import Console, Group
+from rich.live import Live
 from rich.table import Table
 
-from ghin.util import get_low_handicap_value, get_lowest_differentials, get_played_date
+from ghin.instrument import instrumented
+from ghin.scores import Score, as_scores
+from ghin.util import rolling_handicap, strip_markup
 
+# matplotlib, pandas and numpy are only imported once a plot is requested,
+# format_handicap_spread (and so the golf CLI) does not need them
+if TYPE_CHECKING:
+    import pandas as pd
 
-def format_handicap_spread(handicap_spreads: dict) -> str:
-    """formats the dictionary of handicap spread into a nice string
-    and outputs it using rich print"""
-    # Create a table
-    table = Table(title="Alternative Handicaps", caption_justify="center")
+    from ghin.history import HandicapHistory
+
+
+# columns of the three handicap spread tables, (title, column heading) and
+# the handicap spread keys they show
+SPREAD_TABLES = {
+    "Alternative Handicaps": {
+        "Best 8": "best_8_handicap",
+        "Worst 8": "worst_8_handicap",
+        "Last 8": "last_8_rounds",
+        "Last 4": "last_4_rounds",
+        "All 20": "all_20_handicap",
+        "Drop 4HL": "drop_4_high_and_low_handicap",
+        "Range": "differential_range",
+        "Std Dev": "handicap_std_dev",
+    },
+    "Next Round Helpers": {
+        "Carry%": "carry_percentage",
+        "8th Scored": "worst_scored_differential",
+        "Score Fall Off": "next_4_rounds_to_fall_off",
+        "Worst Potential Handicap": "worst_potential_handicap",
+    },
+    "Historical Values": {
+        "Low Handicap": "low_handicap",
+        "Low Date": "low_handicap_date",
+        "Total Scores": "total_scores",
+        "Highest Score": "highest_score",
+        "Lowest Score": "lowest_score",
+        "Average Score": "average_score",
+    },
+}
+
+
+def _spread_table(title: str) -> Table:
+    """One of the SPREAD_TABLES with its columns but no rows"""
+    table = Table(title=title, caption_justify="center")
     table.add_column("Golfer", style="bold")
-    table.add_column("Best 8", style="bold")
-    table.add_column("Worst 8", style="bold")
-    table.add_column("Last 8", style="bold")
-    table.add_column("Last 4", style="bold")
-    table.add_column("All 20", style="bold")
-    table.add_column("Drop 4HL", style="bold")
-    table.add_column("Range", style="bold")
-    table.add_column("Std Dev", style="bold")
-
-    next_table = Table(title="Next Round Helpers", caption_justify="center")
-    next_table.add_column("Golfer", style="bold")
-    next_table.add_column("Carry%", style="bold")
-    next_table.add_column("8th Scored", style="bold")
-    next_table.add_column(
-        "Score Fall Off",
-        style="bold",
-        justify="center",
+    for heading in SPREAD_TABLES[title]:
+        if heading == "Score Fall Off":
+            table.add_column(heading, style="bold", justify="center")
+        else:
+            table.add_column(heading, style="bold")
+    return table
+
+
+def _alternative_handicaps_row(handicap_spread: dict) -> list:
+    return [
+        f"[green]{str(handicap_spread['best_8_handicap'])}",
+        f"[red]{str(handicap_spread['worst_8_handicap'])}",
+        f"[yellow]{str(handicap_spread['last_8_rounds'])}",
+        f"[yellow]{str(handicap_spread['last_4_rounds'])}",
+        f"[yellow]{str(handicap_spread['all_20_handicap'])}",
+        f"[yellow]{str(handicap_spread['drop_4_high_and_low_handicap'])}",
+        str(handicap_spread["differential_range"]),
+        str(handicap_spread["handicap_std_dev"]),
+    ]
+
+
+def falloff_markup(differentials: list, worst_scored: float) -> List[str]:
+    """
+    Differentials in green when they are scoring rounds (not above the
+    worst scored differential) and red when they are not. Values that
+    already carry markup (outputs saved before the handicap spreads held
+    plain numbers) are kept as they are.
+    """
+    return [
+        x
+        if isinstance(x, str)
+        else f"[green]{float(x):.1f}[/green]"
+        if x <= worst_scored
+        else f"[red]{float(x):.1f}[/red]"
+        for x in differentials
+    ]
+
+
+def _falloff_markup(handicap_spread: dict) -> List[str]:
+    """The next 4 rounds to fall off of a handicap spread, see falloff_markup"""
+    return falloff_markup(
+        handicap_spread["next_4_rounds_to_fall_off"],
+        handicap_spread["worst_scored_differential"],
     )
 
-    next_table.add_column("Worst Potential Handicap", style="bold")
 
-    historical_table = Table(title="Historical Values", caption_justify="center")
-    historical_table.add_column("Golfer", style="bold")
-    historical_table.add_column("Low Handicap", style="bold")
-    historical_table.add_column("Low Date", style="bold")
-    historical_table.add_column("Total Scores", style="bold")
-    historical_table.add_column("Highest Score", style="bold")
-    historical_table.add_column("Lowest Score", style="bold")
-    historical_table.add_column("Average Score", style="bold")
+def _worst_potential_markup(handicap_spread: dict) -> str:
+    """Yellow when the next round to fall off is a scoring round, else green"""
+    value = handicap_spread["worst_potential_handicap"]
+    if isinstance(value, str):
+        return value
+    next_round = strip_markup(handicap_spread["next_4_rounds_to_fall_off"][0])
+    color = (
+        "yellow"
+        if next_round <= handicap_spread["worst_scored_differential"]
+        else "green"
+    )
+    return f"[{color}]{value}[/{color}]"
+
+
+def _next_round_row(handicap_spread: dict, falloff) -> list:
+    """falloff is what to show in the Score Fall Off column"""
+    return [
+        f"[{'red' if handicap_spread['carry_percentage'] > 0.5 else 'green'}]{handicap_spread['carry_percentage'] * 100:.1f}%",
+        f"[yellow]{handicap_spread['worst_scored_differential']}",
+        falloff,
+        f"[yellow]{_worst_potential_markup(handicap_spread)}",
+    ]
+
+
+def _historical_row(handicap_spread: dict) -> list:
+    return [
+        f"[green]{str(handicap_spread['low_handicap'])}",
+        f"[green]{str(handicap_spread['low_handicap_date'])}",
+        f"[green]{str(handicap_spread['total_scores'])}",
+        str(handicap_spread["highest_score"]),
+        str(handicap_spread["lowest_score"]),
+        str(handicap_spread["average_score"]),
+    ]
+
+
+@instrumented("format_handicap_spread")
+def format_handicap_spread(handicap_spreads: dict) -> str:
+    """formats the dictionary of handicap spread into a nice string
+    and outputs it using rich print"""
+    table = _spread_table("Alternative Handicaps")
+    next_table = _spread_table("Next Round Helpers")
+    historical_table = _spread_table("Historical Values")
 
     # sort the handicaps by actual value
     sorted_handicap_spreads = dict(
         sorted(handicap_spreads.items(), key=lambda item: item[1]["best_8_handicap"])
     )
     for golfer, handicap_spread in sorted_handicap_spreads.items():
-        table.add_row(
-            golfer,
-            f"[green]{str(handicap_spread['best_8_handicap'])}",
-            f"[red]{str(handicap_spread['worst_8_handicap'])}",
-            f"[yellow]{str(handicap_spread['last_8_rounds'])}",
-            f"[yellow]{str(handicap_spread['last_4_rounds'])}",
-            f"[yellow]{str(handicap_spread['all_20_handicap'])}",
-            f"[yellow]{str(handicap_spread['drop_4_high_and_low_handicap'])}",
-            str(handicap_spread["differential_range"]),
-            str(handicap_spread["handicap_std_dev"]),
-        )
+        table.add_row(golfer, *_alternative_handicaps_row(handicap_spread))
         falloff_table = Table(
             padding=(0, 0, 0, 0),
             show_edge=False,
@@ -72,29 +171,10 @@ def format_handicap_spread(handicap_spreads: dict) -> str:
             falloff_table.add_column(
                 f"{i + 1}", style="bold", width=10, justify="center"
             )
-        falloff_table.add_row(
-            f"{handicap_spread['next_4_rounds_to_fall_off'][0]}",
-            f"{handicap_spread['next_4_rounds_to_fall_off'][1]}",
-            f"{handicap_spread['next_4_rounds_to_fall_off'][2]}",
-            f"{handicap_spread['next_4_rounds_to_fall_off'][3]}",
-        )
+        falloff_table.add_row(*_falloff_markup(handicap_spread))
         falloff_table = Align.left(falloff_table, pad=True)
-        next_table.add_row(
-            golfer,
-            f"[{'red' if handicap_spread['carry_percentage'] > 0.5 else 'green'}]{handicap_spread['carry_percentage'] * 100:.1f}%",
-            f"[yellow]{handicap_spread['worst_scored_differential']}",
-            falloff_table,
-            f"[yellow]{str(handicap_spread['worst_potential_handicap'])}",
-        )
-        historical_table.add_row(
-            golfer,
-            f"[green]{str(handicap_spread['low_handicap'])}",
-            f"[green]{str(handicap_spread['low_handicap_date'])}",
-            f"[green]{str(handicap_spread['total_scores'])}",
-            str(handicap_spread["highest_score"]),
-            str(handicap_spread["lowest_score"]),
-            str(handicap_spread["average_score"]),
-        )
+        next_table.add_row(golfer, *_next_round_row(handicap_spread, falloff_table))
+        historical_table.add_row(golfer, *_historical_row(handicap_spread))
 
     # Print the tables
     print(table)
@@ -102,69 +182,190 @@ def format_handicap_spread(handicap_spreads: dict) -> str:
     print(historical_table)
 
 
-def plot_handicap_history(handicap_history: dict) -> None:
+class LiveSpreadTable:
     """
-    Plot the handicap history of a golfer.
-    handicap_history is the output of the GHIN.get_handicap_history() method.
+    Handicap spreads kept sorted by best 8 handicap as golfers are added
+    (a binary search insert per golfer, not a sort of the whole roster).
+    Rendered by rich.Live, which only rebuilds the flat tables a few times
+    a second; the fall off rounds are plain text instead of a nested table.
     """
-    handicap_vals = [
-        {
-            "date": dt.datetime.strptime(x["RevDate"], "%Y-%m-%dT%H:%M:%S").date(),
-            "value": float(x["Value"]),
-        }
-        for x in handicap_history["handicap_revisions"]
-        if float(x["Value"]) < 30
+
+    def __init__(self, total: Optional[int] = None) -> None:
+        self.total = total
+        self.errors = 0
+        self._keys: List[tuple] = []
+        self._rows: List[tuple] = []
+
+    def add(self, golfer: str, handicap_spread: dict) -> None:
+        key = (handicap_spread["best_8_handicap"], golfer)
+        position = bisect.bisect(self._keys, key)
+        self._keys.insert(position, key)
+        self._rows.insert(position, (golfer, handicap_spread))
+
+    def __rich__(self) -> Group:
+        table = _spread_table("Alternative Handicaps")
+        next_table = _spread_table("Next Round Helpers")
+        historical_table = _spread_table("Historical Values")
+        for golfer, handicap_spread in self._rows:
+            table.add_row(golfer, *_alternative_handicaps_row(handicap_spread))
+            next_table.add_row(
+                golfer,
+                *_next_round_row(
+                    handicap_spread,
+                    " ".join(_falloff_markup(handicap_spread)),
+                ),
+            )
+            historical_table.add_row(golfer, *_historical_row(handicap_spread))
+        done = len(self._rows) + self.errors
+        table.caption = (
+            f"{done}/{self.total if self.total is not None else '?'} golfers"
+        )
+        if self.errors:
+            table.caption += f", [red]{self.errors} failed[/red]"
+        return Group(table, next_table, historical_table)
+
+
+def write_handicap_spread_rows(
+    handicap_spreads: Iterable[Tuple[str, dict]],
+    file: Optional[TextIO] = None,
+    delimiter: str = "\t",
+) -> None:
+    """
+    Plain fast path for when stdout is not a terminal: one delimited line
+    per golfer (columns in SPREAD_TABLES order, markup removed) written as
+    soon as the golfer arrives, after a header line
+    """
+    file = file or sys.stdout
+    writer = csv.writer(file, delimiter=delimiter, lineterminator="\n")
+    metrics = [
+        metric for columns in SPREAD_TABLES.values() for metric in columns.values()
     ]
-    # print(handicap_vals)
+    writer.writerow(["golfer", *metrics])
+    for golfer, handicap_spread in handicap_spreads:
+        row = [golfer]
+        for metric in metrics:
+            value = handicap_spread.get(metric)
+            if isinstance(value, (list, tuple)):
+                value = ",".join(str(strip_markup(x)) for x in value)
+            row.append(strip_markup(value))
+        writer.writerow(row)
+        file.flush()
+
+
+def stream_handicap_spreads(
+    results: Iterable[tuple],
+    total: Optional[int] = None,
+    live: Optional[bool] = None,
+    file: Optional[TextIO] = None,
+) -> Tuple[dict, dict]:
+    """
+    Show handicap spreads while they are fetched. results yields
+    (golfer, handicap_spread, error) as roster.iter_handicap_spreads does.
+    On a terminal (or with live=True) a rich.Live view adds every golfer in
+    sorted position as it completes, otherwise write_handicap_spread_rows
+    writes tab separated lines. Returns the handicap spreads (in completion
+    order) and the errors of the golfers that failed.
+    """
+    file = file or sys.stdout
+    if live is None:
+        live = file.isatty()
+    handicap_spreads = {}
+    errors = {}
+
+    def completed(on_error: Callable[[], None]) -> Iterator[Tuple[str, dict]]:
+        for golfer, handicap_spread, error in results:
+            if error is None:
+                handicap_spreads[golfer] = handicap_spread
+                yield golfer, handicap_spread
+            else:
+                errors[golfer] = error
+                on_error()
+
+    if not live:
+        write_handicap_spread_rows(completed(lambda: None), file)
+        return handicap_spreads, errors
+
+    view = LiveSpreadTable(total)
+
+    def count_error() -> None:
+        view.errors += 1
+
+    with Live(
+        view,
+        console=Console(file=file),
+        refresh_per_second=4,
+        vertical_overflow="visible",
+    ):
+        for golfer, handicap_spread in completed(count_error):
+            view.add(golfer, handicap_spread)
+    return handicap_spreads, errors
+
+
+def plot_handicap_history(handicap_history: Union[dict, "HandicapHistory"]) -> None:
+    """
+    Plot the handicap history of a golfer.
+    handicap_history is the output of the GHIN.get_handicap_history() method
+    or a HandicapHistory.
+    """
+    import matplotlib.pyplot as plt
+
+    from ghin.history import HandicapHistory
+
+    history = HandicapHistory.coerce(handicap_history)
+    df_handicap = history.to_frame()
+    df_handicap = df_handicap[df_handicap["value"] < 30]
 
     # Create the handicap plot
     plt.figure(figsize=(12, 6))
-    pd.DataFrame(handicap_vals).plot(
-        x="date", y="value", ax=plt.gca(), title="Handicap Over Time"
-    )
+    df_handicap.plot(x="date", y="value", ax=plt.gca(), title="Handicap Over Time")
     plt.show()
 
 
-def plot_low_handicap_over_time(handicap_history: dict) -> None:
+def plot_low_handicap_over_time(
+    handicap_history: Union[dict, "HandicapHistory"],
+) -> None:
     """
     Plot the low handicap history of a golfer.
-    handicap_history is the output of the GHIN.get_handicap_history() method.
+    handicap_history is the output of the GHIN.get_handicap_history() method
+    or a HandicapHistory.
     """
-    low_handicap_vals = [
-        {
-            "date": dt.datetime.strptime(x["RevDate"], "%Y-%m-%dT%H:%M:%S").date(),
-            "value": get_low_handicap_value(x["LowHIDisplay"]),
-        }
-        for x in handicap_history["handicap_revisions"]
-    ]
-    # print(low_handicap_vals)
+    import matplotlib.pyplot as plt
+
+    from ghin.history import HandicapHistory
+
+    history = HandicapHistory.coerce(handicap_history)
     # Create the handicap plot
     plt.figure(figsize=(12, 6))
-    pd.DataFrame(low_handicap_vals).plot(
-        x="date", y="value", ax=plt.gca(), title="Low Handicap Over Time"
+    history.to_frame().plot(
+        x="date", y="low_value", ax=plt.gca(), title="Low Handicap Over Time"
     )
     plt.show()
 
 
-def plot_scores_over_time(all_scores: dict) -> None:
+def _scores_frame(all_scores: Union[dict, List[Score]]) -> "pd.DataFrame":
+    """DataFrame of date, number_of_holes, score and differential per round"""
+    import pandas as pd
+
+    scores = as_scores(all_scores)
+    return pd.DataFrame(
+        {
+            "date": [x.played_at for x in scores],
+            "number_of_holes": [x.number_of_holes for x in scores],
+            "score": [x.adjusted_gross_score for x in scores],
+            "differential": [x.differential for x in scores],
+        }
+    )
+
+
+def plot_scores_over_time(all_scores: Union[dict, List[Score]]) -> None:
     """
     Plot the scores over time for a golfer.
-    all_scores is the output of the GHIN.get_scores_history() method.
+    all_scores is the output of the GHIN.get_scores_history() method
+    or a list of Score records.
     """
-    score_vals = [
-        {
-            "date": get_played_date(x["played_at"]).date(),
-            "number_of_holes": x["number_of_holes"],
-            "score": x["adjusted_gross_score"],
-            # "score_to_par": int(x["adjusted_gross_score"]) + int(x["course_handicap"]),
-            # "differential": x["differential"],
-            # "scaled_up_differential_9_holes": x["adjusted_scaled_up_differential"],
-            "differential": x.get("scaled_up_differential") or x.get("differential"),
-        }
-        for x in all_scores["scores"]
-    ]
-    # Create separate lines for different hole counts
-    df_scores = pd.DataFrame(score_vals)
+    import matplotlib.pyplot as plt
+
+    df_scores = _scores_frame(all_scores)
     # print(df_scores.shape)
     df_scores.sort_values(by="date", inplace=True)
 
@@ -200,34 +401,22 @@ def plot_scores_over_time(all_scores: dict) -> None:
     plt.show()
 
 
-def plot_differentials_over_time(all_scores: dict, handicap: float) -> None:
+def plot_differentials_over_time(
+    all_scores: Union[dict, List[Score]], handicap: float
+) -> None:
     """
     Plot the scoring differentials over time for a golfer.
-    all_scores is the output of the GHIN.get_scores_history() method.
+    all_scores is the output of the GHIN.get_scores_history() method
+    or a list of Score records.
     handicap is the current handicap of the golfer.
     """
-    score_vals = [
-        {
-            "date": get_played_date(x["played_at"]).date(),
-            "number_of_holes": x["number_of_holes"],
-            "score": x["adjusted_gross_score"],
-            # "score_to_par": int(x["adjusted_gross_score"]) + int(x["course_handicap"]),
-            # "differential": x["differential"],
-            # "scaled_up_differential_9_holes": x["adjusted_scaled_up_differential"],
-            "differential": x.get("scaled_up_differential") or x.get("differential"),
-        }
-        for x in all_scores["scores"]
-    ]
-    # Create separate lines for different hole counts
-    df_scores = pd.DataFrame(score_vals)
+    import matplotlib.pyplot as plt
+
+    df_scores = _scores_frame(all_scores)
     df_scores.sort_values(by="date", inplace=True)
     df_scores.reset_index(drop=True, inplace=True)
     df_scores["rolling_average"] = df_scores["differential"].rolling(window=20).mean()
-    df_scores["rolling_handicap"] = (
-        df_scores["differential"]
-        .rolling(window=20)
-        .apply(lambda x: get_lowest_differentials(x))
-    )
+    df_scores["rolling_handicap"] = rolling_handicap(df_scores["differential"])
     df_scores["current_handicap"] = handicap
 
     # Separate data for 9-hole and 18-hole scores
@@ -0,0 +1,118 @@
+import bisect
+import math
+from typing import Dict, List, Optional, Sequence
+
+from ghin.courses import HoleCount, TeeSide
+from ghin.util import WHS_LOWEST_DIFFERENTIALS
+
+ROUNDS = 20
+# an index is displayed to one decimal, so a target of 9.9 is reached by any
+# unrounded index below 9.95
+DISPLAY_TOLERANCE = 0.05
+
+
+def _highest_differential(
+    lowest: Sequence[float], n_new: int, n_lowest: int, limit: float
+) -> float:
+    """
+    Highest x such that the sum of the n_lowest smallest values of `lowest`
+    plus n_new copies of x stays below limit, inf if it does for any x.
+    `lowest` is the sorted list of rounds left in the window. The sum of
+    the n_lowest smallest values is the minimum over c (copies of x among
+    them) of c * x + sum(lowest[:n_lowest - c]), so each c bounds x directly.
+    """
+    prefix = [0.0]
+    for value in lowest[:n_lowest]:
+        prefix.append(prefix[-1] + value)
+    # differentials have one decimal, so anything closer than 1e-6 to the
+    # limit is on it
+    if len(prefix) > n_lowest and prefix[n_lowest] < limit - 1e-6:
+        return math.inf
+    best = -math.inf
+    for copies in range(max(1, n_lowest - len(lowest)), min(n_new, n_lowest) + 1):
+        best = max(best, (limit - prefix[n_lowest - copies]) / copies)
+    return best
+
+
+def required_differentials(
+    differentials: Sequence[float], target: float, rounds: int = 4
+) -> List[Optional[float]]:
+    """
+    For each of the next `rounds` rounds, the highest differential (to one
+    decimal) that, scored in every round up to and including it, brings the
+    handicap index to `target` or lower. differentials are the last 20
+    score differentials, most recent first. Rounds older than the 20 round
+    window fall off as new ones are added, oldest first, and short records
+    follow the WHS table.
+    An entry is inf when the target is reached whatever is scored and None
+    when there are still fewer than 3 scores.
+    The rounds left in the window are kept sorted and each round that falls
+    off is removed with a binary search instead of sorting again.
+    """
+    window = [x for x in differentials[:ROUNDS] if x is not None]
+    remaining = sorted(window)
+    required = []
+    for n_new in range(1, rounds + 1):
+        # the oldest round still in the window falls off once it is full
+        if len(window) + n_new > ROUNDS:
+            falling_off = window[ROUNDS - n_new]
+            del remaining[bisect.bisect_left(remaining, falling_off)]
+        count = min(len(window) + n_new, ROUNDS)
+        if count not in WHS_LOWEST_DIFFERENTIALS:
+            required.append(None)
+            continue
+        n_lowest, adjustment = WHS_LOWEST_DIFFERENTIALS[count]
+        limit = n_lowest * (target + DISPLAY_TOLERANCE - adjustment)
+        highest = _highest_differential(remaining, n_new, n_lowest, limit)
+        if math.isinf(highest):
+            required.append(highest)
+            continue
+        # the highest one decimal differential strictly below the bound
+        required.append((math.ceil(round(highest * 10, 6)) - 1) / 10)
+    return required
+
+
+def differential_for_gross_score(adjusted_gross_score: int, tee: TeeSide) -> float:
+    """WHS score differential: (113 / slope) x (adjusted gross score - course rating)"""
+    return round((adjusted_gross_score - tee.course_rating) * 113 / tee.slope_rating, 1)
+
+
+def gross_score_for_differential(
+    differential: Optional[float], tee: TeeSide
+) -> Optional[int]:
+    """
+    Highest adjusted gross score on an 18 hole tee whose differential is at
+    most `differential`, None for an inf (any score) differential
+    """
+    if tee.rating_type != HoleCount.TOTAL:
+        raise ValueError(
+            f"Target scores need an 18 hole rating, got {tee.rating_type.value}"
+        )
+    if differential is None or math.isinf(differential):
+        return None
+    score = math.floor(differential * tee.slope_rating / 113 + tee.course_rating)
+    # differentials are rounded to one decimal, so step across the boundary
+    while differential_for_gross_score(score + 1, tee) <= differential:
+        score += 1
+    while differential_for_gross_score(score, tee) > differential:
+        score -= 1
+    return score
+
+
+def target_gross_scores(
+    differentials: Sequence[float],
+    target: float,
+    tee_sides: Sequence[TeeSide],
+    rounds: int = 4,
+) -> Dict[str, List[Optional[int]]]:
+    """
+    The required_differentials as adjusted gross scores for each tee,
+    keyed by "<tee name> (<gender>)"
+    """
+    required = required_differentials(differentials, target, rounds)
+    return {
+        f"{tee.tee_name} ({tee.gender})": [
+            gross_score_for_differential(x, tee) for x in required
+        ]
+        for tee in tee_sides
+    }
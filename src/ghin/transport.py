@@ -0,0 +1,419 @@
+import functools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ghin.cache import MINUTE, ResponseCache
+from ghin.header import get_headers
+from ghin.instrument import endpoint_name, span
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (5.0, 30.0)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_MEMO_SIZE = 1024
+DEFAULT_MEMO_TTL = 5 * MINUTE
+# the golfer a GHIN API url is about, in its path or golfer_id parameter
+_GOLFER_PATTERN = re.compile(r"(?:golfers/|golfer_id=)(\d+)")
+
+# guards the lazy creation and replacement of the module globals below
+_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_timeout = DEFAULT_TIMEOUT
+_cache: Optional[ResponseCache] = None
+_cache_enabled = True
+_refresh = False
+_rate_limiter: Optional["TokenBucket"] = None
+_memo: Optional["RequestMemo"] = None
+_memo_enabled = True
+
+
+class TokenBucket:
+    """
+    Rate limiter that lets `rate` requests per second through on average
+    and up to `burst` at once. Callers reserve a token under the lock and
+    sleep outside it, so waiting threads are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, waiting for one if needed, and return the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RequestMemo:
+    """
+    Process wide memo of parsed GHIN API responses keyed by (endpoint,
+    golfer, url and params), so GHIN instances for the same golfer share
+    their responses. It holds at most max_entries responses (least
+    recently used are dropped first) for ttl seconds, and is single
+    flight: a thread asking for a response that is already being requested
+    waits for that request instead of sending its own. Responses are
+    shared between callers, treat them as read only.
+    """
+
+    def __init__(
+        self, max_entries: int = DEFAULT_MEMO_SIZE, ttl: float = DEFAULT_MEMO_TTL
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, Tuple[float, dict]]" = OrderedDict()
+        self._in_flight: dict = {}
+        # bumped by invalidate_golfer (per golfer) and clear (the epoch) so
+        # requests started before them are not stored
+        self._generations: dict = {}
+        self._epoch = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[dict] = None) -> Tuple[str, Optional[str], str]:
+        """Return the (endpoint, golfer, url with sorted params) of a request"""
+        full_url = ResponseCache.key(url, params)
+        golfer = _GOLFER_PATTERN.search(full_url)
+        return endpoint_name(url), golfer and golfer.group(1), full_url
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[dict],
+        request: Callable[[str, Optional[dict]], dict],
+        refresh: bool = False,
+    ) -> dict:
+        """
+        Return the memoized response, or call request(url, params) once for
+        it. refresh=True always calls request and memoizes its result.
+        """
+        key = self.key(url, params)
+        if refresh:
+            with self._lock:
+                generation = (self._epoch, self._generations.get(key[1], 0))
+            body = request(url, params)
+            self._store(key, generation, body)
+            return body
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                future = None
+            else:
+                future = self._in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._in_flight[key] = Future()
+                    generation = (self._epoch, self._generations.get(key[1], 0))
+        if future is None:
+            with span("request", endpoint=key[0], cache="memo"):
+                return entry[1]
+        if not owner:
+            with span("request", endpoint=key[0], cache="memo"):
+                return future.result()
+        try:
+            body = request(url, params)
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+        self._store(key, generation, body)
+        future.set_result(body)
+        return body
+
+    def _store(self, key: tuple, generation: Tuple[int, int], body: dict) -> None:
+        """Memoize a body unless it was cleared or invalidated since it was requested"""
+        with self._lock:
+            if (self._epoch, self._generations.get(key[1], 0)) == generation:
+                self._entries[key] = (time.monotonic(), body)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def invalidate_golfer(self, ghin_number: Union[int, str]) -> int:
+        """Forget every response about a golfer, returns how many were dropped"""
+        golfer = str(ghin_number)
+        with self._lock:
+            self._generations[golfer] = self._generations.get(golfer, 0) + 1
+            keys = [key for key in self._entries if key[1] == golfer]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Forget every response, requests in flight are not stored either"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+
+def _build_session(pool_size: int, retries: int, backoff: float) -> requests.Session:
+    """Build a keep-alive session with a connection pool and retry policy"""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(get_headers())
+    return session
+
+
+def configure_session(
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: Union[float, tuple] = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> requests.Session:
+    """
+    (Re)build the process wide session used for every GHIN API call.
+    pool_size is the number of keep-alive connections kept open to the API,
+    timeout is a (connect, read) tuple or a single number of seconds and
+    429/5xx responses are retried `retries` times with exponential backoff.
+    """
+    global _session, _timeout
+    session = _build_session(pool_size, retries, backoff)
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = session
+        _timeout = timeout
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it with the defaults on first use"""
+    global _session
+    session = _session
+    if session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session(
+                    DEFAULT_POOL_SIZE, DEFAULT_RETRIES, DEFAULT_BACKOFF
+                )
+            session = _session
+    return session
+
+
+def configure_cache(
+    enabled: bool = True, refresh: bool = False, cache: Optional[ResponseCache] = None
+) -> Optional[ResponseCache]:
+    """
+    Configure the on-disk response cache used by request_json.
+    enabled=False skips the cache entirely, refresh=True ignores the TTLs and
+    revalidates every cached response with the API (and stores the result).
+    """
+    global _cache, _cache_enabled, _refresh
+    with _lock:
+        _cache_enabled = enabled
+        _refresh = refresh
+        if cache is not None:
+            _cache = cache
+    return get_cache()
+
+
+def configure_rate_limit(
+    rate: Optional[float], burst: int = 1
+) -> Optional[TokenBucket]:
+    """
+    Limit the requests request_json sends to the GHIN API (cache hits are
+    not counted) to `rate` per second with bursts of `burst`, None turns
+    the limit off
+    """
+    global _rate_limiter
+    _rate_limiter = None if rate is None else TokenBucket(rate, burst)
+    return _rate_limiter
+
+
+def configure_memo(
+    enabled: bool = True,
+    max_entries: int = DEFAULT_MEMO_SIZE,
+    ttl: float = DEFAULT_MEMO_TTL,
+) -> Optional[RequestMemo]:
+    """
+    Configure the in-process memo in front of request_json (see
+    RequestMemo), enabled=False sends every call to the cache / API
+    """
+    global _memo, _memo_enabled
+    memo = RequestMemo(max_entries, ttl) if enabled else None
+    with _lock:
+        _memo_enabled = enabled
+        _memo = memo
+    return memo
+
+
+def get_memo() -> Optional[RequestMemo]:
+    """Return the shared request memo, or None if it is disabled"""
+    global _memo
+    if not _memo_enabled:
+        return None
+    memo = _memo
+    if memo is None:
+        with _lock:
+            if _memo is None:
+                _memo = RequestMemo()
+            memo = _memo
+    return memo
+
+
+def invalidate_golfer(ghin_number: Union[int, str]) -> int:
+    """
+    Forget the memoized responses about a golfer (account, handicap,
+    scores, followed golfers) so the next request for them is sent again
+    """
+    memo = get_memo()
+    return 0 if memo is None else memo.invalidate_golfer(ghin_number)
+
+
+def get_cache() -> Optional[ResponseCache]:
+    """Return the shared response cache, or None if caching is disabled"""
+    global _cache
+    if not _cache_enabled:
+        return None
+    cache = _cache
+    if cache is None:
+        with _lock:
+            if _cache is None:
+                _cache = ResponseCache()
+            cache = _cache
+    return cache
+
+
+def request_json(
+    url: str,
+    params: Optional[dict] = None,
+    revalidate: bool = False,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> dict:
+    """
+    GET the url through the shared session and return the parsed json body.
+    Responses already requested in this process come from the request memo,
+    concurrent calls for the same request share one call (see RequestMemo),
+    so the returned body may be shared and must be treated as read only.
+    Fresh responses are served from the on-disk cache, stale ones are
+    revalidated with If-None-Match / If-Modified-Since when the API sent an
+    ETag or Last-Modified header. The body is only parsed once, API errors
+    are raised as ValueError. Every call is timed in an instrument span.
+    revalidate=True skips the memo and revalidates even a fresh cached
+    response (the result is memoized again) and rate_limiter is waited on
+    before sending, for this request only (see configure_cache and
+    configure_rate_limit for the process-wide ones).
+    """
+    request = _request_json
+    if revalidate or rate_limiter is not None:
+        request = functools.partial(
+            _request_json, revalidate=revalidate, rate_limiter=rate_limiter
+        )
+    memo = get_memo()
+    if memo is None:
+        return request(url, params)
+    return memo.get(url, params, request, refresh=revalidate)
+
+
+def _request_json(
+    url: str,
+    params: Optional[dict] = None,
+    revalidate: bool = False,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> dict:
+    with span("request", endpoint=endpoint_name(url)) as request_span:
+        cache = get_cache()
+        cached = None
+        headers = {}
+        if cache is not None:
+            key = cache.key(url, params)
+            cached = cache.get(key)
+            if cached is not None and cached.is_fresh and not (_refresh or revalidate):
+                request_span.set_attribute("cache", "hit")
+                return _parse_json(cached.body)
+            if cached is not None and cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached is not None and cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        rate_limiter = rate_limiter or _rate_limiter
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        response = get_session().get(
+            url, params=params or {}, headers=headers, timeout=_timeout
+        )
+        request_span.set_attribute("status", response.status_code)
+        request_span.set_attribute("bytes", len(response.content))
+        retries = getattr(getattr(response.raw, "retries", None), "history", ())
+        request_span.set_attribute("retries", len(retries))
+        if response.status_code == 304 and cached is not None:
+            request_span.set_attribute("cache", "revalidated")
+            cache.touch(key)
+            return _parse_json(cached.body)
+        request_span.set_attribute("cache", "off" if cache is None else "miss")
+        try:
+            with span("parse_json"):
+                body = response.json()
+        except ValueError:
+            raise ValueError(response.text)
+        body = check_response_body(body, response.ok, response.text)
+        if cache is not None:
+            cache.set(
+                key,
+                response.text,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+        return body
+
+
+def _parse_json(text: str):
+    with span("parse_json"):
+        return json.loads(text)
+
+
+def check_response_body(body, ok: bool, text: str):
+    """Return the parsed body, raising ValueError for GHIN API errors"""
+    if not isinstance(body, dict):
+        if ok:
+            return body
+        raise ValueError(text)
+    if "error" in body:
+        raise ValueError(body["error"])
+    if "errors" in body:
+        raise ValueError(body["errors"])
+    if not ok:
+        raise ValueError(text)
+    return body
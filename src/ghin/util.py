@@ -1,10 +1,13 @@
 import datetime as dt
+import re
+from typing import TYPE_CHECKING, Sequence
 
-import numpy as np
-import pandas as pd
-from dotenv import load_dotenv
+from ghin.instrument import instrumented
 
-load_dotenv()
+# numpy is imported inside the functions that need it so that importing
+# ghin (and running the golf CLI) does not pay for it
+if TYPE_CHECKING:
+    import numpy as np
 
 
 def get_played_date(string_value: str) -> dt.datetime:
@@ -19,11 +22,69 @@ def get_last_years_date(years_back: int = 1) -> str:
     return (dt.date.today() - dt.timedelta(days=365 * years_back)).isoformat()
 
 
-def get_lowest_differentials(data_series: pd.Series) -> pd.Series:
+def get_lowest_differentials(data_series: Sequence[float]) -> float:
     """Get the lowest 8 differentials from a data series"""
+    import numpy as np
+
     return np.mean(sorted(data_series)[:8])
 
 
+# WHS: number of lowest differentials averaged (and the adjustment applied)
+# for a golfer with fewer than 20 scores, keyed by the number of scores
+WHS_LOWEST_DIFFERENTIALS = {
+    3: (1, -2.0),
+    4: (1, -1.0),
+    5: (1, 0.0),
+    6: (2, -1.0),
+    7: (2, 0.0),
+    8: (2, 0.0),
+    9: (3, 0.0),
+    10: (3, 0.0),
+    11: (3, 0.0),
+    12: (4, 0.0),
+    13: (4, 0.0),
+    14: (4, 0.0),
+    15: (5, 0.0),
+    16: (5, 0.0),
+    17: (6, 0.0),
+    18: (6, 0.0),
+    19: (7, 0.0),
+    20: (8, 0.0),
+}
+
+
+@instrumented("rolling_handicap")
+def rolling_handicap(differentials, window: int = 20, lowest: int = 8) -> "np.ndarray":
+    """
+    Rolling "mean of the lowest 8 of the last 20" handicap index for a
+    series of differentials in the order they were played (oldest first).
+    Full windows are computed at once with a sliding window view and
+    np.partition, the first 19 rounds follow the WHS table for golfers with
+    fewer than 20 scores (nan before the 3rd score).
+    Only the default 8-of-20 window uses the WHS table, other windows
+    average the lowest `lowest` of whatever is available.
+    """
+    import numpy as np
+
+    values = np.asarray(differentials, dtype=float)
+    result = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        result[window - 1 :] = np.partition(windows, lowest - 1, axis=1)[
+            :, :lowest
+        ].mean(axis=1)
+    for i in range(min(window - 1, len(values))):
+        count = i + 1
+        if (window, lowest) == (20, 8):
+            if count not in WHS_LOWEST_DIFFERENTIALS:
+                continue
+            n_lowest, adjustment = WHS_LOWEST_DIFFERENTIALS[count]
+        else:
+            n_lowest, adjustment = min(lowest, count), 0.0
+        result[i] = np.sort(values[:count])[:n_lowest].mean() + adjustment
+    return result
+
+
 def get_differential_distribution(differentials: list, handicap: float) -> float:
     """
     Return the differential distribution for the GHIN number
@@ -49,6 +110,23 @@ def will_next_score_affect_handicap(
     return False
 
 
+_MARKUP = re.compile(r"\[/?[a-z ]*\]")
+
+
+def strip_markup(value):
+    """
+    Remove rich markup such as "[yellow]12.3[/yellow]" from a handicap spread
+    value, returning a float when what is left is a number
+    """
+    if not isinstance(value, str):
+        return value
+    text = _MARKUP.sub("", value)
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
 def get_low_handicap_value(string_value: str) -> float:
     """the good golfers get a plus, but in our charts it is really a minus"""
     try:
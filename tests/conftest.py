@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the local GHIN API stand-in (fixture_server) lives with the benchmarks
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+from ghin import catalog, transport
+
+# the process wide transport settings fixture_server.install() and the CLI replace
+TRANSPORT_GLOBALS = (
+    "_session",
+    "_timeout",
+    "_cache",
+    "_cache_enabled",
+    "_refresh",
+    "_rate_limiter",
+    "_memo",
+    "_memo_enabled",
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(monkeypatch, tmp_path):
+    """
+    Give every test its own data directory, session, response cache,
+    request memo and course catalog, and restore the originals afterwards
+    """
+    monkeypatch.setenv("GHIN_DATA_DIR", str(tmp_path))
+    for name in TRANSPORT_GLOBALS:
+        monkeypatch.setattr(transport, name, getattr(transport, name))
+    for name in ("_session", "_cache", "_memo"):
+        monkeypatch.setattr(transport, name, None)
+    monkeypatch.setattr(catalog, "_catalog", None)
+    yield
+    if transport._session is not None:
+        transport._session.close()
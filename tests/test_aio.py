@@ -0,0 +1,49 @@
+import asyncio
+import datetime as dt
+
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin import aio
+from ghin.cache import ResponseCache
+from ghin.store import ScoreStore
+
+GOLFER = "1000001"
+
+
+@pytest.fixture(autouse=True)
+def fixture_api(monkeypatch):
+    """Answer aio.request_json from the benchmark fixtures"""
+    fixtures = GHINFixtures(followed_golfers=3)
+
+    async def request_json(url, params=None):
+        return fixtures.payload(ResponseCache.key(url, params))
+
+    monkeypatch.setattr(aio, "request_json", request_json)
+
+
+def test_inherited_score_methods_are_async():
+    async def run():
+        golfer = aio.AsyncGHIN(GOLFER)
+        last_20 = await golfer.get_last_20_scores()
+        in_range = await golfer.get_range_of_scores(
+            dt.date(2024, 1, 1), dt.date(2025, 1, 1)
+        )
+        added = await golfer.sync_scores(ScoreStore())
+        return last_20, in_range, added
+
+    last_20, in_range, added = asyncio.run(run())
+    assert len(last_20["scores"]) == 20
+    assert in_range["scores"]
+    assert added == 120
+
+
+def test_group_handicap_spreads_is_async():
+    async def run():
+        golfer = await aio.AsyncGHIN.create(GOLFER)
+        friends = await golfer.get_followed_golfers()
+        return golfer, await golfer.group_handicap_spreads(friends)
+
+    golfer, spreads = asyncio.run(run())
+    assert len(spreads) == 3
+    assert golfer.roster_errors == {}
@@ -0,0 +1,24 @@
+from fixture_server import FixtureServer, GHINFixtures, install
+
+from ghin.catalog import CourseCatalog
+from ghin.courses import Course
+
+
+def test_refresh_reaches_the_api():
+    with FixtureServer(GHINFixtures()) as server:
+        install(server, cache=True, memo=True)
+        catalog = CourseCatalog()
+        assert catalog.get_course_details("1001")["TeeSets"]
+        assert CourseCatalog().get_course_details("1001")["TeeSets"]
+        assert server.requests == 1
+        assert catalog.get_course_details("1001", refresh=True)["TeeSets"]
+        assert server.requests == 2
+
+
+def test_course_details_are_copies():
+    with FixtureServer(GHINFixtures()) as server:
+        install(server, memo=True)
+        course = Course("1001", "1000001")
+        course.get_course_details()["TeeSets"].clear()
+        assert course.get_course_details()["TeeSets"]
+        assert server.requests == 1
@@ -0,0 +1,77 @@
+from decimal import ROUND_FLOOR, Decimal
+
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.course_handicaps import (
+    course_handicap_matrix,
+    format_course_handicap,
+)
+from ghin.courses import HoleCount, TeeSide, summarize_tee_sides
+
+
+def tee(rating_type=HoleCount.TOTAL, course_rating=72.0, slope_rating=113, par=72):
+    return TeeSide(
+        course_id="1",
+        tee_set_id="1",
+        tee_name="Blue",
+        gender="Male",
+        rating_type=rating_type,
+        course_rating=course_rating,
+        slope_rating=slope_rating,
+        bogey_rating=0.0,
+        par=par,
+        yardage=0,
+        par_3s=0,
+        par_4s=0,
+        par_5s=0,
+        longest_hole_yards=0,
+        shortest_hole_yards=0,
+        total_par=par,
+        total_yardage=0,
+    )
+
+
+def exact_course_handicap(index: str, tee_side: TeeSide) -> int:
+    """WHS course handicap in exact decimal arithmetic, .5 rounded up"""
+    index = Decimal(index)
+    if tee_side.rating_type != HoleCount.TOTAL:
+        index /= 2
+    value = index * tee_side.slope_rating / 113 + (
+        Decimal(str(tee_side.course_rating)) - tee_side.par
+    )
+    # .5 goes up for plus handicaps too (-2.5 is -2), not away from zero
+    return int((value + Decimal("0.5")).to_integral_value(rounding=ROUND_FLOOR))
+
+
+def test_matches_exact_arithmetic_on_every_fixture_tee():
+    tee_sides = summarize_tee_sides(GHINFixtures().course_details("1001"))
+    indexes = [f"{tenths / 10:.1f}" for tenths in range(-60, 541)]
+    matrix = course_handicap_matrix([float(x) for x in indexes], tee_sides)
+    for row, index in zip(matrix, indexes):
+        assert row.tolist() == [exact_course_handicap(index, t) for t in tee_sides]
+
+
+@pytest.mark.parametrize(
+    "index, tee_side, course_handicap",
+    [
+        (10.0, tee(course_rating=71.5, slope_rating=130), 11),
+        # 11.3 + 0.2 is 11.499999... in floating point
+        (11.3, tee(course_rating=72.2), 12),
+        (12.4, tee(), 12),
+        (-2.5, tee(), -2),
+        (-2.6, tee(), -3),
+        # 9 holes use half the index: 6.5 rounds up, 6.45 down
+        (13.0, tee(HoleCount.FRONT, 36.0, 113, 36), 7),
+        (12.9, tee(HoleCount.BACK, 36.0, 113, 36), 6),
+        (15.1, tee(HoleCount.FRONT, 36.0, 120, 36), 8),
+    ],
+)
+def test_rounding_and_nine_hole_half_index(index, tee_side, course_handicap):
+    assert course_handicap_matrix([index], [tee_side])[0, 0] == course_handicap
+
+
+def test_plus_handicaps_are_displayed_with_a_plus():
+    assert format_course_handicap(-3) == "+3"
+    assert format_course_handicap(0) == "0"
+    assert format_course_handicap(12) == "12"
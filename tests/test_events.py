@@ -0,0 +1,92 @@
+import statistics
+
+import numpy as np
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.events import (
+    DEFAULT_WEIGHTS,
+    EventPlayer,
+    _features,
+    _swap_deltas,
+    build_foursomes,
+    group_sizes,
+)
+
+FIXTURES = GHINFixtures()
+
+
+def fixture_players(n: int) -> list:
+    players = []
+    for i in range(n):
+        scores = FIXTURES.scores(str(1000001 + i), 0, 20)["scores"]
+        differentials = [score["differential"] for score in scores]
+        index = round(sum(sorted(differentials)[:8]) / 8, 1)
+        players.append(
+            EventPlayer(
+                golfer=f"golfer {i}",
+                handicap_index=index,
+                course_handicap=round(index * 1.13),
+                std_dev=round(statistics.stdev(differentials), 1),
+                form=round(sum(differentials[:8]) / 8 - index, 1),
+            )
+        )
+    return players
+
+
+def group_cost(groups: list, players: list, group_size: int = 4) -> float:
+    """The summed group costs, in plain Python"""
+    ordered = sorted(
+        players, key=lambda player: (player.course_handicap, player.golfer)
+    )
+    rows = dict(zip(ordered, _features(ordered, DEFAULT_WEIGHTS).tolist()))
+    targets = [
+        sum(column) * group_size / len(players) for column in zip(*rows.values())
+    ]
+    cost = 0.0
+    for group in groups:
+        totals = [sum(column) for column in zip(*(rows[player] for player in group))]
+        scale = group_size / len(group)
+        cost += sum((scale * x - t) ** 2 for x, t in zip(totals, targets))
+    return cost
+
+
+def test_swap_deltas_match_recomputed_costs():
+    players = sorted(fixture_players(10))
+    features = _features(players, DEFAULT_WEIGHTS)
+    groups = np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 2])
+    scales = 4 / np.bincount(groups)
+    targets = features.sum(axis=0) * 4 / len(players)
+    totals = np.array([features[groups == g].sum(axis=0) for g in range(3)])
+    deltas = _swap_deltas(features, groups, scales[:, None] * totals - targets, scales)
+
+    def as_groups(assignment):
+        return [[players[i] for i in np.flatnonzero(assignment == g)] for g in range(3)]
+
+    before = group_cost(as_groups(groups), players)
+    for a in range(len(players)):
+        for b in range(len(players)):
+            if groups[a] == groups[b]:
+                assert deltas[a, b] == np.inf
+                continue
+            swapped = groups.copy()
+            swapped[a], swapped[b] = groups[b], groups[a]
+            after = group_cost(as_groups(swapped), players)
+            assert deltas[a, b] == pytest.approx(after - before, abs=1e-9)
+
+
+@pytest.mark.parametrize("n_players", [0, 3, 9, 22, 37])
+def test_foursomes_are_a_swap_optimum(n_players):
+    players = fixture_players(n_players)
+    groups = build_foursomes(players)
+    assert sorted(len(group) for group in groups) == sorted(group_sizes(n_players))
+    assert sorted(player for group in groups for player in group) == sorted(players)
+    cost = group_cost(groups, players) if groups else 0.0
+    # no swap of two players of different groups lowers the cost any further
+    for g in range(len(groups)):
+        for h in range(g + 1, len(groups)):
+            for a in range(len(groups[g])):
+                for b in range(len(groups[h])):
+                    swapped = [list(group) for group in groups]
+                    swapped[g][a], swapped[h][b] = groups[h][b], groups[g][a]
+                    assert group_cost(swapped, players) >= cost - 1e-9
@@ -0,0 +1,59 @@
+import pytest
+from fixture_server import FixtureServer, GHINFixtures, install
+
+from ghin.courses import Course
+from ghin.ghin import GHIN
+
+GOLFER = "1000001"
+
+
+@pytest.fixture
+def golfer() -> GHIN:
+    return GHIN(GOLFER)
+
+
+def test_every_endpoint_has_a_payload(golfer):
+    fixtures = GHINFixtures(followed_golfers=3)
+    urls = {
+        "search": golfer._account_information_url(),
+        "live handicap": golfer._live_handicap_url(),
+        "scores": golfer._scores_page_url(0, 20),
+        "followed": golfer._followed_golfers_url(),
+        "course": Course._course_details_url("1001"),
+    }
+    payloads = {name: fixtures.payload(url) for name, url in urls.items()}
+    assert payloads["search"]["golfers"][0]["id"] == int(GOLFER)
+    assert payloads["live handicap"]["handicap_revisions"]
+    assert len(payloads["scores"]["scores"]) == 20
+    assert len(payloads["followed"]["golfers"]) == 3
+    assert payloads["course"]["TeeSets"]
+    assert fixtures.payload("https://api2.ghin.com/api/v1/unknown.json") is None
+
+
+def test_every_endpoint_through_the_server(golfer):
+    with FixtureServer(GHINFixtures(followed_golfers=3)) as server:
+        install(server, memo=True)
+        # the followed golfers response is memoized, callers get copies
+        followed = golfer.get_followed_golfers()
+        followed[0]["first_name"] = "Changed"
+        assert golfer.get_followed_golfers()[0]["first_name"] != "Changed"
+        assert golfer.display_name
+        assert isinstance(golfer.handicap, float)
+        assert len(golfer.scores) == 20
+        rounds = golfer.last_20_scored_rounds["scores"]
+        assert [r["id"] for r in rounds] == [score.id for score in golfer.scores]
+        assert Course("1001", GOLFER).get_course_details()["TeeSets"]
+        assert server.requests == 5
+        # course details come from the course catalog once fetched
+        assert Course("1001", GOLFER).get_course_details()["TeeSets"]
+        assert Course("1001", GOLFER).get_tees(gender="Male")
+        assert server.requests == 5
+
+
+def test_keep_raw_keeps_every_api_field():
+    with FixtureServer(GHINFixtures()) as server:
+        install(server)
+        rounds = GHIN(GOLFER, keep_raw=True).last_20_scored_rounds["scores"]
+        assert "course_name" in rounds[0]
+        assert "scaled_up_differential" in rounds[0]
+        assert "course_name" not in GHIN(GOLFER).last_20_scored_rounds["scores"][0]
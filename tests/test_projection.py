@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.projection import _handicap_index, project_handicaps, projection_bands
+from ghin.spreads import differential_matrix
+from ghin.util import WHS_LOWEST_DIFFERENTIALS
+
+FIXTURES = GHINFixtures()
+
+
+def whs_index(window: list) -> float:
+    if len(window) < 3:
+        return math.nan
+    n_lowest, adjustment = WHS_LOWEST_DIFFERENTIALS[len(window)]
+    # np.round like the vectorized engines (see spreads.compute_handicap_spreads)
+    return float(np.round(sum(sorted(window)[:n_lowest]) / n_lowest + adjustment, 1))
+
+
+def test_handicap_index_follows_the_whs_table():
+    windows = []
+    for count in range(1, 21):
+        scores = FIXTURES.scores(str(1000000 + count), 0, count)
+        windows.append([score["differential"] for score in scores["scores"]])
+    matrix = differential_matrix([{"scores": []}] * len(windows))
+    for row, window in zip(matrix, windows):
+        row[: len(window)] = window
+    counts = np.array([len(window) for window in windows])
+    index = _handicap_index(matrix[:, None, :], counts)[:, 0]
+    assert index.tolist() == pytest.approx(
+        [whs_index(window) for window in windows], nan_ok=True
+    )
+
+
+def test_a_constant_record_projects_to_itself():
+    bands = project_handicaps(np.full((1, 20), 12.0), n_rounds=5, seed=1)
+    assert bands.shape == (1, 5, 5)
+    assert np.allclose(bands, 12.0)
+
+
+def test_short_records_get_the_adjustment():
+    differentials = np.full((1, 20), np.nan)
+    differentials[0, :5] = 12.0
+    bands = projection_bands(["A"], project_handicaps(differentials, n_rounds=2))
+    # 6 scores average the lowest 2 minus 1, 7 scores the lowest 2
+    assert bands["A"]["p50"] == [11.0, 12.0]
+
+
+def test_projection_is_seeded_and_ordered():
+    scores = [FIXTURES.scores(str(1000000 + i), 0, 20) for i in range(1, 6)]
+    differentials = differential_matrix(scores)
+    bands = project_handicaps(differentials, n_rounds=8, seed=7)
+    assert np.array_equal(bands, project_handicaps(differentials, n_rounds=8, seed=7))
+    assert (np.diff(bands, axis=-1) >= 0).all()
@@ -0,0 +1,31 @@
+import math
+
+from ghin.rankings import RankingIndex, ranking_values
+
+
+def spread(best_8, last_8=None):
+    return {
+        "best_8_handicap": best_8,
+        "last_8_rounds": best_8 + 1 if last_8 is None else last_8,
+        "handicap_std_dev": 2.0,
+    }
+
+
+def test_non_finite_values_are_not_ranked(tmp_path):
+    rankings = RankingIndex(tmp_path / "rankings.sqlite3")
+    rankings.update_many(
+        {"A": spread(5.0), "B": spread(3.0), "C": spread(math.nan, math.inf)}
+    )
+    assert rankings.top("best_8_handicap") == [("B", 3.0), ("A", 5.0)]
+    assert rankings.value("handicap_std_dev", "C") == 2.0
+    assert rankings.value("last_8_trend", "C") is None
+    rankings.update("A", spread(math.nan))
+    assert rankings.top("best_8_handicap") == [("B", 3.0)]
+    # and the rows written to SQLite load back the same
+    reloaded = RankingIndex(rankings.path)
+    assert reloaded.top("best_8_handicap") == [("B", 3.0)]
+    assert reloaded.percentile("best_8_handicap", "B") == 0
+
+
+def test_ranking_values_skips_nan():
+    assert "best_8_handicap" not in ranking_values(spread(math.nan))
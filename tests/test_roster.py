@@ -0,0 +1,30 @@
+from argparse import ArgumentTypeError
+
+import pytest
+
+from ghin.roster import fetch_handicap_spreads
+from ghin.run import positive_int
+
+
+class FakeGolfer:
+    def __init__(self, ghin_number):
+        self.ghin_number = ghin_number
+
+    def get_handicap_spread(self):
+        return {"best_8_handicap": float(self.ghin_number)}
+
+
+@pytest.mark.parametrize("max_workers", [0, -3, 1, 4])
+def test_every_golfer_is_fetched_for_any_max_workers(max_workers):
+    golfers = {"A": "1", "B": "2", "C": "3"}
+    spreads, errors = fetch_handicap_spreads(
+        golfers, max_workers, golfer_cls=FakeGolfer, progress=False
+    )
+    assert list(spreads) == ["A", "B", "C"]
+    assert errors == {}
+
+
+def test_max_workers_option_rejects_values_below_one():
+    assert positive_int("2") == 2
+    with pytest.raises(ArgumentTypeError):
+        positive_int("0")
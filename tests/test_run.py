@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+from ghin import run
+
+
+def test_movers_alone_does_not_write_spreads(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["golf", "--movers", "7"])
+    run.main()
+    assert not (tmp_path / "output.json").exists()
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["-gn", "1000001", "--export-scores", "--output", "scores.json"],
+        ["-gn", "1000001", "--stream", "--output", "-"],
+        ["-gn", "1000001", "--format", "json", "--output", "-"],
+    ],
+)
+def test_output_format_mismatches_are_rejected(args, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["golf", *args])
+    with pytest.raises(SystemExit):
+        run.main()
+    assert "error: --" in capsys.readouterr().err
+    assert not (tmp_path / args[-1]).exists()
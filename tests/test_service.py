@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+import pytest
+from fixture_server import FixtureServer, GHINFixtures, install
+
+from ghin import transport
+from ghin.ghin import GHIN
+from ghin.service import FAILURE_BACKOFF, RefreshService, ServiceState
+
+GOLFERS = {"A": "1000001", "B": "1000002"}
+
+
+@pytest.fixture
+def server():
+    with FixtureServer(GHINFixtures()) as server:
+        install(server, cache=True)
+        yield server
+
+
+def test_service_state_is_opt_in(tmp_path, monkeypatch, server):
+    # table_of_golfers writes outputs/output.json
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "outputs").mkdir()
+    roster = tmp_path / "roster.json"
+    roster.write_text(json.dumps(GOLFERS))
+    GHIN.table_of_golfers(str(roster))
+    assert not (tmp_path / "service.sqlite3").exists()
+
+    service = RefreshService(rate=None)
+    service.add_golfers(GOLFERS)
+    for ghin_number in GOLFERS.values():
+        service.refresh(ghin_number)
+    before = server.requests
+    GHIN.table_of_golfers(str(roster), use_service_state=True)
+    assert server.requests == before
+    assert len(ServiceState().golfers()) == 2
+
+
+def test_service_leaves_transport_settings_alone(server):
+    service = RefreshService(rate=5, burst=2)
+    assert transport._rate_limiter is None
+    assert not transport._refresh
+    service.add_golfers({"A": GOLFERS["A"]})
+    assert service.refresh(GOLFERS["A"])["best_8_handicap"] is not None
+    assert service.rate_limiter.rate == 5
+
+
+def test_run_reschedules_a_refresh_that_raises(capsys):
+    service = RefreshService(rate=None)
+    # not in the state, so refresh raises ValueError
+    service.schedule("9999999")
+    thread = threading.Thread(target=service.run)
+    thread.start()
+    deadline = time.time() + 5
+    while "9999999" not in service._errors and time.time() < deadline:
+        time.sleep(0.01)
+    service.stop()
+    thread.join()
+    assert service._errors == {"9999999": 1}
+    assert service._due["9999999"] > time.time() + FAILURE_BACKOFF - 5
+    assert "not in the refresh service roster" in capsys.readouterr().out
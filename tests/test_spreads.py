@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.ghin import GHIN
+from ghin.scores import parse_scores
+from ghin.spreads import differential_matrix, handicap_spread_table
+
+FIXTURES = GHINFixtures()
+GOLFERS = [str(1000000 + i) for i in range(1, 41)]
+
+
+def fixture_golfer(ghin_number: str) -> GHIN:
+    """A GHIN golfer loaded from the fixture payloads, without requests"""
+    golfer = GHIN(ghin_number)
+    golfer.handicap = GHIN._parse_live_handicap(FIXTURES.handicap_history(ghin_number))
+    golfer.scores = parse_scores(FIXTURES.scores(ghin_number, 0, 20))
+    for attribute in (
+        "low_handicap",
+        "low_handicap_date",
+        "total_scores",
+        "highest_score",
+        "lowest_score",
+        "average_score",
+    ):
+        setattr(golfer, attribute, None)
+    return golfer
+
+
+def test_handicap_spread_table_matches_get_handicap_spread():
+    golfers = [fixture_golfer(ghin_number) for ghin_number in GOLFERS]
+    table = handicap_spread_table(
+        GOLFERS,
+        differential_matrix([golfer.scores for golfer in golfers]),
+        [golfer.handicap for golfer in golfers],
+    )
+    for ghin_number, golfer in zip(GOLFERS, golfers):
+        assert table[ghin_number] == pytest.approx(golfer.get_handicap_spread())
+
+
+def test_short_histories_are_nan_padded():
+    history = FIXTURES.scores(GOLFERS[0], 0, 5)
+    matrix = differential_matrix([history])
+    assert matrix.shape == (1, 20)
+    assert matrix[0, :5].tolist() == [x["differential"] for x in history["scores"]]
+    assert np.isnan(matrix[0, 5:]).all()
@@ -0,0 +1,18 @@
+from ghin.ghin import GHIN
+from ghin.tables import _falloff_markup
+
+
+def test_falloff_markup_matches_the_ghin_method():
+    spread = {
+        "next_4_rounds_to_fall_off": [5.0, 12.04, 10.0, "[red]13.0[/red]"],
+        "worst_scored_differential": 10.0,
+    }
+    assert _falloff_markup(spread) == [
+        "[green]5.0[/green]",
+        "[red]12.0[/red]",
+        "[green]10.0[/green]",
+        "[red]13.0[/red]",
+    ]
+    assert GHIN.next_four_rounds_to_fall_off(
+        spread["next_4_rounds_to_fall_off"], spread["worst_scored_differential"]
+    ) == _falloff_markup(spread)
@@ -0,0 +1,57 @@
+import math
+
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.targets import required_differentials
+from ghin.util import WHS_LOWEST_DIFFERENTIALS
+
+FIXTURES = GHINFixtures()
+# every one decimal differential tried by the brute force, in tenths
+CANDIDATES = range(-200, 1001)
+
+
+def reaches(window_tenths: list, target: float) -> bool:
+    """Whether the index of a window (tenths, most recent first) displays <= target"""
+    window = window_tenths[:20]
+    n_lowest, adjustment = WHS_LOWEST_DIFFERENTIALS[len(window)]
+    total = sum(sorted(window)[:n_lowest]) + round(adjustment * 10) * n_lowest
+    # index < target + 0.05, in integers
+    return 2 * total < n_lowest * (2 * round(target * 10) + 1)
+
+
+def brute_force(differentials: list, target: float, rounds: int) -> list:
+    tenths = [round(x * 10) for x in differentials[:20]]
+    expected = []
+    for n_new in range(1, rounds + 1):
+        if min(len(tenths) + n_new, 20) < 3:
+            expected.append(None)
+            continue
+        reached = [x for x in CANDIDATES if reaches([x] * n_new + tenths, target)]
+        if reached and reached[-1] == CANDIDATES[-1]:
+            expected.append(math.inf)
+        else:
+            expected.append(reached[-1] / 10 if reached else None)
+    return expected
+
+
+@pytest.mark.parametrize("ghin_number", ["1000001", "1000002", "1000003"])
+@pytest.mark.parametrize("offset", [-1.5, -0.5, 0.0, 0.5])
+def test_required_differentials_match_brute_force(ghin_number, offset):
+    scores = FIXTURES.scores(ghin_number, 0, 20)["scores"]
+    differentials = [score["differential"] for score in scores]
+    handicap = sum(sorted(differentials)[:8]) / 8
+    target = round(handicap + offset, 1)
+    assert required_differentials(differentials, target) == brute_force(
+        differentials, target, 4
+    )
+
+
+@pytest.mark.parametrize("n_scores", [1, 2, 5, 7, 12])
+def test_short_records_match_brute_force(n_scores):
+    scores = FIXTURES.scores("1000004", 0, n_scores)["scores"]
+    differentials = [score["differential"] for score in scores]
+    target = round(min(differentials), 1)
+    assert required_differentials(differentials, target) == brute_force(
+        differentials, target, 4
+    )
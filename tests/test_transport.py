@@ -0,0 +1,74 @@
+import threading
+import time
+
+from fixture_server import FixtureServer, GHINFixtures, install
+
+from ghin import transport
+from ghin.ghin import GHIN
+
+
+def test_session_is_created_once_under_contention(monkeypatch):
+    built = []
+    build_session = transport._build_session
+
+    def slow_build_session(*args):
+        time.sleep(0.05)
+        built.append(build_session(*args))
+        return built[-1]
+
+    monkeypatch.setattr(transport, "_session", None)
+    monkeypatch.setattr(transport, "_build_session", slow_build_session)
+    sessions = []
+    threads = [
+        threading.Thread(target=lambda: sessions.append(transport.get_session()))
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(built) == 1
+    assert all(session is built[0] for session in sessions)
+
+
+def test_clear_drops_responses_in_flight():
+    memo = transport.RequestMemo()
+    url = "https://api2.ghin.com/api/v1/golfers/1000001/scores.json"
+
+    def request(url, params):
+        memo.clear()
+        return {"scores": []}
+
+    memo.get(url, None, request)
+    assert len(memo) == 0
+    memo.get(url, None, lambda url, params: {"scores": []})
+    assert len(memo) == 1
+
+
+def test_memo_is_created_once_under_contention(monkeypatch):
+    monkeypatch.setattr(transport, "_memo", None)
+    monkeypatch.setattr(transport, "_memo_enabled", True)
+    memos = []
+    threads = [
+        threading.Thread(target=lambda: memos.append(transport.get_memo()))
+        for _ in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(memo is memos[0] for memo in memos)
+
+
+def test_revalidate_skips_a_fresh_memo_entry():
+    with FixtureServer(GHINFixtures()) as server:
+        install(server, memo=True)
+        url = GHIN("1000001")._followed_golfers_url()
+        transport.request_json(url)
+        transport.request_json(url)
+        assert server.requests == 1
+        transport.request_json(url, revalidate=True)
+        assert server.requests == 2
+        # the revalidated response is memoized again
+        transport.request_json(url)
+        assert server.requests == 2
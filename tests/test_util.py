@@ -0,0 +1,60 @@
+import math
+
+import pytest
+from fixture_server import GHINFixtures
+
+from ghin.util import rolling_handicap
+
+# (most scores, lowest differentials averaged, adjustment) from the WHS
+# rules for a golfer with fewer than 20 scores
+WHS_TABLE = [
+    (3, 1, -2.0),
+    (4, 1, -1.0),
+    (5, 1, 0.0),
+    (6, 2, -1.0),
+    (8, 2, 0.0),
+    (11, 3, 0.0),
+    (14, 4, 0.0),
+    (16, 5, 0.0),
+    (18, 6, 0.0),
+    (19, 7, 0.0),
+    (20, 8, 0.0),
+]
+
+
+def whs_index(differentials: list) -> float:
+    """The handicap index of the last (up to) 20 differentials, one at a time"""
+    recent = differentials[-20:]
+    if len(recent) < 3:
+        return math.nan
+    for most_scores, lowest, adjustment in WHS_TABLE:
+        if len(recent) <= most_scores:
+            return sum(sorted(recent)[:lowest]) / lowest + adjustment
+
+
+def test_rolling_handicap_follows_the_whs_table():
+    scores = GHINFixtures().scores("1000001", 0, 60)["scores"]
+    # played order, oldest first
+    differentials = [score["differential"] for score in reversed(scores)]
+    expected = [whs_index(differentials[: i + 1]) for i in range(len(differentials))]
+    assert rolling_handicap(differentials).tolist() == pytest.approx(
+        expected, nan_ok=True
+    )
+
+
+@pytest.mark.parametrize(
+    "differentials, index",
+    [
+        ([10.0, 12.0, 14.0], 8.0),
+        ([10.0, 12.0, 14.0, 9.0], 8.0),
+        ([10.0, 12.0, 14.0, 9.0, 11.0, 8.0], 7.5),
+        ([10.0, 12.0, 14.0, 9.0, 11.0, 8.0, 13.0], 8.5),
+    ],
+)
+def test_short_records(differentials, index):
+    assert rolling_handicap(differentials)[-1] == pytest.approx(index)
+
+
+def test_fewer_than_three_scores_have_no_index():
+    result = rolling_handicap([10.0, 12.0])
+    assert all(math.isnan(x) for x in result)